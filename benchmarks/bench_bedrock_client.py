@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Warm-path latency benchmark: per-request Bedrock client vs. shared pooled client
+
+By default the benchmark points both paths at a local HTTP stand-in for the
+Bedrock runtime InvokeModel API, so it runs without AWS credentials and
+measures client construction and connection reuse rather than model time.
+Pass --live to call the real Bedrock endpoint instead.
+
+Usage:
+    python benchmarks/bench_bedrock_client.py --iterations 200
+    python benchmarks/bench_bedrock_client.py --live --iterations 20
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List
+
+SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'services', 'sentiment')
+sys.path.insert(0, SERVICE_DIR)
+
+class _InvokeModelHandler(BaseHTTPRequestHandler):
+    """Minimal keep-alive stand-in for POST /model/{modelId}/invoke"""
+    
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    
+    def do_POST(self) -> None:
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        body = json.dumps({'generation': ' 1'}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+def start_local_endpoint() -> ThreadingHTTPServer:
+    """Start the stand-in endpoint on a free localhost port"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _InvokeModelHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def measure(call: Callable[[], None], iterations: int) -> Dict[str, float]:
+    """Time a callable and summarize per-call latency in milliseconds"""
+    samples: List[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'mean_ms': round(statistics.mean(samples), 3),
+        'p50_ms': round(samples[len(samples) // 2], 3),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--live', action='store_true', help='Call the real Bedrock endpoint')
+    args = parser.parse_args()
+    
+    server = None
+    if not args.live:
+        server = start_local_endpoint()
+        os.environ['BEDROCK_ENDPOINT_URL'] = f'http://127.0.0.1:{server.server_address[1]}'
+        os.environ.setdefault('AWS_ACCESS_KEY_ID', 'benchmark')
+        os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'benchmark')
+    
+    import boto3
+    from config import Config
+    from bedrock_client import BedrockClientManager
+    
+    request_body = json.dumps({
+        'prompt': Config.get_sentiment_prompt('I love this product!'),
+        **Config.BEDROCK_CONFIG
+    })
+    endpoint_url = os.environ.get('BEDROCK_ENDPOINT_URL')
+    
+    def per_request_client() -> None:
+        # Previous behaviour: a new client for every invocation
+        client = boto3.client('bedrock-runtime', region_name=Config.BEDROCK_REGION, endpoint_url=endpoint_url)
+        client.invoke_model(modelId=Config.BEDROCK_MODEL_ID, body=request_body)['body'].read()
+    
+    manager = BedrockClientManager(endpoint_url=endpoint_url)
+    manager.get_client()  # Container init, outside the warm path
+    
+    def shared_client() -> None:
+        manager.get_client().invoke_model(modelId=Config.BEDROCK_MODEL_ID, body=request_body)['body'].read()
+    
+    results = {
+        'mode': 'live' if args.live else 'local',
+        'iterations': args.iterations,
+        'before_per_request_client': measure(per_request_client, args.iterations),
+        'after_shared_client': measure(shared_client, args.iterations),
+    }
+    print(json.dumps(results, indent=2))
+    
+    if server is not None:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Cold-start harness: module import and first-invoke latency in fresh interpreters
+
+Each trial starts a new Python process that imports the Lambda handler and
+invokes it in the order a new container typically sees: a /health check, a
+CORS preflight, then two scoring requests. Bedrock is served by the local
+stand-in from bench_bedrock_client.py, so the real boto3 client is built and
+requests are signed, but no AWS call is made. The lexicon fast path is
+disabled so scoring requests reach the client.
+
+Modes:
+    eager_import  boto3 imported before the handler (the previous module-level import)
+    lazy          boto3 imported and the client built on the first scoring request
+    prewarm       client built on a background thread from module load (Lambda default)
+
+Usage:
+    python benchmarks/bench_cold_start.py --trials 5
+    python benchmarks/bench_cold_start.py --trials 5 --gap-ms 200
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+from bench_bedrock_client import SERVICE_DIR, start_local_endpoint
+
+MODES = ('eager_import', 'lazy', 'prewarm')
+
+CHILD = r'''
+import json, sys, time
+mode, gap_ms = sys.argv[1], float(sys.argv[2])
+start = time.perf_counter()
+if mode == 'eager_import':
+    import boto3
+import sentiment_analysis
+timings = {'import_ms': (time.perf_counter() - start) * 1000}
+
+def invoke(name, event):
+    began = time.perf_counter()
+    response = sentiment_analysis.lambda_handler(event, None)
+    timings[name] = (time.perf_counter() - began) * 1000
+    assert response['statusCode'] == 200, response
+
+invoke('health_ms', {'httpMethod': 'GET', 'path': '/health'})
+invoke('options_ms', {'httpMethod': 'OPTIONS'})
+timings['boto3_loaded_after_health'] = 'boto3' in sys.modules
+time.sleep(gap_ms / 1000)
+score = {'httpMethod': 'POST', 'path': '/', 'body': json.dumps({'message': 'the parcel arrived on tuesday'})}
+invoke('first_score_ms', score)
+score['body'] = json.dumps({'message': 'the parcel arrived on wednesday'})
+invoke('warm_score_ms', score)
+timings['total_ms'] = (time.perf_counter() - start) * 1000
+print(json.dumps(timings))
+'''
+
+def run_trial(mode: str, gap_ms: float, endpoint: str) -> Dict[str, Any]:
+    env = dict(os.environ)
+    env.update({
+        'PYTHONPATH': SERVICE_DIR,
+        'BEDROCK_ENDPOINT_URL': endpoint,
+        'BEDROCK_PREWARM': 'true' if mode == 'prewarm' else 'false',
+        'LEXICON_ENABLED': 'false',
+        'CACHE_BACKEND': '',
+        'AWS_ACCESS_KEY_ID': 'benchmark',
+        'AWS_SECRET_ACCESS_KEY': 'benchmark',
+        'AWS_DEFAULT_REGION': env.get('AWS_DEFAULT_REGION', 'us-east-1'),
+    })
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD, mode, str(gap_ms)],
+        env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def summarize(trials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {}
+    for key in trials[0]:
+        values = [trial[key] for trial in trials]
+        if isinstance(values[0], bool):
+            summary[key] = all(values)
+        else:
+            summary[key] = round(statistics.median(values), 2)
+    return summary
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Lambda cold-start harness')
+    parser.add_argument('--trials', type=int, default=5)
+    parser.add_argument('--gap-ms', type=float, default=0.0,
+                        help='Idle time between the preflight and the first scoring request')
+    parser.add_argument('--modes', default=','.join(MODES))
+    args = parser.parse_args()
+
+    server = start_local_endpoint()
+    endpoint = f'http://127.0.0.1:{server.server_address[1]}'
+    results: Dict[str, Any] = {'trials': args.trials, 'gap_ms': args.gap_ms}
+    for mode in args.modes.split(','):
+        results[mode] = summarize([run_trial(mode, args.gap_ms, endpoint) for _ in range(args.trials)])
+    server.shutdown()
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Per-session history memory: list of dicts vs. ColumnarHistory
+
+The legacy representation is built the way sessions load it, one decoded
+dict per JSON line from the history store, so every entry owns its datetime,
+message and label objects. Memory is measured with tracemalloc (numpy
+reports its buffers to it) after each structure is built. Also times the
+DataFrame conversion used by charts and the "recent 5" read.
+
+Usage:
+    python benchmarks/bench_history_memory.py --rows 100000
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+WEB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'web')
+sys.path.insert(0, WEB_DIR)
+
+import pandas as pd
+
+from columnar import ColumnarHistory
+from history_store import decode_entry, encode_entry
+
+LABELS = {1: 'positive', 0: 'neutral', -1: 'negative'}
+WORDS = ('great', 'service', 'slow', 'delivery', 'love', 'the', 'product', 'not', 'bad', 'okay')
+
+def make_lines(rows: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    lines = []
+    for i in range(rows):
+        score = rng.choice((1, 0, -1))
+        lines.append(encode_entry({
+            'timestamp': start + timedelta(seconds=i * 7, microseconds=rng.randrange(10 ** 6)),
+            'message': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 20))),
+            'sentiment_score': score,
+            'sentiment_label': LABELS[score]
+        }))
+    return lines
+
+def measure(build: Callable[[], Any]) -> Tuple[Any, int]:
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, current
+
+def time_ms(func: Callable[[], Any], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(min(samples), 4)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='History memory benchmark')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    lines = make_lines(args.rows, args.seed)
+    legacy, legacy_bytes = measure(lambda: [decode_entry(line) for line in lines])
+    columnar, columnar_bytes = measure(lambda: ColumnarHistory(decode_entry(line) for line in lines))
+
+    assert len(columnar) == len(legacy)
+    assert columnar[0] == legacy[0] and columnar[-1] == legacy[-1]
+    assert columnar.recent(5) == legacy[-5:]
+
+    message_bytes = sum(len(entry['message'].encode('utf-8')) for entry in legacy)
+    results: Dict[str, Any] = {
+        'rows': args.rows,
+        'message_utf8_bytes': message_bytes,
+        'legacy_list_bytes': legacy_bytes,
+        'columnar_bytes': columnar_bytes,
+        'columnar_buffer_bytes': columnar.nbytes(),
+        'legacy_bytes_per_row': round(legacy_bytes / args.rows, 1),
+        'columnar_bytes_per_row': round(columnar_bytes / args.rows, 1),
+        'reduction': round(legacy_bytes / columnar_bytes, 1),
+        'legacy_dataframe_ms': time_ms(lambda: pd.DataFrame(legacy), args.repeat),
+        'columnar_dataframe_ms': time_ms(lambda: columnar.to_frame(), args.repeat),
+        'legacy_recent5_ms': time_ms(lambda: legacy[-5:], args.repeat),
+        'columnar_recent5_ms': time_ms(lambda: columnar.recent(5), args.repeat),
+    }
+    extra = decode_entry(lines[0])
+    results['columnar_append_ms'] = time_ms(lambda: columnar.append(extra), args.repeat)
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Load generator: drives lambda_handler in-process against a simulated Bedrock
+
+Bedrock is replaced by stub_bedrock.StubBedrockClient, so model latency,
+jitter and injected faults (throttles, 5xx errors, timeouts, slow calls)
+are controlled from the command line and no AWS call is made. Events are replayed from a JSONL corpus or a synthetic one,
+either closed-loop at a fixed concurrency or open-loop at a target request
+rate. In open-loop mode latency is measured from each request's scheduled
+start, so queueing behind a saturated handler shows up in the percentiles
+instead of silently lowering the offered rate.
+
+Corpus lines are replayed as follows: objects with "httpMethod" are used as
+the API Gateway event verbatim, objects with "messages" become batch
+requests, and anything else is scored as a single message taken from
+--field. The lexicon fast path and the result cache are off by default so
+every request reaches the model; enable them to measure the tiered path.
+
+The result (configuration, throughput, status counts, latency percentiles,
+stub call and fault counts, per-model router statistics and mean per-stage timings from the handler's EMF lines)
+is printed as JSON and optionally written to --output, so runs can be
+compared across commits.
+
+Usage:
+    python benchmarks/bench_load.py --concurrency 16 --requests 2000 --latency-ms 40 --jitter-ms 20
+    python benchmarks/bench_load.py --rps 200 --duration 30 --throttle-rate 0.05 --output load.json
+    python benchmarks/bench_load.py --token-ms 15 --streaming
+    python benchmarks/bench_load.py --concurrency 32 --throttle-rate 0.2 --error-rate 0.02 --timeout-rate 0.01
+    python benchmarks/bench_load.py --slow-rate 0.05 --slow-ms 500 --hedge
+    python benchmarks/bench_load.py --models meta.llama3-8b-instruct-v1:0,anthropic.claude-3-haiku-20240307-v1:0 \
+        --model-latency anthropic.claude-3-haiku-20240307-v1:0=30 --fail-model meta.llama3-8b-instruct-v1:0
+    python benchmarks/bench_load.py --sentences 40 --prompt-ms-per-kchar 200 --chunked
+    python benchmarks/bench_load.py --corpus benchmarks/data/labeled_sentiment.jsonl --batch-size 10 --packed
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from itertools import cycle
+from typing import Any, Dict, Iterator, List, Optional
+
+SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'services', 'sentiment')
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tools')
+sys.path.insert(0, SERVICE_DIR)
+sys.path.insert(0, TOOLS_DIR)
+
+POSITIVE_WORDS = ('love', 'great', 'excellent', 'fast', 'helpful', 'amazing')
+NEGATIVE_WORDS = ('hate', 'slow', 'broken', 'terrible', 'rude', 'awful')
+FILLER_WORDS = (
+    'the', 'delivery', 'app', 'support', 'order', 'arrived', 'on', 'tuesday',
+    'package', 'team', 'update', 'screen', 'after', 'refund', 'is', 'was'
+)
+
+def synthetic_messages(count: int, seed: int, sentences: int = 1) -> List[str]:
+    """Distinct review-like messages of one or more sentences mixing sentiment and filler words"""
+    rng = random.Random(seed)
+    messages = []
+    for i in range(count):
+        parts = []
+        for _ in range(sentences):
+            words = rng.choices(FILLER_WORDS, k=rng.randint(4, 14))
+            sentiment = rng.choice((POSITIVE_WORDS, NEGATIVE_WORDS, ()))
+            if sentiment:
+                words.insert(rng.randrange(len(words) + 1), rng.choice(sentiment))
+            parts.append(' '.join(words))
+        messages.append(f"{'. '.join(parts)} #{i}")
+    return messages
+
+def load_corpus(path: str, field: str) -> List[Any]:
+    """Read replayable items (events, message lists or messages) from a JSONL file"""
+    items: List[Any] = []
+    with open(path, 'r', encoding='utf-8') as corpus:
+        for line in corpus:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, dict) and 'httpMethod' in record:
+                items.append(record)
+            elif isinstance(record, dict) and 'messages' in record:
+                items.append(record['messages'])
+            elif isinstance(record, dict):
+                items.append(record.get(field, ''))
+            else:
+                items.append(record)
+    if not items:
+        raise SystemExit(f'{path}: no replayable lines')
+    return items
+
+def make_events(items: List[Any], batch_size: int, packed: bool,
+                chunked: bool = False) -> Iterator[Dict[str, Any]]:
+    """Cycle through the corpus as API Gateway events"""
+    def post(body: Dict[str, Any]) -> Dict[str, Any]:
+        if chunked:
+            body['chunked'] = True
+        return {'httpMethod': 'POST', 'path': '/', 'body': json.dumps(body)}
+
+    source = cycle(items)
+    while True:
+        item = next(source)
+        if isinstance(item, dict):
+            yield item
+        elif isinstance(item, list):
+            yield post({'messages': item, 'packed': packed})
+        elif batch_size > 1:
+            yield post({'messages': [item] + [next(source) for _ in range(batch_size - 1)], 'packed': packed})
+        else:
+            yield post({'message': item})
+
+class LoadRun:
+    """
+    Issues events against the handler and records per-request outcomes
+
+    Args:
+        handler: lambda_handler
+        events: Infinite event iterator
+    """
+
+    def __init__(self, handler: Any, events: Iterator[Dict[str, Any]]):
+        self.handler = handler
+        self.events = events
+        self.latencies: List[float] = []
+        self.status_codes: Counter = Counter()
+        self.item_errors = 0
+        self.items = 0
+        self._events_lock = threading.Lock()
+        self._results_lock = threading.Lock()
+
+    def next_event(self) -> Dict[str, Any]:
+        with self._events_lock:
+            return next(self.events)
+
+    def invoke(self, event: Dict[str, Any], started: float) -> None:
+        response = self.handler(event, None)
+        latency_ms = (time.perf_counter() - started) * 1000
+        items = errors = 1
+        if response['statusCode'] == 200:
+            body = json.loads(response['body'])
+            summary = body.get('summary')
+            items, errors = (summary['total'], summary['failed']) if summary else (1, 0)
+        with self._results_lock:
+            self.latencies.append(latency_ms)
+            self.status_codes[response['statusCode']] += 1
+            self.items += items
+            self.item_errors += errors
+
+    def run_concurrency(self, concurrency: int, requests: Optional[int], duration: Optional[float]) -> float:
+        """Closed loop: each worker sends its next request as soon as the last one returns"""
+        remaining = [requests]
+        deadline = None if duration is None else time.perf_counter() + duration
+
+        def claim() -> bool:
+            with self._events_lock:
+                if remaining[0] is None:
+                    return True
+                if remaining[0] <= 0:
+                    return False
+                remaining[0] -= 1
+                return True
+
+        def worker() -> None:
+            while (deadline is None or time.perf_counter() < deadline) and claim():
+                event = self.next_event()
+                self.invoke(event, time.perf_counter())
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - started
+
+    def run_rate(self, rps: float, requests: Optional[int], duration: Optional[float], max_in_flight: int) -> float:
+        """Open loop: requests start on a fixed schedule regardless of completions"""
+        total = requests if requests is not None else int(rps * duration)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            for i in range(total):
+                scheduled = started + i / rps
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(self.invoke, self.next_event(), scheduled)
+        return time.perf_counter() - started
+
+class LineCollector:
+    """
+    stdout replacement that gathers complete lines per thread
+
+    print() writes the text and the newline separately, so a shared buffer
+    would interleave lines printed by concurrent requests.
+    """
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        pending = getattr(self._local, 'pending', '') + text
+        *complete, self._local.pending = pending.split('\n')
+        if complete:
+            with self._lock:
+                self.lines.extend(complete)
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self.lines = []
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Nearest-rank latency summary in milliseconds"""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def rank(fraction: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 3)
+
+    return {
+        'min': round(ordered[0], 3),
+        'mean': round(statistics.mean(ordered), 3),
+        'p50': rank(0.50),
+        'p95': rank(0.95),
+        'p99': rank(0.99),
+        'max': round(ordered[-1], 3),
+    }
+
+def stage_means(lines: List[str], requests: int) -> Dict[str, float]:
+    """Mean milliseconds per request for each stage in the captured EMF lines"""
+    totals: Counter = Counter()
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(record, dict) or '_aws' not in record:
+            continue
+        for key, value in record.items():
+            if key.endswith('_ms') and isinstance(value, (int, float)):
+                totals[key] += value
+    return {key: round(value / requests, 3) for key, value in sorted(totals.items())} if requests else {}
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=SERVICE_DIR,
+            check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='In-process load generator for lambda_handler')
+    corpus = parser.add_mutually_exclusive_group()
+    corpus.add_argument('--corpus', help='JSONL file to replay (default: synthetic corpus)')
+    corpus.add_argument('--synthetic', type=int, default=1000, help='Distinct synthetic messages')
+    parser.add_argument('--sentences', type=int, default=1, help='Sentences per synthetic message')
+    parser.add_argument('--field', default='message', help='Message field in corpus lines')
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument('--concurrency', type=int, default=8, help='Closed-loop workers')
+    load.add_argument('--rps', type=float, help='Open-loop target requests per second')
+    parser.add_argument('--requests', type=int, help='Requests to send (default: 1000 unless --duration)')
+    parser.add_argument('--duration', type=float, help='Seconds to run instead of a request count')
+    parser.add_argument('--warmup', type=int, default=20, help='Unmeasured requests sent first')
+    parser.add_argument('--max-in-flight', type=int, default=256, help='Open-loop concurrency limit')
+    parser.add_argument('--batch-size', type=int, default=1, help='Messages per request (1 = single-message requests)')
+    parser.add_argument('--packed', action='store_true', help='Send batch requests with "packed": true')
+    parser.add_argument('--chunked', action='store_true', help='Send requests with "chunked": true (long-message mode)')
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='Simulated model latency')
+    parser.add_argument('--jitter-ms', type=float, default=25.0, help='Uniform jitter added to the latency')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of model calls throttled')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of model calls failing with a 503')
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help='Fraction of model calls timing out')
+    parser.add_argument('--slow-rate', type=float, default=0.0, help='Fraction of model calls delayed by --slow-ms')
+    parser.add_argument('--slow-ms', type=float, default=500.0, help='Extra latency of slow model calls')
+    parser.add_argument('--token-ms', type=float, default=0.0, help='Simulated time per generated token')
+    parser.add_argument('--prompt-ms-per-kchar', type=float, default=0.0,
+                        help='Simulated prompt processing time per 1000 prompt characters')
+    parser.add_argument('--streaming', action='store_true', help='Enable streaming with early termination')
+    parser.add_argument('--hedge', action='store_true', help='Hedge model calls slower than the observed p95')
+    parser.add_argument('--no-guard', action='store_true', help='Disable admission control, retries and the breaker')
+    parser.add_argument('--models', help='Comma-separated model IDs to route between (primary first)')
+    parser.add_argument('--model-latency', action='append', default=[], metavar='MODEL=MS',
+                        help='Simulated latency for one model (repeatable)')
+    parser.add_argument('--fail-model', action='append', default=[], metavar='MODEL',
+                        help='Model whose calls all fail with a 503 (repeatable)')
+    parser.add_argument('--lexicon', action='store_true', help='Enable the lexicon fast path')
+    parser.add_argument('--cache', action='store_true', help='Enable the in-memory result cache')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Also write the JSON result to this file')
+    args = parser.parse_args()
+    if args.requests is None and args.duration is None:
+        args.requests = 1000
+
+    # Config reads the environment at import time
+    os.environ.update({
+        'LEXICON_ENABLED': 'true' if args.lexicon else 'false',
+        'CACHE_ENABLED': 'true' if args.cache else 'false',
+        'CACHE_BACKEND': '',
+        'BEDROCK_PREWARM': 'false',
+        'BEDROCK_STREAMING': 'true' if args.streaming else 'false',
+        'BEDROCK_GUARD_ENABLED': 'false' if args.no_guard else 'true',
+        'HEDGE_ENABLED': 'true' if args.hedge else 'false',
+    })
+    if args.models:
+        os.environ['BEDROCK_MODEL_IDS'] = args.models
+    from bedrock_client import client_manager
+    from model_router import model_router
+    from sentiment_analysis import lambda_handler
+    from stub_bedrock import StubBedrockClient
+
+    stub = StubBedrockClient(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        seed=args.seed, throttle_rate=args.throttle_rate, token_ms=args.token_ms,
+        prompt_ms_per_kchar=args.prompt_ms_per_kchar,
+        error_rate=args.error_rate, timeout_rate=args.timeout_rate,
+        slow_rate=args.slow_rate, slow_ms=args.slow_ms,
+        model_latency_ms={model: float(ms) for model, ms in (item.rsplit('=', 1) for item in args.model_latency)},
+        failing_models=args.fail_model
+    )
+    client_manager.set_client(stub)
+
+    items = load_corpus(args.corpus, args.field) if args.corpus else synthetic_messages(args.synthetic, args.seed, args.sentences)
+    events = make_events(items, args.batch_size, args.packed, args.chunked)
+
+    # The handler prints one EMF line per request; keep it for the stage summary
+    emf_output = LineCollector()
+    with redirect_stdout(emf_output):
+        for _ in range(args.warmup):
+            lambda_handler(next(events), None)
+        emf_output.clear()
+        faults = ('calls', 'throttled', 'errors', 'timeouts', 'slowed')
+        faults_before = {name: getattr(stub, name) for name in faults}
+        model_calls_before = dict(stub.model_calls)
+
+        run = LoadRun(lambda_handler, events)
+        if args.rps:
+            elapsed = run.run_rate(args.rps, args.requests, args.duration, args.max_in_flight)
+        else:
+            elapsed = run.run_concurrency(args.concurrency, args.requests, args.duration)
+
+    completed = len(run.latencies)
+    results: Dict[str, Any] = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'config': {
+            'mode': 'rate' if args.rps else 'concurrency',
+            'concurrency': None if args.rps else args.concurrency,
+            'target_rps': args.rps,
+            'corpus': args.corpus or f'synthetic:{args.synthetic}x{args.sentences}',
+            'batch_size': args.batch_size,
+            'packed': args.packed,
+            'chunked': args.chunked,
+            'latency_ms': args.latency_ms,
+            'jitter_ms': args.jitter_ms,
+            'throttle_rate': args.throttle_rate,
+            'error_rate': args.error_rate,
+            'timeout_rate': args.timeout_rate,
+            'slow_rate': args.slow_rate,
+            'slow_ms': args.slow_ms,
+            'token_ms': args.token_ms,
+            'prompt_ms_per_kchar': args.prompt_ms_per_kchar,
+            'streaming': args.streaming,
+            'guard': not args.no_guard,
+            'hedge': args.hedge,
+            'models': [route.model_id for route in model_router.routes],
+            'model_latency': args.model_latency,
+            'fail_models': args.fail_model,
+            'lexicon': args.lexicon,
+            'cache': args.cache,
+            'seed': args.seed,
+        },
+        'requests': completed,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(completed / elapsed, 2) if elapsed else 0.0,
+        'messages_per_second': round(run.items / elapsed, 2) if elapsed else 0.0,
+        'status_codes': {str(code): count for code, count in sorted(run.status_codes.items())},
+        'item_errors': run.item_errors,
+        'latency_ms': percentiles(run.latencies),
+        'model_calls': stub.calls - faults_before['calls'],
+        'model_throttled': stub.throttled - faults_before['throttled'],
+        'model_errors': stub.errors - faults_before['errors'],
+        'model_timeouts': stub.timeouts - faults_before['timeouts'],
+        'model_slowed': stub.slowed - faults_before['slowed'],
+        'model_calls_by_model': {model: count - model_calls_before.get(model, 0)
+                                 for model, count in sorted(stub.model_calls.items())},
+        'router': model_router.stats(),
+        'stage_mean_ms': stage_means(emf_output.lines, completed),
+    }
+    report = json.dumps(results, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            output.write(report + '\n')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for text normalization: legacy sanitize/validate vs. normalize
+
+The legacy functions are reproduced here exactly as they were before the
+normalize module existed, so both sides can be compared in one run. Before
+timing, the script checks that both produce identical output on the
+benchmark inputs and on randomly generated edge cases.
+
+Usage:
+    python benchmarks/bench_normalize.py
+    python benchmarks/bench_normalize.py --batch-size 1000 --repeat 5
+"""
+import argparse
+import html
+import json
+import os
+import random
+import re
+import sys
+import timeit
+from typing import Callable, Dict, List, Optional, Tuple
+
+SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'services', 'sentiment')
+sys.path.insert(0, SERVICE_DIR)
+
+from config import Config
+from normalize import normalize_text, sanitize_many, validate_many
+
+def legacy_sanitize_text(text: str) -> str:
+    if not text:
+        return ""
+    text = html.unescape(text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
+    text = text.strip()
+    return text
+
+def legacy_validate_message(message: str) -> Tuple[bool, Optional[str]]:
+    if not message:
+        return False, "Message is required"
+    sanitized = legacy_sanitize_text(message)
+    if not sanitized:
+        return False, "Message cannot be empty"
+    if len(sanitized) < Config.MIN_MESSAGE_LENGTH:
+        return False, f"Message must be at least {Config.MIN_MESSAGE_LENGTH} character(s)"
+    if len(sanitized) > Config.MAX_MESSAGE_LENGTH:
+        return False, f"Message must be less than {Config.MAX_MESSAGE_LENGTH} characters"
+    return True, None
+
+def legacy_pipeline(texts: List[str]) -> List[Tuple[bool, Optional[str]]]:
+    # Handler behaviour: sanitize, then validate (which sanitizes again)
+    return [legacy_validate_message(legacy_sanitize_text(text)) for text in texts]
+
+def new_pipeline(texts: List[str]) -> List[Tuple[bool, Optional[str]]]:
+    return validate_many(sanitize_many(texts))
+
+def make_inputs(seed: int) -> Dict[str, str]:
+    rng = random.Random(seed)
+    words = ['great', 'service', 'but', 'the', 'app', 'keeps', 'crashing', '&amp;', 'really', 'slow']
+    short = 'I love this   product!\tIt works &amp; looks great.'
+    long_words = []
+    while sum(len(word) + 1 for word in long_words) < 4990:
+        long_words.append(rng.choice(words))
+        if rng.random() < 0.05:
+            long_words.append(rng.choice(['\n', '  ', '\t', '\x07']))
+    return {'short': short, 'long_5000': ' '.join(long_words)[:4990]}
+
+def fuzz_equivalence(cases: int, seed: int) -> None:
+    rng = random.Random(seed)
+    alphabet = ['a', 'b', ' ', '  ', '\t', '\n', '\r', '\x0b', '\x0c', '\x1c', '\x1f', '\x00', '\x07',
+                '\x1b', '\x7f', '\x85', '\xa0', ' ', '&amp;', '&lt;', '&#9;', '&nbsp;', 'é']
+    for _ in range(cases):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        expected = legacy_sanitize_text(text)
+        actual = normalize_text(text)
+        if expected != actual:
+            raise SystemExit(f'Mismatch for {text!r}: {expected!r} != {actual!r}')
+
+def best_of(func: Callable[[], object], number: int, repeat: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Normalization microbenchmarks')
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--fuzz-cases', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    
+    fuzz_equivalence(args.fuzz_cases, args.seed)
+    inputs = make_inputs(args.seed)
+    
+    results = []
+    for name, text in inputs.items():
+        assert legacy_sanitize_text(text) == normalize_text(text)
+        batch = [text] * args.batch_size
+        number = 2000 if name == 'short' else 50
+        legacy_single = best_of(lambda: legacy_sanitize_text(text), number, args.repeat)
+        new_single = best_of(lambda: normalize_text(text), number, args.repeat)
+        legacy_batch = best_of(lambda: legacy_pipeline(batch), max(1, number // args.batch_size), args.repeat)
+        new_batch = best_of(lambda: new_pipeline(batch), max(1, number // args.batch_size), args.repeat)
+        results.append({
+            'input': name,
+            'length': len(text),
+            'sanitize_us': {'legacy': round(legacy_single * 1e6, 2), 'new': round(new_single * 1e6, 2)},
+            f'sanitize_validate_batch_{args.batch_size}_ms': {
+                'legacy': round(legacy_batch * 1e3, 3),
+                'new': round(new_batch * 1e3, 3)
+            },
+            'batch_speedup': round(legacy_batch / new_batch, 2)
+        })
+    
+    print(json.dumps({'fuzz_cases_identical': args.fuzz_cases, 'results': results}, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+History search latency with the inverted index
+
+Builds a synthetic ColumnarHistory (a Zipf-like vocabulary plus a handful of
+very common words), indexes it and times representative queries: rare and
+common tokens, multi-term intersections, prefixes, and label/time filters.
+A linear scan over the decoded messages is timed once for comparison.
+
+Usage:
+    python benchmarks/bench_search_index.py --rows 1000000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Any, Callable, Dict, List
+
+WEB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'web')
+sys.path.insert(0, WEB_DIR)
+
+from columnar import ColumnarHistory
+from search_index import SearchIndex, tokenize
+
+LABELS = {1: 'positive', 0: 'neutral', -1: 'negative'}
+COMMON_WORDS = ('the', 'service', 'great', 'slow', 'delivery', "don't", 'love', 'app')
+
+def make_history(rows: int, vocabulary: int, seed: int) -> ColumnarHistory:
+    rng = random.Random(seed)
+    words = [f'term{i}' for i in range(vocabulary)]
+    cumulative = list(accumulate(1 / (rank + 1) for rank in range(vocabulary)))
+    start = datetime(2025, 1, 1)
+    history = ColumnarHistory()
+    batch: List[Dict[str, Any]] = []
+    for i in range(rows):
+        score = rng.choice((1, 0, -1))
+        length = rng.randint(4, 16)
+        tokens = rng.choices(words, cum_weights=cumulative, k=length // 2) + rng.choices(COMMON_WORDS, k=length - length // 2)
+        rng.shuffle(tokens)
+        batch.append({
+            'timestamp': start + timedelta(seconds=i * 7),
+            'message': ' '.join(tokens),
+            'sentiment_score': score,
+            'sentiment_label': LABELS[score]
+        })
+        if len(batch) == 10000:
+            history.extend(batch)
+            batch = []
+    history.extend(batch)
+    return history
+
+def time_ms(func: Callable[[], Any], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(min(samples), 3)
+
+def scan(history: ColumnarHistory, query: str) -> int:
+    terms = set(tokenize(query))
+    return sum(1 for message in history.messages() if terms <= set(tokenize(message)))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='History search benchmark')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--vocabulary', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    history = make_history(args.rows, args.vocabulary, args.seed)
+    index = SearchIndex(history)
+    build_start = time.perf_counter()
+    index.refresh()
+    build_s = time.perf_counter() - build_start
+
+    start = datetime(2025, 1, 1)
+    month = (start + timedelta(days=30), start + timedelta(days=60))
+    queries = {
+        'rare_token': dict(query='term40000'),
+        'common_token': dict(query='service'),
+        'two_common_tokens': dict(query='great service'),
+        'rare_and_common': dict(query='term123 delivery'),
+        'prefix': dict(query='term12*'),
+        'prefix_and_token': dict(query='term12* love'),
+        'token_label_month': dict(query='slow', labels=['negative'], start=month[0], end=month[1]),
+        'label_only': dict(labels=['positive']),
+        'month_only': dict(start=month[0], end=month[1]),
+        'page_100': dict(query='the', page=100),
+    }
+
+    results: Dict[str, Any] = {
+        'rows': args.rows,
+        'vocabulary_indexed': index.vocabulary_size,
+        'index_build_s': round(build_s, 2),
+    }
+    for name, kwargs in queries.items():
+        found = index.search(**kwargs)
+        results[f'{name}_ms'] = time_ms(lambda: index.search(**kwargs), args.repeat)
+        results[f'{name}_matches'] = found.total
+
+    scan_start = time.perf_counter()
+    assert scan(history, 'great service') == results['two_common_tokens_matches']
+    results['linear_scan_two_tokens_ms'] = round((time.perf_counter() - scan_start) * 1000, 1)
+
+    extra = {'timestamp': datetime(2026, 1, 1), 'message': 'fresh entry', 'sentiment_score': 0, 'sentiment_label': 'neutral'}
+    history.append(extra)
+    results['append_and_reindex_ms'] = time_ms(lambda: (history.append(extra), index.refresh()), args.repeat)
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
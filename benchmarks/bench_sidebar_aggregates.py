@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Sidebar rerun cost with 100k history rows: per-rerun DataFrame vs. running aggregates
+
+The legacy path reproduces what the sidebar did on every rerun: build a
+DataFrame from the history list, value_counts for the pie chart and three
+boolean filters for the rate metrics. The new path reads the precomputed
+SentimentAggregates. Chart rendering itself is identical and not measured.
+
+Usage:
+    python benchmarks/bench_sidebar_aggregates.py --rows 100000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+WEB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'web')
+sys.path.insert(0, WEB_DIR)
+
+import pandas as pd
+
+from aggregates import SentimentAggregates
+
+LABELS = {1: 'positive', 0: 'neutral', -1: 'negative'}
+
+def make_history(rows: int, seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    history = []
+    for i in range(rows):
+        score = rng.choice((1, 0, -1))
+        history.append({
+            'timestamp': start + timedelta(seconds=i * 7),
+            'message': f'synthetic message {i}',
+            'sentiment_score': score,
+            'sentiment_label': LABELS[score]
+        })
+    return history
+
+def legacy_rerun(history: List[Dict[str, Any]]) -> tuple:
+    df = pd.DataFrame(history)
+    sentiment_counts = df['sentiment_label'].value_counts()
+    total = len(df)
+    positive = len(df[df['sentiment_score'] == 1])
+    neutral = len(df[df['sentiment_score'] == 0])
+    negative = len(df[df['sentiment_score'] == -1])
+    return sentiment_counts, total, positive / total, neutral / total, negative / total
+
+def aggregates_rerun(aggregates: SentimentAggregates) -> tuple:
+    labels, counts = aggregates.distribution()
+    return labels, counts, aggregates.total, aggregates.rate('positive'), aggregates.rate('neutral'), aggregates.rate('negative')
+
+def time_ms(func: Callable[[], Any], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(min(samples), 4)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Sidebar aggregate benchmark')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    history = make_history(args.rows, args.seed)
+
+    build_start = time.perf_counter()
+    aggregates = SentimentAggregates()
+    aggregates.extend(history)
+    build_ms = (time.perf_counter() - build_start) * 1000
+
+    _, total, positive, _, _ = legacy_rerun(history)
+    assert total == aggregates.total
+    assert abs(positive * 100 - aggregates.rate('positive')) < 1e-9
+    results = {
+        'rows': args.rows,
+        'legacy_rerun_ms': time_ms(lambda: legacy_rerun(history), args.repeat),
+        'aggregates_rerun_ms': time_ms(lambda: aggregates_rerun(aggregates), args.repeat),
+        'aggregates_initial_build_ms': round(build_ms, 2),
+    }
+
+    extra = make_history(1, args.seed + 1)[0]
+    results['aggregates_append_ms'] = time_ms(lambda: aggregates.add(extra), args.repeat)
+    print(json.dumps(results, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Evaluate the lexicon fast path against a labeled JSONL file
+
+Each input line is a JSON object with a "message" and either a numeric
+"score" (-1, 0, 1) or a "label" ("negative", "neutral", "positive").
+For each confidence threshold the report shows how many messages the
+lexicon answers locally (Bedrock calls avoided) and how often those
+answers agree with the labels.
+
+Usage:
+    python benchmarks/evaluate_lexicon.py benchmarks/data/labeled_sentiment.jsonl
+    python benchmarks/evaluate_lexicon.py labeled.jsonl --thresholds 0.5,0.7,0.8,0.9
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List, Tuple
+
+SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'services', 'sentiment')
+sys.path.insert(0, SERVICE_DIR)
+
+from config import Config
+from lexicon import score_lexicon
+from utils import sanitize_text
+
+LABEL_SCORES = {label: score for score, label in Config.SENTIMENT_LABELS.items()}
+
+def load_labeled(path: str) -> List[Tuple[str, int]]:
+    """Read (sanitized message, expected score) pairs from a JSONL file"""
+    samples = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if 'score' in record:
+                expected = int(record['score'])
+            else:
+                expected = LABEL_SCORES[record['label']]
+            samples.append((sanitize_text(record['message']), expected))
+    return samples
+
+def evaluate(samples: List[Tuple[str, int]], threshold: float) -> Dict[str, Any]:
+    """Score every sample and summarize the lexicon tier at one threshold"""
+    answered = 0
+    agreed = 0
+    for message, expected in samples:
+        score, confidence = score_lexicon(message)
+        if confidence >= threshold:
+            answered += 1
+            agreed += int(score == expected)
+    total = len(samples)
+    return {
+        'threshold': threshold,
+        'total': total,
+        'answered_locally': answered,
+        'bedrock_calls_avoided': round(answered / total, 4) if total else 0.0,
+        'agreement_rate': round(agreed / answered, 4) if answered else None,
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Evaluate the lexicon fast path')
+    parser.add_argument('path', help='Labeled JSONL file')
+    parser.add_argument(
+        '--thresholds',
+        default=str(Config.LEXICON_CONFIDENCE_THRESHOLD),
+        help='Comma-separated confidence thresholds to compare'
+    )
+    args = parser.parse_args()
+    
+    samples = load_labeled(args.path)
+    thresholds = [float(value) for value in args.thresholds.split(',')]
+    print(json.dumps([evaluate(samples, threshold) for threshold in thresholds], indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -2,9 +2,15 @@ from aws_cdk import (
     Stack,
     CfnOutput,
     Duration,
+    RemovalPolicy,
     aws_lambda as _lambda,
+    aws_lambda_event_sources as event_sources,
     aws_apigateway as apigateway,
+    aws_dynamodb as dynamodb,
+    aws_events as events,
+    aws_events_targets as targets,
     aws_iam as iam,
+    aws_sqs as sqs,
 )
 from constructs import Construct
 
@@ -13,30 +19,103 @@ class SentimentAnalysisStack(Stack):
     def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
+        # Async jobs: one queue message per chunk, results per chunk in DynamoDB
+        job_table = dynamodb.Table(
+            self, "SentimentJobTable",
+            partition_key=dynamodb.Attribute(name="job_id", type=dynamodb.AttributeType.STRING),
+            sort_key=dynamodb.Attribute(name="part", type=dynamodb.AttributeType.STRING),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            time_to_live_attribute="expires_at",
+            removal_policy=RemovalPolicy.DESTROY
+        )
+        job_dead_letter_queue = sqs.Queue(
+            self, "SentimentJobDeadLetterQueue",
+            retention_period=Duration.days(14)
+        )
+        job_queue = sqs.Queue(
+            self, "SentimentJobQueue",
+            # At least six times the worker timeout, as recommended for Lambda event sources
+            visibility_timeout=Duration.minutes(30),
+            dead_letter_queue=sqs.DeadLetterQueue(max_receive_count=3, queue=job_dead_letter_queue)
+        )
+        job_environment = {
+            "JOBS_QUEUE_URL": job_queue.queue_url,
+            "JOBS_TABLE": job_table.table_name,
+            # Matches max_receive_count: the last delivery stores error results instead of failing
+            "JOBS_MAX_ATTEMPTS": "3"
+        }
+        # Router candidates, primary first: cdk deploy -c bedrock_model_ids=<model-id>,<model-id>
+        model_ids = self.node.try_get_context("bedrock_model_ids")
+        model_environment = {"BEDROCK_MODEL_IDS": model_ids} if model_ids else {}
+
         # Sentiment Analysis Lambda Function
         sentiment_lambda = _lambda.Function(
             self, "SentimentAnalysisFunction",
-            runtime=_lambda.Runtime.PYTHON_3_9,
+            runtime=_lambda.Runtime.PYTHON_3_12,
             handler="sentiment_analysis.lambda_handler",
             code=_lambda.Code.from_asset("../services/sentiment"),
             function_name="SentimentAnalysisLambda",
-            timeout=Duration.seconds(30)
+            timeout=Duration.seconds(30),
+            # Lambda allocates CPU in proportion to memory; more CPU shortens cold-start imports and client setup
+            memory_size=1024,
+            environment={
+                # Build the Bedrock client in the background during container init
+                "BEDROCK_PREWARM": "true",
+                **job_environment,
+                **model_environment
+            }
+        )
+        
+        # Job worker: same code, invoked by SQS in batches of chunks
+        job_worker = _lambda.Function(
+            self, "SentimentJobWorkerFunction",
+            runtime=_lambda.Runtime.PYTHON_3_12,
+            handler="sentiment_analysis.job_worker_handler",
+            code=_lambda.Code.from_asset("../services/sentiment"),
+            timeout=Duration.minutes(5),
+            memory_size=1024,
+            environment={
+                "BEDROCK_PREWARM": "true",
+                **job_environment,
+                **model_environment
+            }
         )
+        job_worker.add_event_source(event_sources.SqsEventSource(
+            job_queue,
+            batch_size=10,
+            max_batching_window=Duration.seconds(1),
+            report_batch_item_failures=True
+        ))
+        job_queue.grant_send_messages(sentiment_lambda)
+        job_table.grant_read_write_data(sentiment_lambda)
+        job_table.grant_read_write_data(job_worker)
+        
+        # Keep-warm ping; handled without calling Bedrock
+        warmup_rule = events.Rule(
+            self, "SentimentAnalysisWarmup",
+            schedule=events.Schedule.rate(Duration.minutes(5))
+        )
+        warmup_rule.add_target(targets.LambdaFunction(
+            sentiment_lambda,
+            event=events.RuleTargetInput.from_object({"warmup": True})
+        ))
         
         # Add Bedrock permissions
-        sentiment_lambda.add_to_role_policy(
-            iam.PolicyStatement(
-                effect=iam.Effect.ALLOW,
-                actions=["bedrock:InvokeModel"],
-                resources=[
-                    "arn:aws:bedrock:*::foundation-model/anthropic.*",
-                    "arn:aws:bedrock:*::foundation-model/amazon.*",
-                    "arn:aws:bedrock:*::foundation-model/cohere.*",
-                    "arn:aws:bedrock:*::foundation-model/meta.*",
-                    "arn:aws:bedrock:*::foundation-model/mistral.*"
-                ]
-            )
+        bedrock_policy = iam.PolicyStatement(
+            effect=iam.Effect.ALLOW,
+            actions=["bedrock:InvokeModel", "bedrock:InvokeModelWithResponseStream"],
+            resources=[
+                "arn:aws:bedrock:*::foundation-model/anthropic.*",
+                "arn:aws:bedrock:*::foundation-model/amazon.*",
+                "arn:aws:bedrock:*::foundation-model/cohere.*",
+                "arn:aws:bedrock:*::foundation-model/meta.*",
+                "arn:aws:bedrock:*::foundation-model/mistral.*",
+                # Cross-region inference profiles such as us.anthropic.*
+                f"arn:aws:bedrock:*:{self.account}:inference-profile/*"
+            ]
         )
+        sentiment_lambda.add_to_role_policy(bedrock_policy)
+        job_worker.add_to_role_policy(bedrock_policy)
 
         # API Gateway
         api = apigateway.RestApi(
@@ -54,6 +133,12 @@ class SentimentAnalysisStack(Stack):
         health_resource = api.root.add_resource("health")
         health_resource.add_method("GET", sentiment_integration)
         
+        # Async jobs: POST /jobs submits, GET /jobs/{job_id} polls
+        jobs_resource = api.root.add_resource("jobs")
+        jobs_resource.add_method("POST", sentiment_integration)
+        job_resource = jobs_resource.add_resource("{job_id}")
+        job_resource.add_method("GET", sentiment_integration)
+        
         # Output the API Gateway URL
         CfnOutput(
             self, "ApiUrl",
@@ -0,0 +1,212 @@
+"""
+Shared Bedrock runtime client for the sentiment analysis service
+
+boto3 is imported when the client is first built rather than at module
+load, so health checks, CORS preflights and tools that inject a client
+never pay for it. Inside Lambda the client is prewarmed on a background
+thread during container init.
+"""
+import json
+import threading
+from typing import Any, Callable, Dict, Optional
+from config import Config
+from model_router import ModelFamily, family_for
+from timing import stage
+
+class BedrockClientManager:
+    """
+    Owns a single Bedrock runtime client per Lambda container
+    
+    The client is built on first use and then reused by every warm
+    invocation and every batch worker, so endpoint resolution and the
+    TLS handshake are paid once instead of per request.
+    """
+    
+    def __init__(self, region_name: Optional[str] = None, endpoint_url: Optional[str] = None):
+        self.region_name = region_name or Config.BEDROCK_REGION
+        self.endpoint_url = endpoint_url or Config.BEDROCK_ENDPOINT_URL
+        self._client: Optional[Any] = None
+        self._lock = threading.Lock()
+        self._prewarm_thread: Optional[threading.Thread] = None
+    
+    def get_client(self) -> Any:
+        """
+        Return the shared client, creating it on first use
+        
+        Returns:
+            Bedrock runtime client
+        """
+        client = self._client
+        if client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self.create_client()
+                client = self._client
+        return client
+    
+    def create_client(self) -> Any:
+        """
+        Build a new Bedrock runtime client with pooled, keep-alive connections
+        
+        Returns:
+            Bedrock runtime client
+        """
+        import boto3
+        from botocore.config import Config as BotoConfig
+        
+        boto_config = BotoConfig(
+            max_pool_connections=Config.BEDROCK_MAX_POOL_CONNECTIONS,
+            connect_timeout=Config.BEDROCK_CONNECT_TIMEOUT,
+            read_timeout=Config.BEDROCK_READ_TIMEOUT,
+            tcp_keepalive=True,
+            # The Bedrock guard retries with its own backoff; botocore retrying too would multiply attempts
+            retries={
+                'max_attempts': 0 if Config.BEDROCK_GUARD_ENABLED else Config.BEDROCK_MAX_RETRIES,
+                'mode': 'standard'
+            }
+        )
+        return boto3.client(
+            'bedrock-runtime',
+            region_name=self.region_name,
+            endpoint_url=self.endpoint_url,
+            config=boto_config
+        )
+    
+    def prewarm(self) -> None:
+        """
+        Start building the client on a background thread
+        
+        Requests that need the client before it is ready wait on the same
+        lock as get_client; requests that do not (health, OPTIONS) are not
+        delayed. Failures are left for the first real call to surface.
+        """
+        if self._client is not None or self._prewarm_thread is not None:
+            return
+        
+        def build() -> None:
+            try:
+                self.get_client()
+            except Exception:
+                pass
+        
+        self._prewarm_thread = threading.Thread(target=build, name='bedrock-prewarm', daemon=True)
+        self._prewarm_thread.start()
+    
+    @property
+    def ready(self) -> bool:
+        """Whether the client has been built"""
+        return self._client is not None
+    
+    def set_client(self, client: Any) -> None:
+        """
+        Inject a client, e.g. a fake Bedrock client in tests
+        
+        Args:
+            client: Object exposing the Bedrock runtime methods used by the service
+        """
+        with self._lock:
+            self._client = client
+    
+    def reset(self) -> None:
+        """Drop the current client so the next call builds a fresh one"""
+        with self._lock:
+            self._client = None
+
+# Module-level manager, created once per container
+client_manager = BedrockClientManager()
+if Config.BEDROCK_PREWARM:
+    client_manager.prewarm()
+
+def get_bedrock_client() -> Any:
+    """
+    Get the shared Bedrock runtime client
+    
+    Returns:
+        Bedrock runtime client
+    """
+    return client_manager.get_client()
+
+def invoke_text_model(bedrock: Any, prompt: str, model_id: Optional[str] = None,
+                      max_tokens: Optional[int] = None) -> str:
+    """
+    Invoke a text model and return its generation
+    
+    Args:
+        bedrock: Bedrock runtime client
+        prompt: Prompt text, wrapped in the model family's template before sending
+        model_id: Bedrock model ID (defaults to Config.BEDROCK_MODEL_ID)
+        max_tokens: Generation limit (defaults to Config.BEDROCK_CONFIG["max_gen_len"])
+        
+    Returns:
+        Generated text
+    """
+    model_id = model_id or Config.BEDROCK_MODEL_ID
+    family = family_for(model_id)
+    request_body = build_request_body(family, prompt, max_tokens)
+    
+    with stage('bedrock'):
+        response = bedrock.invoke_model(
+            modelId=model_id,
+            body=json.dumps(request_body)
+        )
+        response_body = json.loads(response['body'].read())
+    return family.parse_response(response_body)
+
+def stream_text_model(bedrock: Any, prompt: str, is_complete: Callable[[str], bool],
+                      model_id: Optional[str] = None, max_tokens: Optional[int] = None) -> str:
+    """
+    Stream a text model's generation and stop early
+    
+    The response stream is closed as soon as is_complete accepts the text
+    generated so far, so the caller does not wait for the remaining tokens.
+    
+    Args:
+        bedrock: Bedrock runtime client
+        prompt: Prompt text, wrapped in the model family's template before sending
+        is_complete: Called with the accumulated generation after each chunk
+        model_id: Bedrock model ID (defaults to Config.BEDROCK_MODEL_ID)
+        max_tokens: Generation limit (defaults to Config.BEDROCK_CONFIG["max_gen_len"])
+        
+    Returns:
+        Generated text up to the point where it was complete
+    """
+    model_id = model_id or Config.BEDROCK_MODEL_ID
+    family = family_for(model_id)
+    request_body = build_request_body(family, prompt, max_tokens)
+    
+    with stage('bedrock'):
+        response = bedrock.invoke_model_with_response_stream(
+            modelId=model_id,
+            body=json.dumps(request_body)
+        )
+        stream = response['body']
+        generation = ''
+        try:
+            for event in stream:
+                chunk = event.get('chunk')
+                if chunk is None:
+                    continue
+                generation += family.parse_chunk(json.loads(chunk['bytes']))
+                if is_complete(generation):
+                    break
+        finally:
+            stream.close()
+    return generation
+
+def build_request_body(family: ModelFamily, prompt: str, max_tokens: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Build a model family's request body from the shared generation settings
+    
+    Args:
+        family: Model family of the target model
+        prompt: Prompt text before the family's template
+        max_tokens: Generation limit (defaults to Config.BEDROCK_CONFIG["max_gen_len"])
+        
+    Returns:
+        Request body for invoke_model or invoke_model_with_response_stream
+    """
+    return family.request_body(
+        family.format_prompt(prompt),
+        max_tokens or Config.BEDROCK_CONFIG["max_gen_len"],
+        Config.BEDROCK_CONFIG["temperature"]
+    )
@@ -0,0 +1,249 @@
+"""
+Server-side result cache for sentiment analysis
+
+Results are cached in a bounded in-memory LRU with TTL that lives for the
+lifetime of the Lambda container, optionally backed by a persistent second
+tier shared across containers.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+from config import Config
+
+def make_cache_key(sanitized_message: str, model_id: Optional[str] = None,
+                   prompt_version: Optional[str] = None) -> str:
+    """
+    Build a cache key from the sanitized message, model and prompt version
+    
+    Args:
+        sanitized_message: Output of sanitize_text
+        model_id: Model identity (defaults to the routed model list, Config.BEDROCK_MODEL_IDS)
+        prompt_version: Prompt version (defaults to Config.PROMPT_VERSION)
+        
+    Returns:
+        Hex digest cache key
+    """
+    model_id = model_id or ','.join(Config.BEDROCK_MODEL_IDS)
+    prompt_version = prompt_version or Config.PROMPT_VERSION
+    raw = f"{model_id}\x1f{prompt_version}\x1f{sanitized_message}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+class LRUTTLCache:
+    """Thread-safe bounded LRU cache whose entries expire after a TTL"""
+    
+    def __init__(self, max_entries: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a value, evicting the least recently used entry when full"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class CacheBackend(ABC):
+    """Interface for the persistent second cache tier"""
+    
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored value, or None if missing or expired"""
+    
+    @abstractmethod
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: int) -> None:
+        """Store a value with a time-to-live"""
+
+class SQLiteCacheBackend(CacheBackend):
+    """Local SQLite backend, suitable for tests and single-host tools"""
+    
+    def __init__(self, path: str = ":memory:"):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sentiment_cache "
+                "(cache_key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM sentiment_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return json.loads(row[0])
+    
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sentiment_cache (cache_key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + ttl_seconds)
+            )
+            self._conn.commit()
+
+class DynamoDBCacheBackend(CacheBackend):
+    """
+    DynamoDB backend for production
+    
+    Expects a table with a string partition key ``cache_key`` and DynamoDB TTL
+    enabled on the numeric ``expires_at`` attribute. Expired items are also
+    filtered on read since TTL deletion is not immediate.
+    """
+    
+    def __init__(self, table_name: str, client: Optional[Any] = None):
+        if client is None:
+            import boto3
+            client = boto3.client('dynamodb', region_name=Config.BEDROCK_REGION)
+        self.table_name = table_name
+        self._client = client
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        response = self._client.get_item(
+            TableName=self.table_name,
+            Key={'cache_key': {'S': key}}
+        )
+        item = response.get('Item')
+        if not item or float(item['expires_at']['N']) <= time.time():
+            return None
+        return json.loads(item['value']['S'])
+    
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: int) -> None:
+        self._client.put_item(
+            TableName=self.table_name,
+            Item={
+                'cache_key': {'S': key},
+                'value': {'S': json.dumps(value)},
+                'expires_at': {'N': str(int(time.time() + ttl_seconds))}
+            }
+        )
+
+class ResultCache:
+    """
+    Two-tier sentiment result cache with hit/miss counters
+    
+    Persistent backend failures are counted and otherwise ignored so that a
+    cache outage never fails a request.
+    """
+    
+    def __init__(self, memory: LRUTTLCache, backend: Optional[CacheBackend] = None,
+                 ttl_seconds: int = Config.CACHE_TTL_SECONDS):
+        self.memory = memory
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'memory_hits': 0, 'backend_hits': 0, 'misses': 0, 'backend_errors': 0}
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a result in memory, then in the persistent backend
+        
+        Args:
+            key: Cache key from make_cache_key
+            
+        Returns:
+            Cached result copy or None
+        """
+        value = self.memory.get(key)
+        if value is not None:
+            self._count('hits', 'memory_hits')
+            return dict(value)
+        
+        if self.backend is not None:
+            try:
+                value = self.backend.get(key)
+            except Exception:
+                value = None
+                self._count('backend_errors')
+            if value is not None:
+                self.memory.set(key, value)
+                self._count('hits', 'backend_hits')
+                return dict(value)
+        
+        self._count('misses')
+        return None
+    
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Store a result in both tiers
+        
+        Args:
+            key: Cache key from make_cache_key
+            value: Sentiment result
+        """
+        value = dict(value)
+        self.memory.set(key, value)
+        if self.backend is not None:
+            try:
+                self.backend.set(key, value, self.ttl_seconds)
+            except Exception:
+                self._count('backend_errors')
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the cache counters"""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['entries'] = len(self.memory)
+        return stats
+    
+    def _count(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self._stats[name] += 1
+
+def build_result_cache() -> Optional[ResultCache]:
+    """
+    Build the result cache described by Config
+    
+    Returns:
+        ResultCache, or None when caching is disabled
+    """
+    if not Config.CACHE_ENABLED:
+        return None
+    
+    backend: Optional[CacheBackend] = None
+    if Config.CACHE_BACKEND == 'sqlite':
+        backend = SQLiteCacheBackend(Config.CACHE_SQLITE_PATH)
+    elif Config.CACHE_BACKEND == 'dynamodb' and Config.CACHE_DYNAMODB_TABLE:
+        backend = DynamoDBCacheBackend(Config.CACHE_DYNAMODB_TABLE)
+    
+    memory = LRUTTLCache(Config.CACHE_MAX_ENTRIES, Config.CACHE_TTL_SECONDS)
+    return ResultCache(memory, backend)
+
+# Module-level cache, shared by all invocations in this container
+result_cache = build_result_cache()
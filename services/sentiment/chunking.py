@@ -0,0 +1,170 @@
+"""
+Long-message mode: split a message into bounded chunks and aggregate their scores
+
+Paragraphs are kept whole when they fit in a chunk and are otherwise split
+into sentences; a sentence longer than a chunk is split between words.
+Consecutive pieces are packed greedily up to the chunk size. Each chunk is
+normalized like a message, so raw text (with its paragraph breaks) and
+already-sanitized text (where only sentence boundaries remain) both work.
+"""
+import re
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional
+from normalize import normalize_text
+
+AGGREGATION_RULES = ('mean', 'weighted', 'majority')
+
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+# A sentence ends at ., ! or ? (plus any closing quotes or brackets) followed by whitespace
+_SENTENCE = re.compile(r'.+?(?:[.!?]+["\')\]]*(?=\s)|$)')
+
+class ChunkOptions(NamedTuple):
+    """Per-request long-message settings"""
+    aggregation: str
+    include_chunks: bool
+
+def split_message(text: str, max_chars: int) -> List[str]:
+    """
+    Split a message into normalized chunks of at most max_chars characters
+    
+    Args:
+        text: Raw or sanitized message
+        max_chars: Chunk size limit
+        
+    Returns:
+        Chunks in message order
+    """
+    pieces: List[str] = []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = normalize_text(paragraph)
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        for sentence in _SENTENCE.findall(paragraph):
+            pieces.extend(split_words(sentence, max_chars))
+    
+    chunks: List[str] = []
+    current = ''
+    for piece in pieces:
+        if current and len(current) + 1 + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f'{current} {piece}' if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+def split_words(sentence: str, max_chars: int) -> List[str]:
+    """
+    Split an overlong sentence between words, cutting words only when one is longer than max_chars
+    
+    Args:
+        sentence: Normalized sentence
+        max_chars: Piece size limit
+        
+    Returns:
+        Pieces of at most max_chars characters
+    """
+    sentence = sentence.strip()
+    if len(sentence) <= max_chars:
+        return [sentence] if sentence else []
+    
+    pieces: List[str] = []
+    current = ''
+    for word in sentence.split(' '):
+        while len(word) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ''
+            pieces.append(word[:max_chars])
+            word = word[max_chars:]
+        if current and len(current) + 1 + len(word) > max_chars:
+            pieces.append(current)
+            current = word
+        else:
+            current = f'{current} {word}' if current else word
+    if current:
+        pieces.append(current)
+    return pieces
+
+def score_from_value(value: float) -> int:
+    """Round an aggregated value in [-1, 1] to the nearest score, halves away from zero"""
+    if value >= 0.5:
+        return 1
+    if value <= -0.5:
+        return -1
+    return 0
+
+def aggregate_scores(scores: List[int], lengths: List[int], rule: str) -> Dict[str, Any]:
+    """
+    Combine chunk scores into one score
+    
+    Args:
+        scores: Chunk scores (-1, 0 or 1)
+        lengths: Chunk lengths in characters, used as weights
+        rule: "mean", "weighted" (by length) or "majority"; majority ties
+            fall back to the weighted rule
+        
+    Returns:
+        Aggregated score, the mean it was derived from (length-weighted for
+        "weighted") and whether both positive and negative chunks occurred
+        
+    Raises:
+        ValueError: If the rule is unknown or there are no scores
+    """
+    if rule not in AGGREGATION_RULES:
+        raise ValueError(f'Aggregation must be one of: {", ".join(AGGREGATION_RULES)}')
+    if not scores:
+        raise ValueError('No chunk scores to aggregate')
+    
+    mean = sum(scores) / len(scores)
+    weighted_mean = sum(score * length for score, length in zip(scores, lengths)) / max(1, sum(lengths))
+    
+    if rule == 'mean':
+        score, value = score_from_value(mean), mean
+    elif rule == 'weighted':
+        score, value = score_from_value(weighted_mean), weighted_mean
+    else:
+        ranked = Counter(scores).most_common()
+        tied = len(ranked) > 1 and ranked[0][1] == ranked[1][1]
+        score = score_from_value(weighted_mean) if tied else ranked[0][0]
+        value = mean
+    
+    return {
+        'score': score,
+        'mean_score': round(value, 3),
+        'mixed': 1 in scores and -1 in scores
+    }
+
+def parse_chunk_options(body: Dict[str, Any], enabled: bool,
+                        default_aggregation: str) -> Optional[ChunkOptions]:
+    """
+    Read long-message settings from a request body
+    
+    Args:
+        body: Parsed request body; "chunked", "aggregation" and "include_chunks" are optional
+        enabled: Whether long-message mode is on when the body does not say
+        default_aggregation: Rule used when the body does not name one
+        
+    Returns:
+        ChunkOptions, or None when long-message mode is off for this request
+        
+    Raises:
+        ValueError: If a setting has the wrong type or names an unknown rule
+    """
+    chunked = body.get('chunked', enabled)
+    if not isinstance(chunked, bool):
+        raise ValueError('chunked must be true or false')
+    if not chunked:
+        return None
+    
+    aggregation = body.get('aggregation', default_aggregation)
+    if aggregation not in AGGREGATION_RULES:
+        raise ValueError(f'Aggregation must be one of: {", ".join(AGGREGATION_RULES)}')
+    include_chunks = body.get('include_chunks', False)
+    if not isinstance(include_chunks, bool):
+        raise ValueError('include_chunks must be true or false')
+    return ChunkOptions(aggregation, include_chunks)
@@ -2,21 +2,115 @@
 Configuration settings for the sentiment analysis application
 """
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 class Config:
     """Application configuration"""
     
     # Bedrock Configuration
-    BEDROCK_MODEL_ID: str = "meta.llama3-8b-instruct-v1:0"
+    BEDROCK_MODEL_ID: str = os.getenv("BEDROCK_MODEL_ID", "meta.llama3-8b-instruct-v1:0")
+    # Candidate models for the router, comma-separated; the first is the primary
+    BEDROCK_MODEL_IDS: List[str] = [
+        model_id.strip() for model_id in os.getenv("BEDROCK_MODEL_IDS", BEDROCK_MODEL_ID).split(",")
+        if model_id.strip()
+    ]
     BEDROCK_REGION: str = os.getenv("AWS_REGION", "us-west-2")
+    BEDROCK_ENDPOINT_URL: Optional[str] = os.getenv("BEDROCK_ENDPOINT_URL") or None
     
     # Lambda Configuration
     LAMBDA_TIMEOUT: int = 30
     MAX_MESSAGE_LENGTH: int = 5000
     MIN_MESSAGE_LENGTH: int = 1
     
+    # Batch Configuration
+    MAX_BATCH_SIZE: int = int(os.getenv("MAX_BATCH_SIZE", "100"))
+    BATCH_MAX_WORKERS: int = int(os.getenv("BATCH_MAX_WORKERS", "8"))
+    
+    # Bedrock Client Configuration (shared across warm invocations)
+    BEDROCK_MAX_POOL_CONNECTIONS: int = int(
+        os.getenv("BEDROCK_MAX_POOL_CONNECTIONS", str(max(10, BATCH_MAX_WORKERS + 2)))
+    )
+    BEDROCK_CONNECT_TIMEOUT: float = float(os.getenv("BEDROCK_CONNECT_TIMEOUT", "2"))
+    BEDROCK_READ_TIMEOUT: float = float(os.getenv("BEDROCK_READ_TIMEOUT", "20"))
+    # Retries for throttling, timeouts and transient model errors (done by the guard when it is enabled)
+    BEDROCK_MAX_RETRIES: int = int(os.getenv("BEDROCK_MAX_RETRIES", "2"))
+    # Build the client on a background thread during container init (on by default inside Lambda)
+    BEDROCK_PREWARM: bool = os.getenv(
+        "BEDROCK_PREWARM", "true" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "false"
+    ).lower() == "true"
+    # Stream generations and stop at the first score token, falling back to invoke_model on errors
+    BEDROCK_STREAMING: bool = os.getenv("BEDROCK_STREAMING", "false").lower() == "true"
+    
+    # Result Cache Configuration
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+    CACHE_TTL_SECONDS: int = int(os.getenv("CACHE_TTL_SECONDS", "3600"))
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "")  # "", "sqlite" or "dynamodb"
+    CACHE_SQLITE_PATH: str = os.getenv("CACHE_SQLITE_PATH", "/tmp/sentiment_cache.db")
+    CACHE_DYNAMODB_TABLE: str = os.getenv("CACHE_DYNAMODB_TABLE", "")
+    
+    # Single-flight: concurrent identical messages share one Bedrock call
+    SINGLE_FLIGHT_ENABLED: bool = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+    
+    # Bedrock Guard: adaptive concurrency limit, jittered retries, circuit breaker and optional hedging
+    BEDROCK_GUARD_ENABLED: bool = os.getenv("BEDROCK_GUARD_ENABLED", "true").lower() == "true"
+    BEDROCK_CONCURRENCY_INITIAL: float = float(os.getenv("BEDROCK_CONCURRENCY_INITIAL", str(BATCH_MAX_WORKERS)))
+    BEDROCK_CONCURRENCY_MIN: float = float(os.getenv("BEDROCK_CONCURRENCY_MIN", "1"))
+    BEDROCK_CONCURRENCY_MAX: float = float(os.getenv("BEDROCK_CONCURRENCY_MAX", str(BATCH_MAX_WORKERS * 4)))
+    BEDROCK_ADMISSION_TIMEOUT: float = float(os.getenv("BEDROCK_ADMISSION_TIMEOUT", "2"))  # Seconds
+    BEDROCK_RETRY_BASE_MS: float = float(os.getenv("BEDROCK_RETRY_BASE_MS", "100"))
+    BEDROCK_RETRY_MAX_MS: float = float(os.getenv("BEDROCK_RETRY_MAX_MS", "2000"))
+    CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_SECONDS: float = float(os.getenv("CIRCUIT_RESET_SECONDS", "10"))
+    # Send a duplicate of calls slower than the observed p95 (costs extra model calls)
+    HEDGE_ENABLED: bool = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+    HEDGE_MIN_DELAY_MS: float = float(os.getenv("HEDGE_MIN_DELAY_MS", "50"))
+    
+    # Model Router: per-model rolling stats, fastest healthy model first, failover on errors
+    ROUTER_WINDOW: int = int(os.getenv("ROUTER_WINDOW", "100"))  # Recent calls kept per model
+    ROUTER_MIN_SAMPLES: int = int(os.getenv("ROUTER_MIN_SAMPLES", "10"))
+    ROUTER_ERROR_THRESHOLD: float = float(os.getenv("ROUTER_ERROR_THRESHOLD", "0.5"))
+    ROUTER_COOLDOWN_SECONDS: float = float(os.getenv("ROUTER_COOLDOWN_SECONDS", "30"))
+    # Fraction of calls tried on another healthy model first to keep its latency current
+    ROUTER_EXPLORE_RATE: float = float(os.getenv("ROUTER_EXPLORE_RATE", "0.05"))
+    
+    # Async Jobs (POST /jobs, GET /jobs/{id}); an in-process queue and store are used unless both are set
+    JOBS_QUEUE_URL: str = os.getenv("JOBS_QUEUE_URL", "")
+    JOBS_TABLE: str = os.getenv("JOBS_TABLE", "")
+    JOBS_MAX_MESSAGES: int = int(os.getenv("JOBS_MAX_MESSAGES", "10000"))
+    JOBS_CHUNK_SIZE: int = int(os.getenv("JOBS_CHUNK_SIZE", "25"))  # Messages per queue message
+    # Encoded bytes per chunk, under SQS's 256 KB message limit and DynamoDB's 400 KB item limit
+    JOBS_CHUNK_MAX_BYTES: int = int(os.getenv("JOBS_CHUNK_MAX_BYTES", "131072"))
+    JOBS_RESULTS_PAGE_SIZE: int = int(os.getenv("JOBS_RESULTS_PAGE_SIZE", "1000"))  # Results per status page
+    # Encoded bytes of a status page's results, well under Lambda's 6 MB response limit
+    JOBS_RESULTS_PAGE_BYTES: int = int(os.getenv("JOBS_RESULTS_PAGE_BYTES", "4000000"))
+    JOBS_TTL_SECONDS: int = int(os.getenv("JOBS_TTL_SECONDS", "86400"))
+    JOBS_MAX_ATTEMPTS: int = int(os.getenv("JOBS_MAX_ATTEMPTS", "3"))  # Match the queue's maxReceiveCount
+    JOBS_WORKER_BATCH_SIZE: int = 10  # In-process queue; the SQS batch size is set on the event source
+    
+    # Lexicon Fast Path Configuration
+    LEXICON_ENABLED: bool = os.getenv("LEXICON_ENABLED", "true").lower() == "true"
+    LEXICON_CONFIDENCE_THRESHOLD: float = float(os.getenv("LEXICON_CONFIDENCE_THRESHOLD", "0.8"))
+    
+    # Prompt Packing Configuration (several short messages per Bedrock call)
+    PACK_MAX_ITEMS: int = int(os.getenv("PACK_MAX_ITEMS", "20"))
+    PACK_CHAR_BUDGET: int = MAX_MESSAGE_LENGTH  # Total message characters per packed prompt
+    PACK_MAX_MESSAGE_LENGTH: int = MAX_MESSAGE_LENGTH // 10  # Longer messages are scored alone
+    PACK_TOKENS_PER_ITEM: int = 8  # Generation budget per "<number>: <score>" line
+    
+    # Long-message mode: split long messages into sentence-bounded chunks scored concurrently
+    CHUNKING_ENABLED: bool = os.getenv("CHUNKING_ENABLED", "false").lower() == "true"  # Per request: "chunked"
+    CHUNK_MIN_LENGTH: int = int(os.getenv("CHUNK_MIN_LENGTH", "1000"))  # Shorter messages are scored whole
+    CHUNK_MAX_CHARS: int = int(os.getenv("CHUNK_MAX_CHARS", "500"))
+    CHUNK_AGGREGATION: str = os.getenv("CHUNK_AGGREGATION", "weighted")  # "mean", "weighted" or "majority"
+    
+    # Request Timing (one EMF metric line per request, optional Server-Timing header)
+    TIMING_ENABLED: bool = os.getenv("TIMING_ENABLED", "true").lower() == "true"
+    SERVER_TIMING_HEADER: bool = os.getenv("SERVER_TIMING_HEADER", "false").lower() == "true"
+    METRICS_NAMESPACE: str = os.getenv("METRICS_NAMESPACE", "SentimentAnalysis")
+    
     # Sentiment Analysis Configuration
+    PROMPT_VERSION: str = "1"  # Bump when get_sentiment_prompt changes
     SENTIMENT_LABELS: Dict[int, str] = {
         1: "positive",
         0: "neutral", 
@@ -47,4 +141,26 @@ class Config:
 
 Message: "{message}"
 
-Sentiment score:"""
\ No newline at end of file
+Sentiment score:"""
+    
+    @staticmethod
+    def get_packed_sentiment_prompt(messages: List[str]) -> str:
+        """Generate a numbered sentiment prompt covering several messages"""
+        numbered = "\n".join(f'{i}. "{message}"' for i, message in enumerate(messages, 1))
+        return f"""Analyze the sentiment of each numbered message below.
+For every message respond with one line in the form <number>: <score> using
+1 for positive sentiment
+0 for neutral sentiment
+-1 for negative sentiment
+Respond with ONLY those lines, one per message, in order.
+
+Messages:
+{numbered}
+
+Sentiment scores:
+"""
+    
+    @staticmethod
+    def get_packed_max_gen_len(count: int) -> int:
+        """Generation budget for a packed prompt with ``count`` messages"""
+        return Config.PACK_TOKENS_PER_ITEM * count + Config.BEDROCK_CONFIG["max_gen_len"]
\ No newline at end of file
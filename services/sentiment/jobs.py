@@ -0,0 +1,528 @@
+"""
+Asynchronous scoring jobs
+
+POST /jobs stores the job's metadata, splits its messages into chunks of at
+most JOBS_CHUNK_SIZE messages and JOBS_CHUNK_MAX_BYTES encoded bytes and
+puts one queue message per chunk; GET /jobs/{id} reads whatever chunk
+results the worker has stored and returns them a page at a time. The queue
+and the result store sit behind small interfaces: SQS and DynamoDB in AWS,
+an in-process queue and dict store everywhere else, so the whole
+submit/work/poll flow runs locally without AWS.
+
+Queue delivery is at-least-once. Chunk results are written idempotently
+and progress is derived from the stored chunks rather than a counter, so a
+redelivered chunk is simply scored and stored again.
+"""
+import json
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from config import Config
+from chunking import ChunkOptions
+
+# (queue message body, delivery attempt) pairs handed to the worker
+JobRecords = List[Tuple[Dict[str, Any], int]]
+# Worker callback: processes records and returns the positions of those that failed
+JobWorker = Callable[[JobRecords], List[int]]
+
+class JobQueue(ABC):
+    """Interface for the queue between job submission and the worker"""
+    
+    @abstractmethod
+    def send_many(self, bodies: List[Dict[str, Any]]) -> None:
+        """Enqueue chunk messages"""
+    
+    def attach_worker(self, worker: JobWorker) -> None:
+        """
+        Register the in-process consumer
+        
+        Queues whose messages are delivered by the platform (SQS invokes the
+        worker Lambda) ignore this.
+        
+        Args:
+            worker: Callback given batches of records
+        """
+
+class InMemoryJobQueue(JobQueue):
+    """
+    In-process queue consumed by a background thread, for local runs and tests
+    
+    Mirrors the SQS event source: records are delivered in batches, and
+    records the worker reports as failed (or all of them, if the worker
+    raises) are redelivered with their attempt count increased. Like the
+    queue's redrive policy, a record that fails its max_attempts-th delivery
+    is moved to dead_letters instead.
+    """
+    
+    def __init__(self, batch_size: int = Config.JOBS_WORKER_BATCH_SIZE,
+                 max_attempts: int = Config.JOBS_MAX_ATTEMPTS):
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.dead_letters: List[Dict[str, Any]] = []
+        self._pending: Deque[Tuple[Dict[str, Any], int]] = deque()
+        self._condition = threading.Condition()
+        self._worker: Optional[JobWorker] = None
+        self._thread: Optional[threading.Thread] = None
+        self._busy = False
+    
+    def send_many(self, bodies: List[Dict[str, Any]]) -> None:
+        with self._condition:
+            self._pending.extend((body, 1) for body in bodies)
+            self._condition.notify()
+        self._start()
+    
+    def attach_worker(self, worker: JobWorker) -> None:
+        self._worker = worker
+        if self._pending:
+            self._start()
+    
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every queued record has been processed
+        
+        Args:
+            timeout: Maximum seconds to wait
+            
+        Returns:
+            True if the queue drained, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._pending or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+    
+    def __len__(self) -> int:
+        return len(self._pending)
+    
+    def _start(self) -> None:
+        with self._condition:
+            if self._worker is None or self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._consume, name='job-worker', daemon=True)
+            self._thread.start()
+    
+    def _consume(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                self._busy = True
+            try:
+                failed = self._worker(batch)
+            except Exception:
+                failed = list(range(len(batch)))
+            with self._condition:
+                for position in failed:
+                    body, attempt = batch[position]
+                    if attempt < self.max_attempts:
+                        self._pending.append((body, attempt + 1))
+                    else:
+                        self.dead_letters.append(body)
+                self._busy = False
+                self._condition.notify_all()
+
+class SQSJobQueue(JobQueue):
+    """SQS queue; the worker Lambda is invoked by an SQS event source mapping"""
+    
+    # SendMessageBatch limits: entries per call, and bytes per message and per call
+    MAX_BATCH_ENTRIES = 10
+    MAX_BATCH_BYTES = 262144
+    
+    def __init__(self, queue_url: str, client: Optional[Any] = None):
+        self.queue_url = queue_url
+        self._client = client
+    
+    @property
+    def client(self) -> Any:
+        # Built on first use so requests that never touch jobs skip the boto3 import
+        if self._client is None:
+            import boto3
+            self._client = boto3.client('sqs', region_name=Config.BEDROCK_REGION)
+        return self._client
+    
+    def send_many(self, bodies: List[Dict[str, Any]]) -> None:
+        for batch in self._batches([json.dumps(body) for body in bodies]):
+            entries = [{'Id': str(position), 'MessageBody': text} for position, text in enumerate(batch)]
+            response = self.client.send_message_batch(QueueUrl=self.queue_url, Entries=entries)
+            failed = response.get('Failed') or []
+            if failed:
+                raise RuntimeError(f"Failed to enqueue {len(failed)} job chunk(s): {failed[0].get('Message', '')}")
+    
+    def _batches(self, texts: List[str]) -> List[List[str]]:
+        """Group message bodies into batches within the entry and byte limits"""
+        batches: List[List[str]] = []
+        current: List[str] = []
+        current_bytes = 0
+        for text in texts:
+            size = len(text.encode('utf-8'))
+            if size > self.MAX_BATCH_BYTES:
+                raise ValueError(f'Job chunk of {size} bytes exceeds the SQS message size limit')
+            if current and (len(current) == self.MAX_BATCH_ENTRIES or current_bytes + size > self.MAX_BATCH_BYTES):
+                batches.append(current)
+                current, current_bytes = [], 0
+            current.append(text)
+            current_bytes += size
+        if current:
+            batches.append(current)
+        return batches
+
+class JobStore(ABC):
+    """Interface for job metadata and per-chunk results"""
+    
+    @abstractmethod
+    def create(self, job: Dict[str, Any]) -> None:
+        """Store a new job's metadata"""
+    
+    @abstractmethod
+    def update(self, job: Dict[str, Any]) -> None:
+        """Replace a job's metadata, keeping its chunk results"""
+    
+    @abstractmethod
+    def save_chunk(self, job_id: str, chunk: int, results: List[Dict[str, Any]]) -> None:
+        """Store (or overwrite) one chunk's results"""
+    
+    @abstractmethod
+    def load(self, job_id: str) -> Optional[Tuple[Dict[str, Any], Dict[int, List[Dict[str, Any]]]]]:
+        """Return the job's metadata and stored chunk results, or None if unknown"""
+
+class InMemoryJobStore(JobStore):
+    """Process-local job store for local runs and tests"""
+    
+    def __init__(self):
+        self._jobs: Dict[str, Tuple[Dict[str, Any], Dict[int, List[Dict[str, Any]]]]] = {}
+        self._lock = threading.Lock()
+    
+    def create(self, job: Dict[str, Any]) -> None:
+        with self._lock:
+            self._jobs[job['job_id']] = (dict(job), {})
+    
+    def update(self, job: Dict[str, Any]) -> None:
+        with self._lock:
+            self._jobs[job['job_id']] = (dict(job), self._jobs[job['job_id']][1])
+    
+    def save_chunk(self, job_id: str, chunk: int, results: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._jobs[job_id][1][chunk] = results
+    
+    def load(self, job_id: str) -> Optional[Tuple[Dict[str, Any], Dict[int, List[Dict[str, Any]]]]]:
+        with self._lock:
+            stored = self._jobs.get(job_id)
+            if stored is None:
+                return None
+            return dict(stored[0]), dict(stored[1])
+
+class DynamoDBJobStore(JobStore):
+    """
+    DynamoDB job store
+    
+    Expects a table with string partition key ``job_id`` and string sort key
+    ``part`` ("meta" or "chunk#<n>"), with TTL enabled on ``expires_at``. A
+    job is read back with one paginated Query.
+    """
+    
+    def __init__(self, table_name: str, ttl_seconds: int = Config.JOBS_TTL_SECONDS,
+                 client: Optional[Any] = None):
+        self.table_name = table_name
+        self.ttl_seconds = ttl_seconds
+        self._client = client
+    
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            import boto3
+            self._client = boto3.client('dynamodb', region_name=Config.BEDROCK_REGION)
+        return self._client
+    
+    def _expires_at(self) -> Dict[str, str]:
+        return {'N': str(int(time.time() + self.ttl_seconds))}
+    
+    def create(self, job: Dict[str, Any]) -> None:
+        self.client.put_item(
+            TableName=self.table_name,
+            Item={
+                'job_id': {'S': job['job_id']},
+                'part': {'S': 'meta'},
+                'value': {'S': json.dumps(job)},
+                'expires_at': self._expires_at()
+            }
+        )
+    
+    def update(self, job: Dict[str, Any]) -> None:
+        # Chunk results are separate items, so rewriting the metadata item leaves them alone
+        self.create(job)
+    
+    def save_chunk(self, job_id: str, chunk: int, results: List[Dict[str, Any]]) -> None:
+        self.client.put_item(
+            TableName=self.table_name,
+            Item={
+                'job_id': {'S': job_id},
+                'part': {'S': f'chunk#{chunk:06d}'},
+                'value': {'S': json.dumps(results)},
+                'expires_at': self._expires_at()
+            }
+        )
+    
+    def load(self, job_id: str) -> Optional[Tuple[Dict[str, Any], Dict[int, List[Dict[str, Any]]]]]:
+        meta: Optional[Dict[str, Any]] = None
+        chunks: Dict[int, List[Dict[str, Any]]] = {}
+        query: Dict[str, Any] = {
+            'TableName': self.table_name,
+            'KeyConditionExpression': 'job_id = :job_id',
+            'ExpressionAttributeValues': {':job_id': {'S': job_id}},
+            'ConsistentRead': True
+        }
+        while True:
+            response = self.client.query(**query)
+            for item in response.get('Items', []):
+                part = item['part']['S']
+                value = json.loads(item['value']['S'])
+                if part == 'meta':
+                    meta = value
+                else:
+                    chunks[int(part.split('#', 1)[1])] = value
+            if 'LastEvaluatedKey' not in response:
+                break
+            query['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        if meta is None:
+            return None
+        return meta, chunks
+
+class JobService:
+    """
+    Submits jobs, scores queued chunks and reports job status
+    
+    Args:
+        queue: Queue carrying one message per chunk
+        store: Store for job metadata and chunk results
+        chunk_size: Messages per queued chunk
+        chunk_max_bytes: Encoded size limit of a chunk's messages
+        page_size: Results per status page
+        page_max_bytes: Encoded size limit of a status page's results
+    """
+    
+    def __init__(self, queue: JobQueue, store: JobStore, chunk_size: int = Config.JOBS_CHUNK_SIZE,
+                 chunk_max_bytes: int = Config.JOBS_CHUNK_MAX_BYTES,
+                 page_size: int = Config.JOBS_RESULTS_PAGE_SIZE,
+                 page_max_bytes: int = Config.JOBS_RESULTS_PAGE_BYTES):
+        self.queue = queue
+        self.store = store
+        self.chunk_size = max(1, chunk_size)
+        self.chunk_max_bytes = chunk_max_bytes
+        self.page_size = max(1, page_size)
+        self.page_max_bytes = page_max_bytes
+    
+    def submit(self, messages: List[Any], packed: bool = False,
+               chunking: Optional[ChunkOptions] = None) -> Dict[str, Any]:
+        """
+        Create a job and enqueue its chunks
+        
+        Args:
+            messages: Raw messages; each is validated by the worker
+            packed: Score short messages several per Bedrock call
+            chunking: Long-message settings, or None to score every message whole
+            
+        Returns:
+            The job's metadata
+            
+        Raises:
+            ValueError: If a single message is larger than a chunk may be
+            Exception: Whatever the queue raised; the job is then marked failed
+        """
+        chunks = self._split(messages)
+        # Stored as a JSON object so queue messages and job metadata can carry it
+        chunking_settings = chunking._asdict() if chunking is not None else None
+        job = {
+            'job_id': uuid.uuid4().hex,
+            'total': len(messages),
+            'chunks': len(chunks),
+            'packed': packed,
+            'chunking': chunking_settings,
+            'created_at': datetime.now(timezone.utc).isoformat()
+        }
+        # Metadata first, so a chunk is never scored for a job that cannot be read
+        self.store.create(job)
+        try:
+            self.queue.send_many([
+                {
+                    'job_id': job['job_id'],
+                    'chunk': chunk,
+                    'offset': offset,
+                    'packed': packed,
+                    'chunking': chunking_settings,
+                    'messages': chunk_messages
+                }
+                for chunk, (offset, chunk_messages) in enumerate(chunks)
+            ])
+        except Exception as e:
+            # Otherwise the job would report "queued" until it expires
+            self.store.update({**job, 'error': f'Failed to enqueue job: {str(e)}'})
+            raise
+        return job
+    
+    def _split(self, messages: List[Any]) -> List[Tuple[int, List[Any]]]:
+        """Cut messages into (offset, messages) chunks within the count and byte limits"""
+        chunks: List[Tuple[int, List[Any]]] = []
+        current: List[Any] = []
+        current_bytes = 0
+        for index, message in enumerate(messages):
+            # Each list item costs its JSON encoding plus a ", " separator
+            size = len(json.dumps(message).encode('utf-8')) + 2
+            if size > self.chunk_max_bytes:
+                raise ValueError(f'Message {index} is too large for a job ({size} bytes encoded)')
+            if current and (len(current) == self.chunk_size or current_bytes + size > self.chunk_max_bytes):
+                chunks.append((index - len(current), current))
+                current, current_bytes = [], 0
+            current.append(message)
+            current_bytes += size
+        if current:
+            chunks.append((len(messages) - len(current), current))
+        return chunks
+    
+    def process(self, records: JobRecords,
+                score: Callable[[List[Any], bool, Optional[ChunkOptions]], List[Dict[str, Any]]]) -> List[int]:
+        """
+        Score a batch of queued chunks and store their results
+        
+        Chunks with the same packing mode and long-message settings are
+        scored in one call, so the whole batch shares one bounded worker
+        pool. Item indexes are made relative to the job.
+        
+        Args:
+            records: Queue message bodies with their delivery attempt
+            score: Batch scorer, called as score(messages, packed, chunking)
+            
+        Returns:
+            Positions of records that should be redelivered
+        """
+        groups: Dict[Tuple[bool, Optional[ChunkOptions]], List[int]] = {}
+        for position, (body, _) in enumerate(records):
+            settings = body.get('chunking')
+            chunking = ChunkOptions(**settings) if settings is not None else None
+            groups.setdefault((bool(body.get('packed')), chunking), []).append(position)
+        
+        failed: List[int] = []
+        for (packed, chunking), group in groups.items():
+            messages = [message for position in group for message in records[position][0]['messages']]
+            try:
+                results = score(messages, packed, chunking)
+            except Exception as e:
+                failed.extend(self._fail_or_retry(records, group, e))
+                continue
+            
+            cursor = 0
+            for position in group:
+                body = records[position][0]
+                count = len(body['messages'])
+                chunk_results = results[cursor:cursor + count]
+                for result in chunk_results:
+                    result['index'] += body['offset'] - cursor
+                cursor += count
+                try:
+                    self.store.save_chunk(body['job_id'], body['chunk'], chunk_results)
+                except Exception:
+                    failed.append(position)
+        return failed
+    
+    def _fail_or_retry(self, records: JobRecords, group: List[int], error: Exception) -> List[int]:
+        """Retry chunks that have attempts left; store error results for the rest so their jobs finish"""
+        retry = []
+        for position in group:
+            body, attempt = records[position]
+            if attempt < Config.JOBS_MAX_ATTEMPTS:
+                retry.append(position)
+                continue
+            results = [
+                {'index': body['offset'] + index, 'error': f'Analysis failed: {str(error)}'}
+                for index in range(len(body['messages']))
+            ]
+            try:
+                self.store.save_chunk(body['job_id'], body['chunk'], results)
+            except Exception:
+                retry.append(position)
+        return retry
+    
+    def status(self, job_id: str, offset: int = 0, limit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Describe a job's progress, with a page of results once every chunk is stored
+        
+        Args:
+            job_id: Job ID returned by submit
+            offset: Position of the first result to return
+            limit: Results per page, capped at page_size
+            
+        Returns:
+            Job status, or None if the job is unknown or expired
+        """
+        loaded = self.store.load(job_id)
+        if loaded is None:
+            return None
+        
+        job, chunks = loaded
+        completed = sum(len(results) for results in chunks.values())
+        if 'error' in job:
+            state = 'failed'
+        elif len(chunks) >= job['chunks']:
+            state = 'completed'
+        elif chunks:
+            state = 'running'
+        else:
+            state = 'queued'
+        
+        status: Dict[str, Any] = {
+            'job_id': job['job_id'],
+            'status': state,
+            'total': job['total'],
+            'completed': completed,
+            'created_at': job['created_at']
+        }
+        if state == 'failed':
+            status['error'] = job['error']
+        if state == 'completed':
+            results = [result for chunk in sorted(chunks) for result in chunks[chunk]]
+            failed = sum(1 for result in results if 'error' in result)
+            page = self._page(results, offset, min(limit or self.page_size, self.page_size))
+            status['results'] = page
+            status['offset'] = offset
+            next_offset = offset + len(page)
+            status['next_offset'] = next_offset if next_offset < len(results) else None
+            status['summary'] = {
+                'total': len(results),
+                'succeeded': len(results) - failed,
+                'failed': failed
+            }
+        return status
+    
+    def _page(self, results: List[Dict[str, Any]], offset: int, limit: int) -> List[Dict[str, Any]]:
+        """Up to limit results from offset, stopping early at page_max_bytes (always at least one)"""
+        page: List[Dict[str, Any]] = []
+        page_bytes = 0
+        for result in results[offset:offset + limit]:
+            size = len(json.dumps(result).encode('utf-8')) + 2
+            if page and page_bytes + size > self.page_max_bytes:
+                break
+            page.append(result)
+            page_bytes += size
+        return page
+
+def build_job_service() -> JobService:
+    """
+    Build the job service described by Config
+    
+    Returns:
+        JobService on SQS and DynamoDB when both are configured, otherwise in-process
+    """
+    if Config.JOBS_QUEUE_URL and Config.JOBS_TABLE:
+        return JobService(SQSJobQueue(Config.JOBS_QUEUE_URL), DynamoDBJobStore(Config.JOBS_TABLE))
+    return JobService(InMemoryJobQueue(), InMemoryJobStore())
+
+# Module-level service; AWS clients are built on first use
+job_service = build_job_service()
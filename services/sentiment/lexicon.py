@@ -0,0 +1,125 @@
+"""
+Lexicon-based sentiment scorer used as a local fast path before Bedrock
+"""
+import re
+from typing import Dict, List, Tuple
+
+# Word polarity weights: 2 for strong, 1 for mild sentiment
+POSITIVE_WORDS: Dict[str, float] = {
+    'love': 2, 'loved': 2, 'loving': 2, 'awesome': 2, 'amazing': 2, 'excellent': 2,
+    'fantastic': 2, 'wonderful': 2, 'brilliant': 2, 'perfect': 2, 'outstanding': 2,
+    'superb': 2, 'incredible': 2, 'best': 2, 'delighted': 2, 'thrilled': 2,
+    'great': 1.5, 'happy': 1.5, 'enjoy': 1.5, 'enjoyed': 1.5, 'recommend': 1.5,
+    'good': 1, 'nice': 1, 'like': 1, 'liked': 1, 'works': 1, 'helpful': 1,
+    'fast': 1, 'easy': 1, 'glad': 1, 'pleased': 1, 'cool': 1, 'fine': 0.5,
+    'thanks': 1, 'thank': 1, 'useful': 1, 'smooth': 1, 'reliable': 1, 'fixed': 1,
+}
+
+NEGATIVE_WORDS: Dict[str, float] = {
+    'hate': 2, 'hated': 2, 'terrible': 2, 'awful': 2, 'horrible': 2, 'worst': 2,
+    'disgusting': 2, 'useless': 2, 'garbage': 2, 'pathetic': 2, 'furious': 2,
+    'disappointed': 2, 'disappointing': 2, 'broken': 1.5, 'crash': 1.5, 'crashes': 1.5,
+    'bad': 1.5, 'poor': 1.5, 'boring': 1.5, 'annoying': 1.5, 'angry': 1.5, 'sad': 1.5,
+    'slow': 1, 'buggy': 1.5, 'bug': 1, 'bugs': 1, 'fail': 1, 'fails': 1, 'failed': 1,
+    'problem': 1, 'problems': 1, 'issue': 0.5, 'issues': 0.5, 'confusing': 1,
+    'wrong': 1, 'waste': 1.5, 'refund': 1, 'unhappy': 1.5, 'dislike': 1.5,
+}
+
+NEGATORS = frozenset({
+    'not', 'no', 'never', 'nothing', 'nobody', 'none', 'neither', 'nor', 'without',
+    'hardly', 'barely', 'cannot', 'cant', 'dont', 'doesnt', 'didnt', 'isnt', 'wasnt',
+    'arent', 'werent', 'wont', 'wouldnt', 'shouldnt', 'couldnt', 'havent', 'hasnt',
+})
+
+INTENSIFIERS: Dict[str, float] = {
+    'very': 1.3, 'really': 1.3, 'so': 1.2, 'extremely': 1.5, 'absolutely': 1.5,
+    'totally': 1.3, 'super': 1.3, 'incredibly': 1.5, 'completely': 1.3, 'just': 1.1,
+}
+
+CONTRAST_WORDS = frozenset({'but', 'however', 'although', 'though', 'yet'})
+
+# How many following tokens a negator applies to
+NEGATION_SCOPE = 3
+# Negated words flip polarity at reduced strength ("not bad" is only mildly positive)
+NEGATION_DAMPING = 0.75
+# Total weight at which a one-sided message is considered fully confident
+FULL_CONFIDENCE_WEIGHT = 2.0
+
+_CONTRACTION_PATTERN = re.compile(r"n['’;]t\b")
+_TOKEN_PATTERN = re.compile(r"[a-z]+|[.!?,;:]")
+_CLAUSE_BREAKS = frozenset('.!?,;:')
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase and split text into word and punctuation tokens
+    
+    Args:
+        text: Input text
+        
+    Returns:
+        List of tokens with contractions folded ("don't" -> "dont")
+    """
+    text = _CONTRACTION_PATTERN.sub('nt', text.lower())
+    return _TOKEN_PATTERN.findall(text)
+
+def score_lexicon(text: str) -> Tuple[int, float]:
+    """
+    Score sentiment with word lists, negation, intensifiers and contrast
+    
+    Args:
+        text: Sanitized message
+        
+    Returns:
+        Tuple of (sentiment score, confidence between 0 and 1)
+    """
+    positive = 0.0
+    negative = 0.0
+    negation_left = 0
+    boost = 1.0
+    clause_weight = 1.0
+    
+    for token in tokenize(text):
+        if token in _CLAUSE_BREAKS:
+            negation_left = 0
+            boost = 1.0
+            continue
+        
+        if token in CONTRAST_WORDS:
+            # The clause after "but" usually carries the overall sentiment
+            positive *= 0.5
+            negative *= 0.5
+            clause_weight = 1.5
+            negation_left = 0
+            continue
+        
+        if token in NEGATORS:
+            negation_left = NEGATION_SCOPE
+            continue
+        
+        if token in INTENSIFIERS:
+            boost *= INTENSIFIERS[token]
+            continue
+        
+        polarity = POSITIVE_WORDS.get(token, 0.0) - NEGATIVE_WORDS.get(token, 0.0)
+        if polarity:
+            weight = polarity * boost * clause_weight
+            if negation_left:
+                weight = -weight * NEGATION_DAMPING
+            if weight > 0:
+                positive += weight
+            else:
+                negative -= weight
+            boost = 1.0
+        
+        if negation_left:
+            negation_left -= 1
+    
+    total = positive + negative
+    if total == 0:
+        # No evidence either way; defer to the model
+        return 0, 0.0
+    
+    balance = (positive - negative) / total
+    score = 1 if balance > 0 else -1 if balance < 0 else 0
+    confidence = abs(balance) * min(1.0, total / FULL_CONFIDENCE_WEIGHT)
+    return score, round(confidence, 4)
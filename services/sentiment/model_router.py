@@ -0,0 +1,416 @@
+"""
+Latency-aware routing across several Bedrock text models
+
+Each configured model ID is matched to a model family that knows its prompt
+template, request body and response format. The router keeps rolling
+latency and outcome statistics per model and orders the candidates for
+every call: healthy models first, ordered by rolling median latency, then
+degraded models as a last resort. Models with too few samples to compare
+are tried first, in configured order, until they have been measured. A call
+that fails transiently on one model is retried on the next candidate, so a
+degraded primary fails over without the caller noticing.
+
+A model is marked degraded when its recent error rate crosses
+ROUTER_ERROR_THRESHOLD or its circuit breaker is open. It gets no traffic
+except as a last resort until ROUTER_COOLDOWN_SECONDS have passed, after
+which its statistics start afresh.
+"""
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from config import Config
+from resilience import BedrockGuard, LatencyTracker, ModelUnavailableError, build_bedrock_guard, is_retryable
+
+# Cross-region inference profile prefixes, e.g. "us.anthropic.claude-3-haiku-20240307-v1:0"
+INFERENCE_PROFILE_PREFIXES = ('us.', 'eu.', 'apac.')
+
+class ModelFamily(ABC):
+    """Prompt template, request body and response parsers for one model family"""
+    
+    # Model ID prefixes served by this family
+    prefixes: Tuple[str, ...] = ()
+    name: str = ''
+    
+    def format_prompt(self, prompt: str) -> str:
+        """Wrap a sentiment prompt in the family's prompt template"""
+        return prompt
+    
+    @abstractmethod
+    def request_body(self, prompt: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        """Build the invoke_model request body"""
+        pass
+    
+    @abstractmethod
+    def parse_response(self, body: Dict[str, Any]) -> str:
+        """Generated text from an invoke_model response body"""
+        pass
+    
+    @abstractmethod
+    def parse_chunk(self, chunk: Dict[str, Any]) -> str:
+        """Generated text carried by one response-stream chunk"""
+        pass
+
+class LlamaFamily(ModelFamily):
+    """Meta Llama; prompts are sent as-is, as they always have been"""
+    
+    prefixes = ('meta.llama',)
+    name = 'llama'
+    
+    def request_body(self, prompt: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        return {'prompt': prompt, 'max_gen_len': max_tokens, 'temperature': temperature}
+    
+    def parse_response(self, body: Dict[str, Any]) -> str:
+        return body['generation']
+    
+    def parse_chunk(self, chunk: Dict[str, Any]) -> str:
+        return chunk.get('generation') or ''
+
+class MistralFamily(ModelFamily):
+    """Mistral instruct models"""
+    
+    prefixes = ('mistral.',)
+    name = 'mistral'
+    
+    def format_prompt(self, prompt: str) -> str:
+        return f'<s>[INST] {prompt} [/INST]'
+    
+    def request_body(self, prompt: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        return {'prompt': prompt, 'max_tokens': max_tokens, 'temperature': temperature}
+    
+    def parse_response(self, body: Dict[str, Any]) -> str:
+        return body['outputs'][0]['text']
+    
+    def parse_chunk(self, chunk: Dict[str, Any]) -> str:
+        outputs = chunk.get('outputs') or [{}]
+        return outputs[0].get('text') or ''
+
+class AnthropicFamily(ModelFamily):
+    """Anthropic Claude through the Messages API"""
+    
+    prefixes = ('anthropic.claude',)
+    name = 'anthropic'
+    
+    def request_body(self, prompt: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        return {
+            'anthropic_version': 'bedrock-2023-05-31',
+            'max_tokens': max_tokens,
+            'temperature': temperature,
+            'messages': [{'role': 'user', 'content': prompt}]
+        }
+    
+    def parse_response(self, body: Dict[str, Any]) -> str:
+        return ''.join(block.get('text', '') for block in body['content'] if block.get('type') == 'text')
+    
+    def parse_chunk(self, chunk: Dict[str, Any]) -> str:
+        if chunk.get('type') != 'content_block_delta':
+            return ''
+        return chunk.get('delta', {}).get('text') or ''
+
+class TitanFamily(ModelFamily):
+    """Amazon Titan Text"""
+    
+    prefixes = ('amazon.titan-text',)
+    name = 'titan'
+    
+    def format_prompt(self, prompt: str) -> str:
+        return f'User: {prompt}\nBot:'
+    
+    def request_body(self, prompt: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        return {
+            'inputText': prompt,
+            'textGenerationConfig': {'maxTokenCount': max_tokens, 'temperature': temperature}
+        }
+    
+    def parse_response(self, body: Dict[str, Any]) -> str:
+        return body['results'][0]['outputText']
+    
+    def parse_chunk(self, chunk: Dict[str, Any]) -> str:
+        return chunk.get('outputText') or ''
+
+class CohereFamily(ModelFamily):
+    """Cohere Command R"""
+    
+    prefixes = ('cohere.command-r',)
+    name = 'cohere'
+    
+    def request_body(self, prompt: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        return {'message': prompt, 'max_tokens': max_tokens, 'temperature': temperature}
+    
+    def parse_response(self, body: Dict[str, Any]) -> str:
+        return body['text']
+    
+    def parse_chunk(self, chunk: Dict[str, Any]) -> str:
+        return chunk.get('text') or ''
+
+MODEL_FAMILIES: List[ModelFamily] = [
+    LlamaFamily(), MistralFamily(), AnthropicFamily(), TitanFamily(), CohereFamily()
+]
+
+def family_for(model_id: str) -> ModelFamily:
+    """
+    Find the family serving a model ID
+    
+    Args:
+        model_id: Bedrock model ID or cross-region inference profile ID
+        
+    Returns:
+        Matching model family
+        
+    Raises:
+        ValueError: If no family supports the model
+    """
+    base_id = model_id
+    if base_id.startswith(INFERENCE_PROFILE_PREFIXES):
+        base_id = base_id.split('.', 1)[1]
+    for family in MODEL_FAMILIES:
+        if base_id.startswith(family.prefixes):
+            return family
+    raise ValueError(f'Unsupported Bedrock model: {model_id}')
+
+class ModelStats:
+    """
+    Rolling latency and outcome statistics for one model
+    
+    Args:
+        window: Outcomes kept for the error rate
+        min_samples: Outcomes needed before the error rate or latency counts
+    """
+    
+    def __init__(self, window: int, min_samples: int):
+        self.window = window
+        self.min_samples = min_samples
+        self.requests = 0
+        self.errors = 0
+        self.degraded_until = 0.0
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._latency = LatencyTracker(window=window, min_samples=min_samples)
+        self._lock = threading.Lock()
+    
+    def record(self, succeeded: bool, elapsed_ms: Optional[float] = None) -> None:
+        with self._lock:
+            self.requests += 1
+            if not succeeded:
+                self.errors += 1
+            self._outcomes.append(succeeded)
+        if succeeded and elapsed_ms is not None:
+            self._latency.observe(elapsed_ms)
+    
+    def error_rate(self) -> Optional[float]:
+        """Failed fraction of recent calls, or None until min_samples calls"""
+        with self._lock:
+            if len(self._outcomes) < self.min_samples:
+                return None
+            return self._outcomes.count(False) / len(self._outcomes)
+    
+    def latency(self, fraction: float) -> Optional[float]:
+        """Latency percentile of recent successful calls in milliseconds"""
+        return self._latency.percentile(fraction)
+    
+    def reset(self) -> None:
+        """Forget recent outcomes and latencies, keeping the lifetime counters"""
+        with self._lock:
+            self._outcomes.clear()
+        self._latency = LatencyTracker(window=self.window, min_samples=self.min_samples)
+
+class ModelRoute:
+    """
+    One routable model: its family, guard and statistics
+    
+    Args:
+        model_id: Bedrock model ID
+        family: Model family for prompts and parsing
+        guard: Admission control and retries for this model's quota, or None
+        stats: Rolling statistics
+    """
+    
+    def __init__(self, model_id: str, family: ModelFamily, guard: Optional[BedrockGuard], stats: ModelStats):
+        self.model_id = model_id
+        self.family = family
+        self.guard = guard
+        self.stats = stats
+
+class ModelRouter:
+    """
+    Orders candidate models by health and latency and fails over between them
+    
+    Args:
+        routes: Candidate models in configured order (primary first)
+        error_threshold: Recent error rate that marks a model degraded
+        cooldown_seconds: How long a degraded model is avoided
+        explore_rate: Fraction of calls sent to another healthy model first,
+            so the latency of models that are not currently preferred stays known
+        seed: Random seed for exploration
+    """
+    
+    def __init__(self, routes: List[ModelRoute], error_threshold: float = 0.5,
+                 cooldown_seconds: float = 30.0, explore_rate: float = 0.0, seed: Optional[int] = None):
+        if not routes:
+            raise ValueError('At least one model is required')
+        self.routes = routes
+        self.error_threshold = error_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.explore_rate = explore_rate
+        self.failovers = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    @property
+    def primary(self) -> ModelRoute:
+        return self.routes[0]
+    
+    def is_degraded(self, route: ModelRoute) -> bool:
+        """
+        Check whether a model should be avoided, without changing its state
+        
+        Returns:
+            True while its cooldown runs, its recent error rate is over the
+            threshold or its circuit breaker is open
+        """
+        if route.guard is not None and route.guard.breaker.state == 'open':
+            return True
+        stats = route.stats
+        with self._lock:
+            if stats.degraded_until:
+                return time.monotonic() < stats.degraded_until
+            error_rate = stats.error_rate()
+            return error_rate is not None and error_rate >= self.error_threshold
+    
+    def update_health(self, route: ModelRoute) -> None:
+        """Start a model's cooldown when its error rate crosses the threshold, or end an expired one"""
+        stats = route.stats
+        now = time.monotonic()
+        with self._lock:
+            if stats.degraded_until:
+                if now >= stats.degraded_until:
+                    # Cooldown over: start afresh rather than judging it on old failures
+                    stats.degraded_until = 0.0
+                    stats.reset()
+                return
+            error_rate = stats.error_rate()
+            if error_rate is not None and error_rate >= self.error_threshold:
+                stats.degraded_until = now + self.cooldown_seconds
+    
+    def candidates(self) -> List[ModelRoute]:
+        """
+        Order the models for one call
+        
+        Returns:
+            Unmeasured healthy models in configured order, measured healthy models
+            by rolling median latency, then degraded models as a last resort
+        """
+        healthy: List[Tuple[Tuple[int, float, int], ModelRoute]] = []
+        degraded: List[ModelRoute] = []
+        for position, route in enumerate(self.routes):
+            self.update_health(route)
+            if self.is_degraded(route):
+                degraded.append(route)
+                continue
+            median = route.stats.latency(0.5)
+            healthy.append(((1, median, position) if median is not None else (0, 0.0, position), route))
+        ordered = [route for _, route in sorted(healthy, key=lambda item: item[0])]
+        
+        if len(ordered) > 1 and self.explore_rate > 0:
+            with self._lock:
+                explore = self._random.random() < self.explore_rate
+                pick = self._random.randrange(1, len(ordered)) if explore else 0
+            if explore:
+                ordered.insert(0, ordered.pop(pick))
+        return ordered + degraded
+    
+    def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[Any, ModelRoute]:
+        """
+        Run func(route, *args, **kwargs) on the best model, failing over on errors
+        
+        Only transient errors and guard rejections fail over and count against
+        a model. Any other error (an invalid request, an unparseable response)
+        would recur on the next model, so it is raised at once.
+        
+        Args:
+            func: Function performing one invocation of the given model
+            *args: Positional arguments after the route
+            **kwargs: Keyword arguments for func
+            
+        Returns:
+            Tuple of (func's result, route that produced it)
+            
+        Raises:
+            ModelUnavailableError: Every model was unavailable
+            Exception: A non-retryable error, or the last transient error once every model failed
+        """
+        last_error: Optional[Exception] = None
+        for attempt, route in enumerate(self.candidates()):
+            if attempt:
+                with self._lock:
+                    self.failovers += 1
+            started = time.perf_counter()
+            try:
+                if route.guard is None:
+                    result = func(route, *args, **kwargs)
+                else:
+                    result = route.guard.call(func, route, *args, **kwargs)
+            except ModelUnavailableError as e:
+                # Rejected by the model's own guard; only real failures count against it
+                if e.__cause__ is not None:
+                    route.stats.record(False)
+                last_error = e
+                continue
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                route.stats.record(False)
+                last_error = e
+                continue
+            route.stats.record(True, (time.perf_counter() - started) * 1000)
+            return result, route
+        raise last_error
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Per-model statistics for /health
+        
+        Returns:
+            Failover count and, per model, state, counters, error rate, latency and guard counters
+        """
+        models = []
+        for route in self.routes:
+            error_rate = route.stats.error_rate()
+            p50, p95 = route.stats.latency(0.5), route.stats.latency(0.95)
+            models.append({
+                'model_id': route.model_id,
+                'family': route.family.name,
+                'state': 'degraded' if self.is_degraded(route) else 'healthy',
+                'requests': route.stats.requests,
+                'errors': route.stats.errors,
+                'error_rate': round(error_rate, 3) if error_rate is not None else None,
+                'p50_ms': round(p50, 1) if p50 is not None else None,
+                'p95_ms': round(p95, 1) if p95 is not None else None,
+                'guard': route.guard.stats() if route.guard is not None else None
+            })
+        with self._lock:
+            failovers = self.failovers
+        return {'primary': self.primary.model_id, 'failovers': failovers, 'models': models}
+
+def build_model_router() -> ModelRouter:
+    """
+    Build the router for Config.BEDROCK_MODEL_IDS, one guard per model
+    
+    Returns:
+        ModelRouter with the primary model first
+    """
+    routes = [
+        ModelRoute(model_id, family_for(model_id), build_bedrock_guard(),
+                   ModelStats(Config.ROUTER_WINDOW, Config.ROUTER_MIN_SAMPLES))
+        for model_id in Config.BEDROCK_MODEL_IDS
+    ]
+    return ModelRouter(
+        routes,
+        error_threshold=Config.ROUTER_ERROR_THRESHOLD,
+        cooldown_seconds=Config.ROUTER_COOLDOWN_SECONDS,
+        explore_rate=Config.ROUTER_EXPLORE_RATE
+    )
+
+# Module-level router, shared by every request and batch worker in this container
+model_router = build_model_router()
@@ -0,0 +1,73 @@
+"""
+Multi-message prompt packing: score several short messages per Bedrock call
+"""
+from typing import Any, Dict, List, Tuple
+from config import Config
+from bedrock_client import invoke_text_model
+from model_router import model_router
+from utils import extract_packed_scores
+from timing import stage
+
+def is_packable(message: str) -> bool:
+    """
+    Check whether a message is short enough to share a prompt
+    
+    Args:
+        message: Sanitized message
+        
+    Returns:
+        True if the message may be packed
+    """
+    return len(message) <= Config.PACK_MAX_MESSAGE_LENGTH
+
+def pack_messages(messages: List[str]) -> List[List[int]]:
+    """
+    Group message indices into packs bounded by item count and character budget
+    
+    Args:
+        messages: Sanitized, packable messages
+        
+    Returns:
+        List of packs, each a list of indices into ``messages``
+    """
+    packs: List[List[int]] = []
+    current: List[int] = []
+    current_chars = 0
+    
+    for index, message in enumerate(messages):
+        if current and (
+            len(current) >= Config.PACK_MAX_ITEMS
+            or current_chars + len(message) > Config.PACK_CHAR_BUDGET
+        ):
+            packs.append(current)
+            current = []
+            current_chars = 0
+        current.append(index)
+        current_chars += len(message)
+    
+    if current:
+        packs.append(current)
+    
+    return packs
+
+def score_pack(messages: List[str], bedrock: Any) -> Tuple[Dict[int, int], str]:
+    """
+    Score one pack of messages with a single Bedrock invocation
+    
+    Args:
+        messages: Sanitized messages in the pack
+        bedrock: Bedrock runtime client
+        
+    Returns:
+        Tuple of (mapping of pack-relative index to score for every line that
+        parsed, ID of the model that answered); callers re-issue the missing
+        indices individually
+    """
+    with stage('prompt'):
+        prompt = Config.get_packed_sentiment_prompt(messages)
+    max_tokens = Config.get_packed_max_gen_len(len(messages))
+    ai_response, route = model_router.call(
+        lambda route: invoke_text_model(bedrock, prompt, route.model_id, max_tokens)
+    )
+    with stage('response_parse'):
+        return extract_packed_scores(ai_response, len(messages)), route.model_id
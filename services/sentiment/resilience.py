@@ -0,0 +1,421 @@
+"""
+Admission control, retries, circuit breaking and hedging for Bedrock calls
+
+The model router gives every model its own BedrockGuard, since Bedrock
+quotas are per model, and sends each call through BedrockGuard.call:
+
+- An AIMD limiter caps the calls in flight. Each success raises the limit
+  by 1/limit (about one slot per round of calls) and a throttle halves it,
+  at most once per cooldown so one burst of throttles counts once. Callers
+  wait briefly for a slot and are rejected when none frees up.
+- Retryable failures (throttling, timeouts, 5xx-style model errors) are
+  retried with full-jitter exponential backoff. botocore's own retries are
+  turned off while the guard is enabled so attempts are not multiplied.
+- A circuit breaker opens after consecutive retryable failures and rejects
+  calls immediately until a cool-off passes; one probe call then decides
+  whether it closes again.
+- Optionally, a call still running after the observed p95 latency gets a
+  duplicate (hedge) when the limiter has a spare slot, and the first
+  successful answer wins.
+
+Rejections raise ModelUnavailableError, which the handler turns into a 503
+with Retry-After instead of a generic 500.
+"""
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextvars import copy_context
+from typing import Any, Callable, Deque, Dict, Optional
+from config import Config
+
+# ClientError codes worth retrying
+RETRYABLE_ERROR_CODES = frozenset({
+    'ThrottlingException', 'TooManyRequestsException', 'ServiceUnavailableException',
+    'ModelNotReadyException', 'ModelTimeoutException', 'InternalServerException'
+})
+THROTTLING_ERROR_CODES = frozenset({'ThrottlingException', 'TooManyRequestsException'})
+# botocore transport errors, matched by name so botocore is not imported here
+RETRYABLE_ERROR_TYPES = frozenset({
+    'ReadTimeoutError', 'ConnectTimeoutError', 'EndpointConnectionError', 'ConnectionClosedError'
+})
+
+class ModelUnavailableError(Exception):
+    """
+    Bedrock is saturated or failing; the request should be retried later
+    
+    Args:
+        message: Error message
+        retry_after: Suggested client back-off in seconds
+    """
+    
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def error_code(error: BaseException) -> Optional[str]:
+    """ClientError code of an exception, or None"""
+    response = getattr(error, 'response', None)
+    if not isinstance(response, dict):
+        return None
+    return response.get('Error', {}).get('Code')
+
+def is_throttle(error: BaseException) -> bool:
+    """Whether an exception is a throttling response"""
+    return error_code(error) in THROTTLING_ERROR_CODES
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an exception is a transient failure worth retrying"""
+    if isinstance(error, TimeoutError) or type(error).__name__ in RETRYABLE_ERROR_TYPES:
+        return True
+    return error_code(error) in RETRYABLE_ERROR_CODES
+
+class AIMDLimiter:
+    """
+    Concurrency limit with additive increase and multiplicative decrease
+    
+    Args:
+        initial: Starting limit
+        minimum: Lowest limit
+        maximum: Highest limit
+        decrease_factor: Multiplier applied on throttling
+        cooldown_seconds: Minimum time between two decreases
+    """
+    
+    def __init__(self, initial: float, minimum: float, maximum: float,
+                 decrease_factor: float = 0.5, cooldown_seconds: float = 0.2):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.cooldown_seconds = cooldown_seconds
+        self.limit = min(max(initial, minimum), maximum)
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+    
+    def acquire(self, timeout: float) -> bool:
+        """
+        Wait for a slot
+        
+        Args:
+            timeout: Maximum seconds to wait; 0 only takes a free slot
+            
+        Returns:
+            True if a slot was taken
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self.in_flight >= max(1, int(self.limit)):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            self.in_flight += 1
+            return True
+    
+    def release(self, throttled: bool = False, succeeded: bool = True) -> None:
+        """
+        Return a slot and adjust the limit from the call's outcome
+        
+        Args:
+            throttled: The call was throttled
+            succeeded: The call returned a result
+        """
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                now = time.monotonic()
+                if now - self._last_decrease >= self.cooldown_seconds:
+                    self.limit = max(self.minimum, self.limit * self.decrease_factor)
+                    self._last_decrease = now
+            elif succeeded:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify()
+
+class CircuitBreaker:
+    """
+    Opens after consecutive failures and lets one probe through after a cool-off
+    
+    Args:
+        failure_threshold: Consecutive failures that open the circuit
+        reset_seconds: Time the circuit stays open before a probe
+    """
+    
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+    
+    @property
+    def state(self) -> str:
+        """'closed', 'open' or 'half_open'"""
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if self._probing or time.monotonic() - self._opened_at >= self.reset_seconds:
+                return 'half_open'
+            return 'open'
+    
+    def allow(self) -> bool:
+        """
+        Check whether a call may proceed
+        
+        Returns:
+            False while open, and for everyone but the single probe when half-open
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.reset_seconds:
+                return False
+            self._probing = True
+            return True
+    
+    def retry_after(self) -> int:
+        """Whole seconds until the next probe is allowed"""
+        with self._lock:
+            if self._opened_at is None:
+                return 1
+            return max(1, int(self.reset_seconds - (time.monotonic() - self._opened_at) + 0.999))
+    
+    def release_probe(self) -> None:
+        """Let another caller probe when the current probe never reached the model"""
+        with self._lock:
+            self._probing = False
+    
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._probing = False
+    
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+class LatencyTracker:
+    """
+    Rolling window of recent successful call latencies
+    
+    Args:
+        window: Number of samples kept
+        min_samples: Samples needed before percentiles are reported
+    """
+    
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+    
+    def observe(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self._samples.append(elapsed_ms)
+    
+    def percentile(self, fraction: float) -> Optional[float]:
+        """
+        Latency percentile over the window
+        
+        Args:
+            fraction: Percentile as a fraction, e.g. 0.95
+            
+        Returns:
+            Milliseconds, or None until min_samples calls have been observed
+        """
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+class BedrockGuard:
+    """
+    Limiter, retries, circuit breaker and hedging around model calls
+    
+    Args:
+        limiter: Concurrency limiter
+        breaker: Circuit breaker
+        max_retries: Retries after the first attempt for retryable errors
+        retry_base_ms: Backoff base; attempt n sleeps up to base * 2**n
+        retry_max_ms: Backoff cap
+        admission_timeout: Seconds a call may wait for a limiter slot
+        hedge: Send a duplicate of calls slower than the observed p95
+        hedge_min_delay_ms: Lower bound on the hedge delay
+        latency: Latency window used for the hedge delay
+    """
+    
+    def __init__(self, limiter: AIMDLimiter, breaker: CircuitBreaker, max_retries: int = 2,
+                 retry_base_ms: float = 100, retry_max_ms: float = 2000, admission_timeout: float = 2.0,
+                 hedge: bool = False, hedge_min_delay_ms: float = 50,
+                 latency: Optional[LatencyTracker] = None):
+        self.limiter = limiter
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.retry_base_ms = retry_base_ms
+        self.retry_max_ms = retry_max_ms
+        self.admission_timeout = admission_timeout
+        self.hedge = hedge
+        self.hedge_min_delay_ms = hedge_min_delay_ms
+        self.latency = latency or LatencyTracker()
+        self._random = random.Random()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stats = {
+            'calls': 0, 'retries': 0, 'throttles': 0, 'failures': 0,
+            'rejected': 0, 'short_circuited': 0, 'hedges': 0, 'hedge_wins': 0
+        }
+    
+    def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a model call under admission control, retries and the breaker
+        
+        Args:
+            func: Function performing one Bedrock invocation
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+            
+        Returns:
+            func's result
+            
+        Raises:
+            ModelUnavailableError: Circuit open, no limiter slot in time, or retries exhausted
+            Exception: Non-retryable errors from func, unchanged
+        """
+        self._count('calls')
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                self._count('short_circuited')
+                raise ModelUnavailableError('Model is temporarily unavailable', self.breaker.retry_after())
+            try:
+                result = self._attempt(func, args, kwargs)
+            except ModelUnavailableError:
+                # No limiter slot says nothing about the model, so the probe is handed back
+                self.breaker.release_probe()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    # The model answered, so the call counts as a success for the breaker (and frees a probe)
+                    self.breaker.record_success()
+                    raise
+                if is_throttle(e):
+                    self._count('throttles')
+                self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    self._count('failures')
+                    raise ModelUnavailableError(f'Model is busy: {str(e)}', self.breaker.retry_after()) from e
+                self._count('retries')
+                time.sleep(self._backoff_seconds(attempt))
+                continue
+            self.breaker.record_success()
+            return result
+    
+    def _backoff_seconds(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, min(cap, base * 2**attempt)]"""
+        ceiling_ms = min(self.retry_max_ms, self.retry_base_ms * (2 ** attempt))
+        return self._random.uniform(0, ceiling_ms) / 1000
+    
+    def _admit(self, timeout: float) -> bool:
+        if self.limiter.acquire(timeout):
+            return True
+        if timeout > 0:
+            self._count('rejected')
+        return False
+    
+    def _run(self, func: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> Any:
+        """One admitted invocation; the slot is released with its outcome"""
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.limiter.release(throttled=is_throttle(e), succeeded=False)
+            raise
+        self.limiter.release()
+        self.latency.observe((time.perf_counter() - started) * 1000)
+        return result
+    
+    def _attempt(self, func: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> Any:
+        if not self._admit(self.admission_timeout):
+            raise ModelUnavailableError('Too many concurrent model calls', 1)
+        
+        p95 = self.latency.percentile(0.95) if self.hedge else None
+        if p95 is None:
+            return self._run(func, args, kwargs)
+        
+        primary = self._submit(func, args, kwargs)
+        try:
+            return primary.result(timeout=max(p95, self.hedge_min_delay_ms) / 1000)
+        except FutureTimeoutError:
+            pass
+        
+        # Hedge only with a spare slot, so hedges never displace first attempts
+        if not self._admit(0):
+            return primary.result()
+        self._count('hedges')
+        hedged = self._submit(func, args, kwargs)
+        done, _ = wait((primary, hedged), return_when=FIRST_COMPLETED)
+        winner = done.pop()
+        if winner.exception() is not None:
+            winner = hedged if winner is primary else primary
+        if winner is hedged and hedged.exception() is None:
+            self._count('hedge_wins')
+        return winner.result()
+    
+    def _submit(self, func: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(4, int(self.limiter.maximum) * 2), thread_name_prefix='bedrock-hedge'
+                )
+        # Run in a copy of the caller's context so stage timings reach the request timer
+        return self._executor.submit(copy_context().run, self._run, func, args, kwargs)
+    
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Guard counters and current limiter/breaker state
+        
+        Returns:
+            Snapshot suitable for /health
+        """
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        p95 = self.latency.percentile(0.95)
+        stats.update({
+            'limit': round(self.limiter.limit, 2),
+            'in_flight': self.limiter.in_flight,
+            'circuit': self.breaker.state,
+            'p95_ms': round(p95, 1) if p95 is not None else None
+        })
+        return stats
+
+def build_bedrock_guard() -> Optional[BedrockGuard]:
+    """
+    Build a guard described by Config, one per routed model
+    
+    Returns:
+        BedrockGuard, or None when the guard is disabled
+    """
+    if not Config.BEDROCK_GUARD_ENABLED:
+        return None
+    return BedrockGuard(
+        AIMDLimiter(Config.BEDROCK_CONCURRENCY_INITIAL, Config.BEDROCK_CONCURRENCY_MIN,
+                    Config.BEDROCK_CONCURRENCY_MAX),
+        CircuitBreaker(Config.CIRCUIT_FAILURE_THRESHOLD, Config.CIRCUIT_RESET_SECONDS),
+        max_retries=Config.BEDROCK_MAX_RETRIES,
+        retry_base_ms=Config.BEDROCK_RETRY_BASE_MS,
+        retry_max_ms=Config.BEDROCK_RETRY_MAX_MS,
+        admission_timeout=Config.BEDROCK_ADMISSION_TIMEOUT,
+        hedge=Config.HEDGE_ENABLED,
+        hedge_min_delay_ms=Config.HEDGE_MIN_DELAY_MS
+    )
+
@@ -1,8 +1,27 @@
 import json
-import boto3
-from typing import Dict, Any, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union
 from config import Config
-from utils import sanitize_text, validate_message, extract_sentiment_score
+from utils import sanitize_text, extract_sentiment_score, find_sentiment_score
+from normalize import sanitize_many, validate_many, validate_normalized
+from bedrock_client import client_manager, get_bedrock_client, invoke_text_model, stream_text_model
+from cache import make_cache_key, result_cache
+from singleflight import SingleFlight
+from resilience import ModelUnavailableError, is_retryable
+from model_router import ModelRoute, model_router
+from jobs import JobRecords, job_service
+from lexicon import score_lexicon
+from packing import is_packable, pack_messages, score_pack
+from chunking import ChunkOptions, aggregate_scores, parse_chunk_options, split_message
+from timing import finish_request, set_route, stage, start_request
+
+# True until the first invocation of this container has been handled
+_cold_start = True
+
+# Coalesces identical in-flight Bedrock calls across all batch workers in this container
+in_flight = SingleFlight() if Config.SINGLE_FLIGHT_ENABLED else None
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
@@ -12,50 +31,243 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         event: API Gateway event
         context: Lambda context
         
+    Returns:
+        API Gateway response
+    """
+    global _cold_start
+    cold_start, _cold_start = _cold_start, False
+    
+    # Per-stage timings are logged as one EMF line when the request finishes
+    timer = start_request(context)
+    response = route_event(event, cold_start)
+    return finish_request(timer, response)
+
+def route_event(event: Dict[str, Any], cold_start: bool = False) -> Dict[str, Any]:
+    """
+    Dispatch an event to the warm-up, health, CORS, batch or single-message path
+    
+    Args:
+        event: API Gateway event or keep-warm ping
+        cold_start: Whether this is the container's first invocation
+        
     Returns:
         API Gateway response
     """
     try:
+        # Keep-warm pings never reach Bedrock
+        if is_warmup_event(event):
+            set_route('warmup')
+            return handle_warmup(cold_start)
+        
         # Handle health check
         if event.get('httpMethod') == 'GET' and event.get('path') == '/health':
-            return create_response(200, {'status': 'healthy', 'service': 'sentiment-analysis'})
+            set_route('health')
+            return create_response(200, get_health_status())
         
         # Handle OPTIONS for CORS
         if event.get('httpMethod') == 'OPTIONS':
+            set_route('options')
             return create_response(200, {'message': 'CORS preflight'})
         
+        # Asynchronous jobs: POST /jobs and GET /jobs/{id}
+        path = event.get('path') or ''
+        if path == '/jobs' or path.startswith('/jobs/'):
+            set_route('jobs')
+            return handle_jobs_request(event, path)
+        
+        # Parse request body once
+        with stage('parse'):
+            body = parse_event_body(event)
+        
+        # Long-message mode settings, from the body or Config
+        try:
+            chunking = parse_chunk_options(body or {}, Config.CHUNKING_ENABLED, Config.CHUNK_AGGREGATION)
+        except ValueError as e:
+            return create_error_response(400, str(e))
+        
+        # Handle batch requests
+        if body is not None and 'messages' in body:
+            set_route('batch')
+            return handle_batch_request(body['messages'], packed=body.get('packed') is True, chunking=chunking)
+        
         # Get message from request
-        message = extract_message_from_event(event)
+        set_route('single')
+        message = body.get('message', '') if body is not None else None
         if not message:
             return create_error_response(400, 'Message is required')
         
         # Sanitize and validate message
-        sanitized_message = sanitize_text(message)
-        is_valid, error_msg = validate_message(sanitized_message)
+        with stage('sanitize'):
+            sanitized_message = sanitize_text(message)
+        with stage('validate'):
+            is_valid, error_msg = validate_normalized(sanitized_message)
         
         if not is_valid:
             return create_error_response(400, error_msg)
         
-        # Analyze sentiment
-        sentiment_result = analyze_sentiment(sanitized_message)
+        # Analyze sentiment; long messages are scored in chunks when long-message mode is on
+        if chunking is not None and len(sanitized_message) > Config.CHUNK_MIN_LENGTH:
+            sentiment_result = classify_long_message(message, chunking)
+        else:
+            sentiment_result = classify_sentiment(sanitized_message)
         
         return create_response(200, {
             'message': sanitized_message,
             'sentiment': sentiment_result
         })
         
+    except ModelUnavailableError as e:
+        # Saturated or failing model: tell the client when to come back instead of a generic 500
+        response = create_error_response(503, f'Service unavailable: {str(e)}')
+        response['headers'] = {**response['headers'], 'Retry-After': str(e.retry_after)}
+        return response
     except Exception as e:
         return create_error_response(500, f'Internal server error: {str(e)}')
 
-def extract_message_from_event(event: Dict[str, Any]) -> Optional[str]:
+def is_warmup_event(event: Dict[str, Any]) -> bool:
     """
-    Extract message from API Gateway event
+    Check whether an event is a keep-warm ping
+    
+    Args:
+        event: Lambda event
+        
+    Returns:
+        True for {"warmup": true} payloads and EventBridge scheduled events
+    """
+    if event.get('warmup') is True:
+        return True
+    return event.get('source') == 'aws.events' and event.get('detail-type') == 'Scheduled Event'
+
+def handle_warmup(cold_start: bool) -> Dict[str, Any]:
+    """
+    Make sure the Bedrock client is built without invoking a model
+    
+    Args:
+        cold_start: Whether this is the container's first invocation
+        
+    Returns:
+        Response describing the container state
+    """
+    was_ready = client_manager.ready
+    get_bedrock_client()
+    return create_response(200, {
+        'warmup': True,
+        'cold_start': cold_start,
+        'client_was_ready': was_ready
+    })
+
+def handle_jobs_request(event: Dict[str, Any], path: str) -> Dict[str, Any]:
+    """
+    Submit a scoring job or report a job's status
     
     Args:
         event: API Gateway event
+        path: Request path, "/jobs" or "/jobs/{id}"
         
     Returns:
-        Message string or None
+        API Gateway response (202 with the job ID for submissions)
+    """
+    method = event.get('httpMethod')
+    if path.rstrip('/') == '/jobs':
+        if method != 'POST':
+            return create_error_response(405, 'Use POST to submit a job')
+        
+        with stage('parse'):
+            body = parse_event_body(event)
+        messages = body.get('messages') if body is not None else None
+        if not isinstance(messages, list):
+            return create_error_response(400, 'Messages must be a list')
+        if not messages:
+            return create_error_response(400, 'Messages list cannot be empty')
+        if len(messages) > Config.JOBS_MAX_MESSAGES:
+            return create_error_response(
+                400, f'Job must contain at most {Config.JOBS_MAX_MESSAGES} messages'
+            )
+        # Validated now, so a bad setting is a 400 rather than a job of failed items
+        try:
+            chunking = parse_chunk_options(body, Config.CHUNKING_ENABLED, Config.CHUNK_AGGREGATION)
+        except ValueError as e:
+            return create_error_response(400, str(e))
+        
+        # In-process queues start their worker with the first job; SQS invokes job_worker_handler instead
+        job_service.queue.attach_worker(process_job_records)
+        try:
+            with stage('enqueue'):
+                job = job_service.submit(messages, packed=body.get('packed') is True, chunking=chunking)
+        except ValueError as e:
+            return create_error_response(400, str(e))
+        return create_response(202, {
+            'job_id': job['job_id'],
+            'status': 'queued',
+            'total': job['total'],
+            'status_url': f"/jobs/{job['job_id']}"
+        })
+    
+    if method != 'GET':
+        return create_error_response(405, 'Use GET to read a job')
+    
+    job_id = (event.get('pathParameters') or {}).get('job_id') or path[len('/jobs/'):]
+    # Completed jobs return their results a page at a time: ?offset=<next_offset>&limit=<n>
+    query = event.get('queryStringParameters') or {}
+    try:
+        offset = int(query.get('offset', 0))
+        limit = int(query['limit']) if 'limit' in query else None
+    except ValueError:
+        return create_error_response(400, 'offset and limit must be integers')
+    if offset < 0 or (limit is not None and limit < 1):
+        return create_error_response(400, 'offset must be 0 or more and limit 1 or more')
+    
+    with stage('job_status'):
+        status = job_service.status(job_id, offset, limit)
+    if status is None:
+        return create_error_response(404, 'Job not found')
+    return create_response(200, status)
+
+def job_worker_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """
+    SQS-triggered worker that scores queued job chunks
+    
+    Args:
+        event: SQS event with one record per chunk
+        context: Lambda context
+        
+    Returns:
+        Partial batch response listing the records SQS should redeliver
+    """
+    timer = start_request(context)
+    set_route('job_worker')
+    records = event.get('Records', [])
+    failed = process_job_records([
+        (json.loads(record['body']), int(record.get('attributes', {}).get('ApproximateReceiveCount', 1)))
+        for record in records
+    ])
+    finish_request(timer, {'statusCode': 200})
+    return {'batchItemFailures': [{'itemIdentifier': records[position]['messageId']} for position in failed]}
+
+def process_job_records(records: JobRecords) -> List[int]:
+    """
+    Score a batch of queued job chunks through the batch pipeline
+    
+    Args:
+        records: Chunk message bodies with their delivery attempt
+        
+    Returns:
+        Positions of records to redeliver
+    """
+    return job_service.process(
+        records,
+        lambda messages, packed, chunking: analyze_batch(messages, packed=packed, chunking=chunking)
+    )
+
+def parse_event_body(event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Parse the JSON body of an API Gateway event
+    
+    Args:
+        event: API Gateway event
+        
+    Returns:
+        Parsed body dict or None
     """
     body = event.get('body')
     if not body:
@@ -63,50 +275,508 @@ def extract_message_from_event(event: Dict[str, Any]) -> Optional[str]:
     
     try:
         parsed_body = json.loads(body)
-        return parsed_body.get('message', '')
     except json.JSONDecodeError:
         return None
+    
+    return parsed_body if isinstance(parsed_body, dict) else None
 
-def analyze_sentiment(message: str) -> Dict[str, Any]:
+def extract_message_from_event(event: Dict[str, Any]) -> Optional[str]:
     """
-    Analyze sentiment using Bedrock
+    Extract message from API Gateway event
+    
+    Args:
+        event: API Gateway event
+        
+    Returns:
+        Message string or None
+    """
+    parsed_body = parse_event_body(event)
+    if parsed_body is None:
+        return None
+    
+    return parsed_body.get('message', '')
+
+def handle_batch_request(messages: Any, packed: bool = False,
+                         chunking: Optional[ChunkOptions] = None) -> Dict[str, Any]:
+    """
+    Validate and score a batch request
+    
+    Args:
+        messages: Raw "messages" value from the request body
+        packed: Score short messages several per Bedrock call
+        chunking: Long-message settings, or None to score every message whole
+        
+    Returns:
+        API Gateway response
+    """
+    if not isinstance(messages, list):
+        return create_error_response(400, 'Messages must be a list')
+    
+    if not messages:
+        return create_error_response(400, 'Messages list cannot be empty')
+    
+    if len(messages) > Config.MAX_BATCH_SIZE:
+        return create_error_response(
+            400, f'Batch must contain at most {Config.MAX_BATCH_SIZE} messages'
+        )
+    
+    results = analyze_batch(messages, packed=packed, chunking=chunking)
+    failed = sum(1 for result in results if 'error' in result)
+    
+    return create_response(200, {
+        'results': results,
+        'summary': {
+            'total': len(results),
+            'succeeded': len(results) - failed,
+            'failed': failed
+        }
+    })
+
+def analyze_batch(messages: List[Any], bedrock: Optional[Any] = None, packed: bool = False,
+                  chunking: Optional[ChunkOptions] = None) -> List[Dict[str, Any]]:
+    """
+    Score a list of messages concurrently
+    
+    Each item is sanitized and validated on its own, so one bad item only
+    produces an error entry instead of failing the whole batch.
+    
+    Args:
+        messages: Raw messages
+        bedrock: Optional Bedrock runtime client shared by all workers
+        packed: Score short messages several per Bedrock call
+        chunking: Long-message settings, or None to score every message whole
+        
+    Returns:
+        Per-item results or errors, in input order
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(messages)
+    pending: List[tuple] = []
+    
+    text_indices = []
+    for index, message in enumerate(messages):
+        if isinstance(message, str):
+            text_indices.append(index)
+        else:
+            results[index] = {'index': index, 'error': 'Message must be a string'}
+    
+    with stage('sanitize'):
+        sanitized_messages = sanitize_many(messages[index] for index in text_indices)
+    with stage('validate'):
+        validations = validate_many(sanitized_messages)
+    for index, sanitized_message, (is_valid, error_msg) in zip(text_indices, sanitized_messages, validations):
+        if is_valid:
+            pending.append((index, sanitized_message))
+        else:
+            results[index] = {'index': index, 'error': error_msg}
+    
+    if pending:
+        # boto3 clients are thread-safe, so one client serves every worker
+        if bedrock is None:
+            bedrock = get_bedrock_client()
+        
+        # Long messages are chunked on their own; the rest keep the packed or per-message path
+        long_positions: List[int] = []
+        whole_positions: List[int] = []
+        for position, (_, sanitized_message) in enumerate(pending):
+            if chunking is not None and len(sanitized_message) > Config.CHUNK_MIN_LENGTH:
+                long_positions.append(position)
+            else:
+                whole_positions.append(position)
+        
+        outcomes: List[Union[Dict[str, Any], Exception, None]] = [None] * len(pending)
+        sanitized_messages = [pending[position][1] for position in whole_positions]
+        long_chunks = [split_long_message(messages[pending[position][0]]) for position in long_positions]
+        chunk_texts = [chunk for chunks in long_chunks for chunk in chunks]
+        if packed:
+            whole_outcomes = analyze_packed(sanitized_messages, bedrock)
+            chunk_outcomes = run_concurrently(classify_sentiment, chunk_texts, bedrock)
+        else:
+            # Whole messages and the chunks of long ones share one pool, so BATCH_MAX_WORKERS bounds the calls
+            flat_outcomes = run_concurrently(classify_sentiment, sanitized_messages + chunk_texts, bedrock)
+            whole_outcomes = flat_outcomes[:len(sanitized_messages)]
+            chunk_outcomes = flat_outcomes[len(sanitized_messages):]
+        
+        long_outcomes: List[Union[Dict[str, Any], Exception]] = []
+        cursor = 0
+        for chunks in long_chunks:
+            try:
+                long_outcomes.append(
+                    combine_chunk_results(chunks, chunk_outcomes[cursor:cursor + len(chunks)], chunking)
+                )
+            except Exception as e:
+                long_outcomes.append(e)
+            cursor += len(chunks)
+        for position, outcome in zip(whole_positions + long_positions, whole_outcomes + long_outcomes):
+            outcomes[position] = outcome
+        
+        for (index, sanitized_message), outcome in zip(pending, outcomes):
+            if isinstance(outcome, Exception):
+                results[index] = {'index': index, 'error': f'Analysis failed: {str(outcome)}'}
+            else:
+                results[index] = {
+                    'index': index,
+                    'message': sanitized_message,
+                    'sentiment': outcome
+                }
+    
+    return results
+
+def run_concurrently(func: Callable[..., Any], items: List[Any],
+                     *args: Any) -> List[Union[Any, Exception]]:
+    """
+    Apply a function to each item on a bounded thread pool
+    
+    Args:
+        func: Function called as func(item, *args)
+        items: Items to process
+        *args: Extra arguments passed to every call
+        
+    Returns:
+        Results in input order, with raised exceptions in place of failed results
+    """
+    if not items:
+        return []
+    
+    outcomes: List[Union[Any, Exception]] = []
+    max_workers = max(1, min(Config.BATCH_MAX_WORKERS, len(items)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Each worker runs in a copy of the caller's context so stage timings reach the request timer
+        futures = [executor.submit(copy_context().run, func, item, *args) for item in items]
+        for future in futures:
+            try:
+                outcomes.append(future.result())
+            except Exception as e:
+                outcomes.append(e)
+    
+    return outcomes
+
+def analyze_packed(messages: List[str], bedrock: Any) -> List[Union[Dict[str, Any], Exception]]:
+    """
+    Score sanitized messages with packed prompts
+    
+    Messages answered by the lexicon or the cache never reach Bedrock. Short
+    messages are packed several per prompt; long messages, single-item packs
+    and items whose packed score could not be parsed are scored individually.
+    Items of a pack rejected with ModelUnavailableError fail with that error
+    instead of being re-issued one by one.
+    
+    Args:
+        messages: Sanitized, validated messages
+        bedrock: Bedrock runtime client
+        
+    Returns:
+        Results in input order, with exceptions in place of failed results
+    """
+    outcomes: List[Union[Dict[str, Any], Exception, None]] = [None] * len(messages)
+    packable: List[int] = []
+    individual: List[int] = []
+    
+    for index, message in enumerate(messages):
+        lexicon_result = score_with_lexicon(message)
+        if lexicon_result is not None:
+            outcomes[index] = lexicon_result
+            continue
+        
+        if not is_packable(message):
+            # analyze_sentiment checks the cache for these itself
+            individual.append(index)
+            continue
+        
+        cached_result = None
+        if result_cache is not None:
+            with stage('cache'):
+                cached_result = result_cache.get(make_cache_key(message))
+        if cached_result is not None:
+            cached_result['tier'] = 'cache'
+            outcomes[index] = cached_result
+        else:
+            packable.append(index)
+    
+    packs = [
+        [packable[position] for position in pack]
+        for pack in pack_messages([messages[index] for index in packable])
+    ]
+    individual.extend(index for pack in packs if len(pack) == 1 for index in pack)
+    packs = [pack for pack in packs if len(pack) > 1]
+    
+    def score_indices(pack: List[int]) -> Tuple[Dict[int, int], str]:
+        pack_scores, model_id = score_pack([messages[index] for index in pack], bedrock)
+        return {pack[position]: score for position, score in pack_scores.items()}, model_id
+    
+    for pack, pack_outcome in zip(packs, run_concurrently(score_indices, packs)):
+        if isinstance(pack_outcome, ModelUnavailableError):
+            # Shed or short-circuited: re-issuing each item would multiply the load the guard refused
+            for index in pack:
+                outcomes[index] = pack_outcome
+            continue
+        scores, model_id = ({}, None) if isinstance(pack_outcome, Exception) else pack_outcome
+        for index in pack:
+            if index not in scores:
+                # Unparsed or failed: re-issue this item on its own
+                individual.append(index)
+                continue
+            sentiment_result = {
+                'score': scores[index],
+                'label': Config.SENTIMENT_LABELS.get(scores[index], 'neutral'),
+                'tier': 'bedrock',
+                'model': model_id,
+                'pack_size': len(pack)
+            }
+            if result_cache is not None:
+                result_cache.set(make_cache_key(messages[index]), sentiment_result)
+            outcomes[index] = sentiment_result
+    
+    individual_outcomes = run_concurrently(
+        analyze_sentiment, [messages[index] for index in individual], bedrock
+    )
+    for index, outcome in zip(individual, individual_outcomes):
+        outcomes[index] = outcome
+    
+    return outcomes
+
+def score_with_lexicon(message: str) -> Optional[Dict[str, Any]]:
+    """
+    Answer a message from the local lexicon when it is confident enough
     
     Args:
         message: Sanitized message
         
     Returns:
-        Sentiment analysis result
+        Sentiment result, or None if the message needs Bedrock
     """
-    # Initialize Bedrock client
-    bedrock = boto3.client('bedrock-runtime', region_name=Config.BEDROCK_REGION)
+    if not Config.LEXICON_ENABLED:
+        return None
     
-    # Create sentiment analysis prompt
-    sentiment_prompt = Config.get_sentiment_prompt(message)
+    with stage('lexicon'):
+        score, confidence = score_lexicon(message)
+    if confidence < Config.LEXICON_CONFIDENCE_THRESHOLD:
+        return None
     
-    # Prepare request
-    request_body = {
-        "prompt": sentiment_prompt,
-        **Config.BEDROCK_CONFIG
+    return {
+        'score': score,
+        'label': Config.SENTIMENT_LABELS.get(score, 'neutral'),
+        'tier': 'lexicon',
+        'confidence': confidence
     }
+
+def classify_sentiment(message: str, bedrock: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Tiered sentiment classification
     
-    # Call Bedrock model
-    response = bedrock.invoke_model(
-        modelId=Config.BEDROCK_MODEL_ID,
-        body=json.dumps(request_body)
+    The local lexicon scorer answers confident messages; everything else
+    goes to Bedrock through analyze_sentiment.
+    
+    Args:
+        message: Sanitized message
+        bedrock: Optional Bedrock runtime client (defaults to the shared client)
+        
+    Returns:
+        Sentiment result including the tier that answered
+    """
+    lexicon_result = score_with_lexicon(message)
+    if lexicon_result is not None:
+        return lexicon_result
+    
+    return analyze_sentiment(message, bedrock)
+
+def classify_long_message(message: str, chunking: ChunkOptions,
+                          bedrock: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Score a long message in chunks and aggregate the chunk scores
+    
+    The message is split on paragraph and sentence boundaries into chunks of
+    at most CHUNK_MAX_CHARS characters. Chunks are classified concurrently
+    through the usual tiers (lexicon, cache, Bedrock), so a long review pays
+    for its slowest chunk rather than one prompt holding the whole text.
+    Batches score the chunks of all their long messages on one pool instead
+    (see analyze_batch).
+    
+    Args:
+        message: Validated message; raw text keeps its paragraph breaks
+        chunking: Aggregation rule and whether to return per-chunk results
+        bedrock: Optional Bedrock runtime client (defaults to the shared client)
+        
+    Returns:
+        Aggregated sentiment result with tier 'chunked', or the usual result
+        when the message fits in one chunk
+        
+    Raises:
+        Exception: The first chunk failure, so the message fails as a whole
+    """
+    chunks = split_long_message(message)
+    if len(chunks) == 1:
+        return classify_sentiment(chunks[0], bedrock)
+    return combine_chunk_results(chunks, run_concurrently(classify_sentiment, chunks, bedrock), chunking)
+
+def split_long_message(message: str) -> List[str]:
+    """
+    Split a long message into chunks of at most CHUNK_MAX_CHARS characters
+    
+    Args:
+        message: Validated message; raw text keeps its paragraph breaks
+        
+    Returns:
+        Chunks in message order; a message that fits in one chunk is returned as one piece
+    """
+    with stage('chunk'):
+        chunks = split_message(message, Config.CHUNK_MAX_CHARS)
+    return chunks if len(chunks) > 1 else [' '.join(chunks)]
+
+def combine_chunk_results(chunks: List[str], outcomes: List[Union[Dict[str, Any], Exception]],
+                          chunking: ChunkOptions) -> Dict[str, Any]:
+    """
+    Aggregate the chunk results of one long message
+    
+    Args:
+        chunks: Chunks from split_long_message
+        outcomes: Each chunk's sentiment result, or the exception it raised
+        chunking: Aggregation rule and whether to return per-chunk results
+        
+    Returns:
+        Aggregated sentiment result with tier 'chunked', or the only chunk's
+        result when the message was not split
+        
+    Raises:
+        Exception: The first chunk failure, so the message fails as a whole
+    """
+    for outcome in outcomes:
+        if isinstance(outcome, Exception):
+            raise outcome
+    if len(chunks) == 1:
+        return outcomes[0]
+    
+    aggregate = aggregate_scores(
+        [outcome['score'] for outcome in outcomes], [len(chunk) for chunk in chunks], chunking.aggregation
     )
+    sentiment_result = {
+        'score': aggregate['score'],
+        'label': Config.SENTIMENT_LABELS.get(aggregate['score'], 'neutral'),
+        'tier': 'chunked',
+        'aggregation': chunking.aggregation,
+        'chunk_count': len(chunks),
+        'mean_score': aggregate['mean_score'],
+        'mixed': aggregate['mixed']
+    }
+    if chunking.include_chunks:
+        sentiment_result['chunks'] = [{'text': chunk, **outcome} for chunk, outcome in zip(chunks, outcomes)]
+    return sentiment_result
+
+def analyze_sentiment(message: str, bedrock: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Analyze sentiment using Bedrock
     
-    # Parse response
-    response_body = json.loads(response['body'].read())
-    ai_response = response_body['generation']
+    Args:
+        message: Sanitized message
+        bedrock: Optional Bedrock runtime client (defaults to the shared client)
+        
+    Returns:
+        Sentiment analysis result
+    """
+    # Serve repeated messages from the result cache
+    cache_key = None
+    if result_cache is not None:
+        with stage('cache'):
+            cache_key = make_cache_key(message)
+            cached_result = result_cache.get(cache_key)
+        if cached_result is not None:
+            cached_result['tier'] = 'cache'
+            return cached_result
+    
+    if in_flight is None:
+        return score_with_bedrock(message, bedrock, cache_key)
+    
+    # Identical messages already being scored (e.g. batch duplicates) wait for that call
+    sentiment_result, shared = in_flight.do(
+        cache_key or make_cache_key(message), score_with_bedrock, message, bedrock, cache_key
+    )
+    return dict(sentiment_result) if shared else sentiment_result
+
+def score_with_bedrock(message: str, bedrock: Optional[Any] = None,
+                       cache_key: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Score a message with Bedrock and store the result in the cache
+    
+    Args:
+        message: Sanitized message
+        bedrock: Optional Bedrock runtime client (defaults to the shared client)
+        cache_key: Result cache key, or None when caching is disabled
+        
+    Returns:
+        Sentiment analysis result with per-call metadata
+    """
+    # Reuse the container-wide Bedrock client
+    if bedrock is None:
+        bedrock = get_bedrock_client()
+    
+    # Call Bedrock model
+    with stage('prompt'):
+        sentiment_prompt = Config.get_sentiment_prompt(message)
+    started = time.perf_counter()
+    (ai_response, invocation), route = model_router.call(generate_score_text, bedrock, sentiment_prompt)
     
     # Extract sentiment score
-    sentiment_score = extract_sentiment_score(ai_response)
+    with stage('response_parse'):
+        sentiment_score = extract_sentiment_score(ai_response)
     sentiment_label = Config.SENTIMENT_LABELS.get(sentiment_score, 'neutral')
     
-    return {
+    sentiment_result = {
         'score': sentiment_score,
-        'label': sentiment_label
+        'label': sentiment_label,
+        'tier': 'bedrock',
+        'model': route.model_id
     }
+    
+    if cache_key is not None:
+        result_cache.set(cache_key, dict(sentiment_result))
+    
+    # Per-call metadata is not cached
+    sentiment_result['invocation'] = invocation
+    sentiment_result['time_to_result_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    return sentiment_result
+
+def generate_score_text(route: ModelRoute, bedrock: Any, prompt: str) -> Tuple[str, str]:
+    """
+    Get one model's answer to a single-message sentiment prompt
+    
+    With BEDROCK_STREAMING the generation is streamed and cut off at the
+    first score token. Streaming errors fall back to a blocking call, except
+    retryable ones (throttling, timeouts), which are left to the Bedrock guard's
+    backoff rather than adding an immediate second call.
+    
+    Args:
+        route: Model chosen by the router
+        bedrock: Bedrock runtime client
+        prompt: Sentiment prompt
+        
+    Returns:
+        Tuple of (generated text, invocation mode: 'stream', 'blocking' or 'stream_fallback')
+    """
+    if not Config.BEDROCK_STREAMING:
+        return invoke_text_model(bedrock, prompt, route.model_id), 'blocking'
+    
+    try:
+        return stream_text_model(
+            bedrock, prompt, lambda text: find_sentiment_score(text) is not None, route.model_id
+        ), 'stream'
+    except Exception as e:
+        if is_retryable(e):
+            raise
+        return invoke_text_model(bedrock, prompt, route.model_id), 'stream_fallback'
+
+def get_health_status() -> Dict[str, Any]:
+    """
+    Build the health check payload
+    
+    Returns:
+        Service status with cache and single-flight counters and per-model router statistics
+    """
+    status: Dict[str, Any] = {'status': 'healthy', 'service': 'sentiment-analysis'}
+    if result_cache is not None:
+        status['cache'] = result_cache.stats()
+    if in_flight is not None:
+        status['single_flight'] = in_flight.stats()
+    status['router'] = model_router.stats()
+    return status
 
 def create_response(status_code: int, body: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -0,0 +1,193 @@
+"""
+Per-request stage timing for the sentiment analysis service
+
+A RequestTimer is bound to the current request through a context variable.
+Code on the request path wraps its stages in ``with stage('name'):`` and
+the durations are summed per stage (work done by concurrent batch workers
+adds up, so stage totals can exceed the request's wall time). When the
+request finishes, one CloudWatch Embedded Metric Format (EMF) line is
+printed and, if enabled, a Server-Timing header is added to the response.
+
+With TIMING_ENABLED off no timer is bound and stage() returns a shared
+no-op context manager, so the instrumentation costs one context variable
+lookup per stage.
+"""
+import json
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+from config import Config
+
+class RequestTimer:
+    """
+    Accumulates stage durations for one request
+    
+    Args:
+        request_id: Lambda request ID, logged as a property
+    """
+    
+    def __init__(self, request_id: Optional[str] = None):
+        self.request_id = request_id
+        self.route = 'unknown'
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def add(self, name: str, elapsed_ms: float) -> None:
+        """
+        Add time spent in a stage
+        
+        Args:
+            name: Stage name
+            elapsed_ms: Duration in milliseconds
+        """
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed_ms
+            self.counts[name] = self.counts.get(name, 0) + 1
+    
+    def total_ms(self) -> float:
+        """Wall time since the request started, in milliseconds"""
+        return (time.perf_counter() - self.started) * 1000
+
+class _Stage:
+    """Context manager that adds its duration to a timer"""
+    
+    __slots__ = ('timer', 'name', 'started')
+    
+    def __init__(self, timer: RequestTimer, name: str):
+        self.timer = timer
+        self.name = name
+    
+    def __enter__(self) -> '_Stage':
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.timer.add(self.name, (time.perf_counter() - self.started) * 1000)
+
+class _NoStage:
+    """Shared no-op context manager used when no timer is bound"""
+    
+    __slots__ = ()
+    
+    def __enter__(self) -> '_NoStage':
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+_NO_STAGE = _NoStage()
+_current_timer: ContextVar[Optional[RequestTimer]] = ContextVar('request_timer', default=None)
+
+def stage(name: str) -> Any:
+    """
+    Time a block as one stage of the current request
+    
+    Args:
+        name: Stage name, e.g. 'parse' or 'bedrock'
+        
+    Returns:
+        Context manager (a no-op when timing is off or no request is active)
+    """
+    timer = _current_timer.get()
+    if timer is None:
+        return _NO_STAGE
+    return _Stage(timer, name)
+
+def set_route(route: str) -> None:
+    """
+    Record which route the current request took (the EMF dimension)
+    
+    Args:
+        route: Route name, e.g. 'single' or 'batch'
+    """
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.route = route
+
+def start_request(context: Any = None) -> Optional[RequestTimer]:
+    """
+    Bind a new timer to the current request
+    
+    Args:
+        context: Lambda context (for the request ID)
+        
+    Returns:
+        The timer, or None when timing is disabled
+    """
+    if not Config.TIMING_ENABLED:
+        return None
+    
+    timer = RequestTimer(getattr(context, 'aws_request_id', None))
+    _current_timer.set(timer)
+    return timer
+
+def finish_request(timer: Optional[RequestTimer], response: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Emit the request's metrics and optionally add a Server-Timing header
+    
+    Args:
+        timer: Timer from start_request
+        response: API Gateway response
+        
+    Returns:
+        The response, with a Server-Timing header when enabled
+    """
+    if timer is None:
+        return response
+    
+    _current_timer.set(None)
+    total_ms = timer.total_ms()
+    print(json.dumps(build_emf_record(timer, total_ms, response.get('statusCode'))))
+    
+    if Config.SERVER_TIMING_HEADER:
+        response['headers'] = {**response.get('headers', {}), 'Server-Timing': format_server_timing(timer, total_ms)}
+    return response
+
+def build_emf_record(timer: RequestTimer, total_ms: float, status_code: Optional[int]) -> Dict[str, Any]:
+    """
+    Build a CloudWatch Embedded Metric Format record
+    
+    Args:
+        timer: Finished request timer
+        total_ms: Request wall time in milliseconds
+        status_code: Response status code
+        
+    Returns:
+        EMF record with one metric per stage plus the total
+    """
+    values = {f'{name}_ms': round(elapsed, 3) for name, elapsed in timer.stages.items()}
+    values['total_ms'] = round(total_ms, 3)
+    record: Dict[str, Any] = {
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': Config.METRICS_NAMESPACE,
+                'Dimensions': [['Route']],
+                'Metrics': [{'Name': name, 'Unit': 'Milliseconds'} for name in values]
+            }]
+        },
+        'Route': timer.route,
+        'StatusCode': status_code,
+        **values
+    }
+    if timer.request_id:
+        record['RequestId'] = timer.request_id
+    return record
+
+def format_server_timing(timer: RequestTimer, total_ms: float) -> str:
+    """
+    Format stage durations as a Server-Timing header value
+    
+    Args:
+        timer: Finished request timer
+        total_ms: Request wall time in milliseconds
+        
+    Returns:
+        Header value, e.g. "parse;dur=0.05, bedrock;dur=412.3, total;dur=413.1"
+    """
+    metrics = [f'{name};dur={elapsed:.2f}' for name, elapsed in timer.stages.items()]
+    metrics.append(f'total;dur={total_ms:.2f}')
+    return ', '.join(metrics)
@@ -2,9 +2,16 @@
 Utility functions for sentiment analysis
 """
 import re
-import html
-from typing import Tuple, Optional
-from config import Config
+from typing import Dict, Tuple, Optional
+from normalize import normalize_text, validate_normalized
+
+# "<number>: <score>" lines in packed responses, tolerating "3)", "#3 -", "Message 3 =" etc.
+PACKED_SCORE_PATTERN = re.compile(
+    r'^\s*(?:message\s*)?#?(\d+)\s*[:.)=\-]\s*(?:score\s*[:=]?\s*)?(-?[01])(?![0-9])',
+    re.IGNORECASE | re.MULTILINE
+)
+
+SENTIMENT_SCORE_PATTERN = re.compile(r'(-?[01])')
 
 def sanitize_text(text: str) -> str:
     """
@@ -16,22 +23,7 @@ def sanitize_text(text: str) -> str:
     Returns:
         Sanitized text
     """
-    if not text:
-        return ""
-    
-    # HTML decode
-    text = html.unescape(text)
-    
-    # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Remove control characters except newlines and tabs
-    text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
-    
-    # Strip leading/trailing whitespace
-    text = text.strip()
-    
-    return text
+    return normalize_text(text)
 
 def validate_message(message: str) -> Tuple[bool, Optional[str]]:
     """
@@ -51,13 +43,7 @@ def validate_message(message: str) -> Tuple[bool, Optional[str]]:
     if not sanitized:
         return False, "Message cannot be empty"
     
-    if len(sanitized) < Config.MIN_MESSAGE_LENGTH:
-        return False, f"Message must be at least {Config.MIN_MESSAGE_LENGTH} character(s)"
-    
-    if len(sanitized) > Config.MAX_MESSAGE_LENGTH:
-        return False, f"Message must be less than {Config.MAX_MESSAGE_LENGTH} characters"
-    
-    return True, None
+    return validate_normalized(sanitized)
 
 def extract_sentiment_score(ai_response: str) -> int:
     """
@@ -69,14 +55,57 @@ def extract_sentiment_score(ai_response: str) -> int:
     Returns:
         Sentiment score (-1, 0, or 1)
     """
-    # Extract sentiment score using regex
-    sentiment_match = re.search(r'(-?[01])', ai_response.strip())
+    score = find_sentiment_score(ai_response)
+    
+    # Fallback to neutral if no valid score found
+    return score if score is not None else 0
+
+def find_sentiment_score(ai_response: str) -> Optional[int]:
+    """
+    Find the first sentiment score in a complete or partial AI response
+    
+    A match in a prefix of the generation is also the first match in the full
+    generation (a trailing "-" does not match until its digit arrives), so a
+    streamed response can stop at the first hit without changing the result.
     
+    Args:
+        ai_response: Generated text so far
+        
+    Returns:
+        Sentiment score (-1, 0, or 1), or None if none has been generated yet
+    """
+    sentiment_match = SENTIMENT_SCORE_PATTERN.search(ai_response)
     if sentiment_match:
         score = int(sentiment_match.group(1))
         # Ensure score is valid
         if score in [-1, 0, 1]:
             return score
+    return None
+
+def extract_packed_scores(ai_response: str, count: int) -> Dict[int, int]:
+    """
+    Extract per-message scores from a packed AI response
     
-    # Fallback to neutral if no valid score found
-    return 0
\ No newline at end of file
+    Args:
+        ai_response: Raw AI response to a packed prompt
+        count: Number of messages in the prompt
+        
+    Returns:
+        Mapping of zero-based message index to score. Messages whose line is
+        missing, out of range or contradicted by another line are omitted.
+    """
+    scores: Dict[int, int] = {}
+    conflicting = set()
+    
+    for match in PACKED_SCORE_PATTERN.finditer(ai_response):
+        index = int(match.group(1)) - 1
+        score = int(match.group(2))
+        if not 0 <= index < count or index in conflicting:
+            continue
+        if index in scores and scores[index] != score:
+            del scores[index]
+            conflicting.add(index)
+            continue
+        scores[index] = score
+    
+    return scores
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""
+Shared test setup
+
+Service modules are imported from services/sentiment, and the stub model
+from tools/, with Config pinned to a local, deterministic setup. Config
+reads the environment at import time, so this runs before any test module
+imports them.
+"""
+import os
+import sys
+
+import pytest
+
+os.environ.update({
+    'LEXICON_ENABLED': 'false',
+    'CACHE_ENABLED': 'false',
+    'CACHE_BACKEND': '',
+    'BEDROCK_PREWARM': 'false',
+    'BEDROCK_STREAMING': 'false',
+    'TIMING_ENABLED': 'false',
+    'BEDROCK_GUARD_ENABLED': 'true',
+    'BEDROCK_RETRY_BASE_MS': '1',
+    'BEDROCK_RETRY_MAX_MS': '5',
+})
+
+SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'services', 'sentiment')
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tools')
+sys.path.insert(0, SERVICE_DIR)
+sys.path.insert(0, TOOLS_DIR)
+
+@pytest.fixture
+def stub_model(monkeypatch):
+    """
+    Route the handler's model calls to a fresh StubBedrockClient
+    
+    Returns a factory taking StubBedrockClient arguments. Each call installs
+    a new stub and a new model router with fresh guards, so limiter and
+    breaker state never leaks between tests.
+    """
+    import packing
+    import sentiment_analysis
+    from bedrock_client import client_manager
+    from model_router import build_model_router
+    from stub_bedrock import StubBedrockClient
+    
+    def install(**kwargs):
+        stub = StubBedrockClient(seed=1, **kwargs)
+        client_manager.set_client(stub)
+        router = build_model_router()
+        monkeypatch.setattr(sentiment_analysis, 'model_router', router)
+        monkeypatch.setattr(packing, 'model_router', router)
+        return stub
+    
+    return install
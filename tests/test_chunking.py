@@ -0,0 +1,138 @@
+"""
+Long-message mode: splitting, score aggregation and chunk scoring in batches
+
+Run with: python -m pytest tests
+"""
+import threading
+import time
+
+import pytest
+
+import sentiment_analysis
+from chunking import ChunkOptions, aggregate_scores, split_message, split_words
+from config import Config
+
+# Splitting
+
+def test_short_paragraphs_are_packed_together():
+    text = 'First paragraph.\n\nSecond one.\n\n\nThird.'
+    assert split_message(text, 40) == ['First paragraph. Second one. Third.']
+
+def test_long_paragraphs_split_between_sentences():
+    text = 'The screen is great. The battery is poor! Would I buy it again? Maybe.'
+    chunks = split_message(text, 30)
+    assert chunks == ['The screen is great.', 'The battery is poor!', 'Would I buy it again? Maybe.']
+
+def test_paragraph_that_fits_is_kept_whole():
+    text = 'One. Two. Three.\n\n' + 'Long sentence number one. Long sentence number two.'
+    assert split_message(text, 30) == ['One. Two. Three.', 'Long sentence number one.', 'Long sentence number two.']
+
+def test_chunks_are_normalized():
+    text = 'Nice &amp; quick   delivery.\n\n\tWould\x07 order again.'
+    assert split_message(text, 100) == ['Nice & quick delivery. Would order again.']
+
+def test_chunks_never_exceed_the_limit():
+    text = ('word ' * 80 + 'averyveryverylongwordwithoutspaces. ') * 3
+    chunks = split_message(text, 25)
+    assert all(len(chunk) <= 25 for chunk in chunks)
+    assert ''.join(chunks).replace(' ', '') == text.replace(' ', '')
+
+def test_split_words_breaks_between_words():
+    assert split_words('the quick brown fox jumps', 10) == ['the quick', 'brown fox', 'jumps']
+
+def test_split_words_cuts_overlong_words():
+    assert split_words('a abcdefghijkl b', 5) == ['a', 'abcde', 'fghij', 'kl b']
+
+def test_split_words_keeps_short_sentences():
+    assert split_words('  fits  ', 10) == ['fits']
+    assert split_words('   ', 10) == []
+
+# Aggregation
+
+def test_mean_rounds_halves_away_from_zero():
+    assert aggregate_scores([1, 0], [10, 10], 'mean') == {'score': 1, 'mean_score': 0.5, 'mixed': False}
+    assert aggregate_scores([-1, 0, 0], [10, 10, 10], 'mean')['score'] == 0
+
+def test_weighted_follows_the_longer_chunks():
+    result = aggregate_scores([1, -1, -1], [300, 50, 50], 'weighted')
+    assert result == {'score': 1, 'mean_score': 0.5, 'mixed': True}
+    assert aggregate_scores([1, -1, -1], [300, 50, 50], 'mean')['score'] == 0
+
+def test_majority_picks_the_most_common_score():
+    result = aggregate_scores([-1, -1, 1], [10, 10, 500], 'majority')
+    assert result['score'] == -1
+    assert result['mean_score'] == pytest.approx(-0.333)
+
+def test_majority_tie_falls_back_to_weighted():
+    assert aggregate_scores([1, -1], [100, 300], 'majority')['score'] == -1
+    assert aggregate_scores([1, -1], [300, 100], 'majority')['score'] == 1
+    assert aggregate_scores([1, 0, -1], [10, 10, 10], 'majority')['score'] == 0
+
+def test_aggregation_rejects_bad_input():
+    with pytest.raises(ValueError, match='Aggregation'):
+        aggregate_scores([1], [1], 'median')
+    with pytest.raises(ValueError, match='No chunk scores'):
+        aggregate_scores([], [], 'mean')
+
+# Scoring
+
+def fake_classify(text, bedrock=None):
+    return {'score': -1 if 'bad' in text else 1, 'label': 'fake', 'tier': 'bedrock'}
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(Config, 'CHUNK_MIN_LENGTH', 20)
+    monkeypatch.setattr(Config, 'CHUNK_MAX_CHARS', 20)
+    monkeypatch.setattr(sentiment_analysis, 'classify_sentiment', fake_classify)
+
+def test_message_that_fits_one_chunk_is_scored_whole(small_chunks):
+    result = sentiment_analysis.classify_long_message('A good one, really.', ChunkOptions('weighted', True))
+    assert result == fake_classify('A good one, really.')
+
+def test_long_message_is_aggregated(small_chunks):
+    message = 'The food was good. The service was bad. The view was bad.'
+    result = sentiment_analysis.classify_long_message(message, ChunkOptions('majority', True))
+    
+    assert (result['tier'], result['score'], result['chunk_count'], result['mixed']) == ('chunked', -1, 3, True)
+    assert [chunk['text'] for chunk in result['chunks']] == [
+        'The food was good.', 'The service was bad.', 'The view was bad.'
+    ]
+
+def test_failed_chunk_fails_only_its_message(small_chunks, monkeypatch):
+    def flaky(text, bedrock=None):
+        if 'broken' in text:
+            raise RuntimeError('model down')
+        return fake_classify(text)
+    
+    monkeypatch.setattr(sentiment_analysis, 'classify_sentiment', flaky)
+    messages = ['This part is fine. This part is broken.', 'This one is good. And so is this.', 'Short']
+    
+    results = sentiment_analysis.analyze_batch(messages, bedrock=object(), chunking=ChunkOptions('mean', False))
+    
+    assert results[0] == {'index': 0, 'error': 'Analysis failed: model down'}
+    assert results[1]['sentiment']['tier'] == 'chunked'
+    assert results[2]['sentiment']['tier'] == 'bedrock'
+
+def test_batch_chunks_share_one_bounded_pool(small_chunks, monkeypatch):
+    monkeypatch.setattr(Config, 'BATCH_MAX_WORKERS', 3)
+    lock = threading.Lock()
+    active = [0, 0]
+    
+    def slow_classify(text, bedrock=None):
+        with lock:
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+        return fake_classify(text)
+    
+    monkeypatch.setattr(sentiment_analysis, 'classify_sentiment', slow_classify)
+    long_message = 'It was good. It was bad. It was bad. It was good.'
+    messages = [long_message] * 4 + ['Fine'] * 3
+    
+    results = sentiment_analysis.analyze_batch(messages, bedrock=object(), chunking=ChunkOptions('weighted', False))
+    
+    assert [result['sentiment']['tier'] for result in results] == ['chunked'] * 4 + ['bedrock'] * 3
+    assert all(result['sentiment']['chunk_count'] == 4 for result in results[:4])
+    assert active[1] <= 3
@@ -0,0 +1,307 @@
+"""
+Asynchronous jobs: chunking, the in-process queue, chunk results and paging
+
+Run with: python -m pytest tests
+"""
+import json
+
+import pytest
+
+from chunking import ChunkOptions
+from config import Config
+from jobs import InMemoryJobQueue, InMemoryJobStore, JobService
+import sentiment_analysis
+
+def echo_scorer(messages, packed, chunking):
+    """Stands in for analyze_batch: one result per message, indexed within the batch"""
+    return [{'index': index, 'message': message, 'packed': packed} for index, message in enumerate(messages)]
+
+def failing_scorer(messages, packed, chunking):
+    raise RuntimeError('model down')
+
+def make_service(**kwargs) -> JobService:
+    return JobService(InMemoryJobQueue(), InMemoryJobStore(), **kwargs)
+
+def record(job_id, chunk, offset, messages, attempt=1, packed=False, chunking=None):
+    body = {
+        'job_id': job_id,
+        'chunk': chunk,
+        'offset': offset,
+        'packed': packed,
+        'chunking': chunking,
+        'messages': messages
+    }
+    return body, attempt
+
+def run_job(service: JobService, messages, scorer=echo_scorer, **submit_kwargs) -> str:
+    service.queue.attach_worker(lambda records: service.process(records, scorer))
+    job = service.submit(messages, **submit_kwargs)
+    assert service.queue.wait_idle(5)
+    return job['job_id']
+
+# Submission
+
+def test_chunks_respect_the_message_count():
+    service = make_service(chunk_size=3)
+    chunks = service._split([f'message {i}' for i in range(8)])
+    assert [(offset, len(messages)) for offset, messages in chunks] == [(0, 3), (3, 3), (6, 2)]
+
+def test_chunks_respect_the_byte_limit():
+    service = make_service(chunk_size=100, chunk_max_bytes=100)
+    messages = ['x' * 40] * 5
+    chunks = service._split(messages)
+    
+    assert [(offset, len(batch)) for offset, batch in chunks] == [(0, 2), (2, 2), (4, 1)]
+    for _, batch in chunks:
+        assert len(json.dumps(batch).encode('utf-8')) <= 100
+
+def test_message_larger_than_a_chunk_is_rejected():
+    service = make_service(chunk_max_bytes=100)
+    with pytest.raises(ValueError, match='Message 1 is too large'):
+        service.submit(['ok', 'x' * 200])
+    assert len(service.queue) == 0
+
+def test_enqueue_failure_marks_the_job_failed():
+    service = make_service()
+    
+    def broken_send(bodies):
+        raise RuntimeError('queue down')
+    
+    service.queue.send_many = broken_send
+    with pytest.raises(RuntimeError):
+        service.submit(['hello'])
+    
+    job_id = next(iter(service.store._jobs))
+    status = service.status(job_id)
+    assert status['status'] == 'failed'
+    assert 'queue down' in status['error']
+
+# Processing
+
+def test_results_are_reindexed_relative_to_the_job():
+    service = make_service()
+    job = service.submit(['a', 'b', 'c', 'd', 'e'])
+    records = [record(job['job_id'], 0, 0, ['a', 'b']), record(job['job_id'], 1, 2, ['c', 'd', 'e'])]
+    
+    assert service.process(records, echo_scorer) == []
+    
+    _, chunks = service.store.load(job['job_id'])
+    assert [result['index'] for result in chunks[0]] == [0, 1]
+    assert [(result['index'], result['message']) for result in chunks[1]] == [(2, 'c'), (3, 'd'), (4, 'e')]
+
+def test_redelivered_chunk_is_stored_with_the_same_indexes():
+    service = make_service(chunk_size=2)
+    job = service.submit(['a', 'b', 'c', 'd'])
+    # The second chunk comes back on its own, batched with another job's chunk
+    other = service.submit(['z'])
+    records = [record(other['job_id'], 0, 0, ['z']), record(job['job_id'], 1, 2, ['c', 'd'], attempt=2)]
+    
+    service.process(records, echo_scorer)
+    service.process(records, echo_scorer)
+    
+    _, chunks = service.store.load(job['job_id'])
+    assert [(result['index'], result['message']) for result in chunks[1]] == [(2, 'c'), (3, 'd')]
+
+def test_failed_chunks_are_retried_until_the_last_attempt():
+    service = make_service()
+    job = service.submit(['a', 'b', 'c'])
+    records = [
+        record(job['job_id'], 0, 0, ['a', 'b'], attempt=1),
+        record(job['job_id'], 1, 2, ['c'], attempt=Config.JOBS_MAX_ATTEMPTS)
+    ]
+    
+    assert service.process(records, failing_scorer) == [0]
+    
+    _, chunks = service.store.load(job['job_id'])
+    assert 0 not in chunks
+    assert chunks[1] == [{'index': 2, 'error': 'Analysis failed: model down'}]
+
+def test_packed_and_plain_chunks_are_scored_separately():
+    service = make_service()
+    job = service.submit(['a', 'b'])
+    records = [record(job['job_id'], 0, 0, ['a'], packed=True), record(job['job_id'], 1, 1, ['b'])]
+    
+    service.process(records, echo_scorer)
+    
+    _, chunks = service.store.load(job['job_id'])
+    assert chunks[0] == [{'index': 0, 'message': 'a', 'packed': True}]
+    assert chunks[1] == [{'index': 1, 'message': 'b', 'packed': False}]
+
+def test_chunk_options_reach_the_scorer_per_record():
+    service = make_service()
+    job = service.submit(['a', 'b', 'c'])
+    weighted = {'aggregation': 'weighted', 'include_chunks': False}
+    records = [
+        record(job['job_id'], 0, 0, ['a'], chunking=weighted),
+        record(job['job_id'], 1, 1, ['b']),
+        record(job['job_id'], 2, 2, ['c'], chunking=weighted)
+    ]
+    calls = []
+    
+    def scorer(messages, packed, chunking):
+        calls.append((messages, chunking))
+        return echo_scorer(messages, packed, chunking)
+    
+    assert service.process(records, scorer) == []
+    
+    assert calls == [(['a', 'c'], ChunkOptions('weighted', False)), (['b'], None)]
+    _, chunks = service.store.load(job['job_id'])
+    assert [chunks[chunk][0]['index'] for chunk in range(3)] == [0, 1, 2]
+
+def test_chunk_options_are_stored_with_the_job():
+    service = make_service()
+    chunking = ChunkOptions('majority', True)
+    job = service.submit(['a'], chunking=chunking)
+    
+    body, _ = service.queue._pending[0]
+    assert job['chunking'] == body['chunking'] == {'aggregation': 'majority', 'include_chunks': True}
+    assert ChunkOptions(**json.loads(json.dumps(body))['chunking']) == chunking
+
+# In-process queue
+
+def test_in_process_job_completes():
+    service = make_service(chunk_size=4)
+    job_id = run_job(service, [f'message {i}' for i in range(10)])
+    
+    status = service.status(job_id)
+    assert status['status'] == 'completed'
+    assert status['summary'] == {'total': 10, 'succeeded': 10, 'failed': 0}
+    assert [result['index'] for result in status['results']] == list(range(10))
+
+def test_failing_job_finishes_with_error_results():
+    service = make_service(chunk_size=2)
+    job_id = run_job(service, ['a', 'b', 'c'], scorer=failing_scorer)
+    
+    status = service.status(job_id)
+    assert status['status'] == 'completed'
+    assert status['summary'] == {'total': 3, 'succeeded': 0, 'failed': 3}
+
+def test_worker_exceptions_stop_after_the_last_attempt():
+    queue = InMemoryJobQueue(max_attempts=3)
+    attempts = []
+    
+    def crashing(records):
+        attempts.extend(attempt for _, attempt in records)
+        raise RuntimeError('worker crashed')
+    
+    queue.attach_worker(crashing)
+    queue.send_many([{'chunk': 0}])
+    
+    assert queue.wait_idle(5)
+    assert attempts == [1, 2, 3]
+    assert queue.dead_letters == [{'chunk': 0}]
+
+def test_wait_idle_times_out_without_a_worker():
+    queue = InMemoryJobQueue()
+    queue.send_many([{'chunk': 0}])
+    assert not queue.wait_idle(0.01)
+    assert len(queue) == 1
+
+# Status and paging
+
+def test_status_pages_through_the_results():
+    service = make_service(chunk_size=3, page_size=4)
+    job_id = run_job(service, [f'message {i}' for i in range(10)])
+    
+    pages = []
+    offset = 0
+    while offset is not None:
+        status = service.status(job_id, offset)
+        assert status['offset'] == offset
+        pages.append([result['index'] for result in status['results']])
+        offset = status['next_offset']
+    
+    assert pages == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+def test_limit_is_capped_at_the_page_size():
+    service = make_service(page_size=3)
+    job_id = run_job(service, [f'message {i}' for i in range(5)])
+    
+    status = service.status(job_id, offset=1, limit=10)
+    assert [result['index'] for result in status['results']] == [1, 2, 3]
+    assert status['next_offset'] == 4
+    assert len(service.status(job_id, offset=4, limit=2)['results']) == 1
+
+def test_pages_stop_at_the_byte_limit():
+    service = make_service(page_max_bytes=120)
+    job_id = run_job(service, ['x' * 30] * 6)
+    
+    status = service.status(job_id)
+    page_bytes = len(json.dumps(status['results']).encode('utf-8'))
+    assert 0 < len(status['results']) < 6
+    assert page_bytes <= 120
+    assert status['next_offset'] == len(status['results'])
+
+def test_oversized_result_still_makes_a_page():
+    service = make_service(page_max_bytes=10)
+    job_id = run_job(service, ['x' * 30, 'y'])
+    
+    status = service.status(job_id)
+    assert len(status['results']) == 1
+    assert status['next_offset'] == 1
+
+def test_unknown_job_has_no_status():
+    assert make_service().status('missing') is None
+
+# Handler
+
+def test_jobs_endpoint_submits_and_reports(stub_model, monkeypatch):
+    stub_model()
+    service = make_service(chunk_size=2)
+    monkeypatch.setattr(sentiment_analysis, 'job_service', service)
+    messages = ['I love it', 'Terrible service', 'It arrived']
+    
+    response = sentiment_analysis.route_event(
+        {'httpMethod': 'POST', 'path': '/jobs', 'body': json.dumps({'messages': messages})}
+    )
+    assert response['statusCode'] == 202
+    job_id = json.loads(response['body'])['job_id']
+    assert service.queue.wait_idle(5)
+    
+    response = sentiment_analysis.route_event({
+        'httpMethod': 'GET',
+        'path': f'/jobs/{job_id}',
+        'queryStringParameters': {'offset': '1', 'limit': '5'}
+    })
+    status = json.loads(response['body'])
+    assert response['statusCode'] == 200
+    assert status['status'] == 'completed'
+    assert [result['index'] for result in status['results']] == [1, 2]
+    assert status['summary']['succeeded'] == 3
+
+def test_jobs_endpoint_applies_chunk_options(stub_model, monkeypatch):
+    stub_model()
+    service = make_service()
+    monkeypatch.setattr(sentiment_analysis, 'job_service', service)
+    monkeypatch.setattr(Config, 'CHUNK_MIN_LENGTH', 40)
+    monkeypatch.setattr(Config, 'CHUNK_MAX_CHARS', 30)
+    long_message = 'I love the new design. The battery lasts all day. Great value.'
+    body = {'messages': [long_message, 'Fine'], 'chunked': True, 'aggregation': 'majority', 'include_chunks': True}
+    
+    response = sentiment_analysis.route_event({'httpMethod': 'POST', 'path': '/jobs', 'body': json.dumps(body)})
+    job_id = json.loads(response['body'])['job_id']
+    assert service.queue.wait_idle(5)
+    
+    results = service.status(job_id)['results']
+    assert results[0]['sentiment']['tier'] == 'chunked'
+    assert results[0]['sentiment']['aggregation'] == 'majority'
+    assert len(results[0]['sentiment']['chunks']) == results[0]['sentiment']['chunk_count'] > 1
+    assert results[1]['sentiment']['tier'] == 'bedrock'
+
+def test_jobs_endpoint_rejects_bad_chunk_options(monkeypatch):
+    service = make_service()
+    monkeypatch.setattr(sentiment_analysis, 'job_service', service)
+    body = {'messages': ['hello'], 'chunked': True, 'aggregation': 'median'}
+    
+    response = sentiment_analysis.route_event({'httpMethod': 'POST', 'path': '/jobs', 'body': json.dumps(body)})
+    
+    assert response['statusCode'] == 400
+    assert 'Aggregation' in json.loads(response['body'])['error']
+    assert len(service.queue) == 0
+
+def test_jobs_endpoint_rejects_bad_paging(monkeypatch):
+    monkeypatch.setattr(sentiment_analysis, 'job_service', make_service())
+    response = sentiment_analysis.route_event(
+        {'httpMethod': 'GET', 'path': '/jobs/abc', 'queryStringParameters': {'offset': '-1'}}
+    )
+    assert response['statusCode'] == 400
@@ -0,0 +1,94 @@
+"""
+Model router: failover, degraded models and read-only statistics
+
+Run with: python -m pytest tests
+"""
+import time
+
+import pytest
+
+from model_router import ModelRoute, ModelRouter, ModelStats, family_for
+from stub_bedrock import StubClientError, ThrottlingException
+
+PRIMARY = 'meta.llama3-8b-instruct-v1:0'
+SECONDARY = 'anthropic.claude-3-haiku-20240307-v1:0'
+
+def make_router(cooldown_seconds: float = 30.0) -> ModelRouter:
+    routes = [
+        ModelRoute(model_id, family_for(model_id), None, ModelStats(window=10, min_samples=2))
+        for model_id in (PRIMARY, SECONDARY)
+    ]
+    return ModelRouter(routes, error_threshold=0.5, cooldown_seconds=cooldown_seconds)
+
+def failing_on(model_id: str, error: Exception):
+    """Model call that raises error on one model and answers on the others"""
+    def call(route):
+        if route.model_id == model_id:
+            raise error
+        return route.model_id
+    return call
+
+def test_transient_errors_fail_over_and_count():
+    router = make_router()
+    throttled = ThrottlingException()
+    
+    result, route = router.call(failing_on(PRIMARY, throttled))
+    
+    assert result == route.model_id == SECONDARY
+    assert router.failovers == 1
+    assert (router.primary.stats.requests, router.primary.stats.errors) == (1, 1)
+
+def test_non_retryable_errors_are_raised_without_failover():
+    router = make_router()
+    invalid = StubClientError('ValidationException', 'Malformed input request.', 400)
+    
+    with pytest.raises(StubClientError, match='Malformed'):
+        router.call(failing_on(PRIMARY, invalid))
+    
+    assert router.failovers == 0
+    assert router.primary.stats.errors == 0
+    assert router.routes[1].stats.requests == 0
+
+def test_last_transient_error_is_raised_when_every_model_fails():
+    router = make_router()
+    
+    def unavailable(route):
+        raise TimeoutError(route.model_id)
+    
+    with pytest.raises(TimeoutError, match=SECONDARY):
+        router.call(unavailable)
+
+def test_failing_model_is_degraded_and_routed_last():
+    router = make_router()
+    for _ in range(2):
+        router.primary.stats.record(False)
+    
+    assert [route.model_id for route in router.candidates()] == [SECONDARY, PRIMARY]
+    assert router.primary.stats.degraded_until > 0
+
+def test_cooldown_ends_with_fresh_statistics():
+    router = make_router(cooldown_seconds=0.01)
+    for _ in range(2):
+        router.primary.stats.record(False)
+    router.candidates()
+    time.sleep(0.02)
+    
+    assert router.candidates()[0] is router.primary
+    assert router.primary.stats.degraded_until == 0
+    assert router.primary.stats.error_rate() is None
+
+def test_stats_do_not_change_model_state():
+    router = make_router(cooldown_seconds=0.01)
+    for _ in range(2):
+        router.primary.stats.record(False)
+    
+    # An error rate over the threshold reads as degraded without starting a cooldown
+    assert router.stats()['models'][0]['state'] == 'degraded'
+    assert router.primary.stats.degraded_until == 0
+    
+    router.candidates()
+    time.sleep(0.02)
+    # An expired cooldown reads as healthy, but only routing resets the statistics
+    assert router.stats()['models'][0]['state'] == 'healthy'
+    assert router.primary.stats.degraded_until > 0
+    assert router.primary.stats.error_rate() == 1.0
@@ -0,0 +1,266 @@
+"""
+Bedrock guard: AIMD limiter, retries, circuit breaker, hedging and the 503 mapping
+
+Faults come from StubBedrockClient, so every path runs without AWS access.
+
+Run with: python -m pytest tests
+"""
+import json
+import threading
+import time
+
+import pytest
+
+from resilience import AIMDLimiter, BedrockGuard, CircuitBreaker, LatencyTracker, ModelUnavailableError
+from sentiment_analysis import lambda_handler
+from stub_bedrock import ReadTimeoutError, StubBedrockClient, StubClientError, ThrottlingException
+
+MODEL_ID = 'meta.llama3-8b-instruct-v1:0'
+RESET_SECONDS = 0.05
+
+def make_guard(max_retries: int = 0, failure_threshold: int = 1, **kwargs) -> BedrockGuard:
+    return BedrockGuard(
+        AIMDLimiter(4, 1, 4),
+        CircuitBreaker(failure_threshold=failure_threshold, reset_seconds=RESET_SECONDS),
+        max_retries=max_retries,
+        retry_base_ms=1,
+        retry_max_ms=5,
+        **kwargs
+    )
+
+def invoke(stub: StubBedrockClient) -> str:
+    """One model call against the stub, returning the generation"""
+    body = json.dumps({'prompt': 'Message: "I love it"\nSentiment score:', 'max_gen_len': 1})
+    response = stub.invoke_model(modelId=MODEL_ID, body=body)
+    return json.loads(response['body'].read())['generation']
+
+def unavailable():
+    raise StubClientError('ServiceUnavailableException', 'Bedrock is unable to process your request.', 503)
+
+def invalid():
+    raise StubClientError('ValidationException', 'Malformed input request.', 400)
+
+def open_circuit(guard: BedrockGuard) -> None:
+    with pytest.raises(ModelUnavailableError):
+        guard.call(unavailable)
+    assert guard.breaker.state == 'open'
+    time.sleep(RESET_SECONDS * 2)
+
+def single_message_event(message: str = 'The delivery was on time') -> dict:
+    return {'httpMethod': 'POST', 'path': '/', 'body': json.dumps({'message': message})}
+
+# AIMD limiter
+
+def test_limiter_grows_additively_on_success():
+    limiter = AIMDLimiter(initial=2, minimum=1, maximum=3)
+    for _ in range(2):
+        assert limiter.acquire(0)
+        limiter.release()
+    assert limiter.limit == pytest.approx(2 + 1 / 2 + 1 / 2.5)
+    
+    for _ in range(10):
+        assert limiter.acquire(0)
+        limiter.release()
+    assert limiter.limit == 3
+
+def test_limiter_halves_on_throttle_once_per_cooldown():
+    limiter = AIMDLimiter(initial=8, minimum=1, maximum=16, cooldown_seconds=0.05)
+    for _ in range(3):
+        assert limiter.acquire(0)
+        limiter.release(throttled=True, succeeded=False)
+    assert limiter.limit == 4
+    
+    time.sleep(0.06)
+    assert limiter.acquire(0)
+    limiter.release(throttled=True, succeeded=False)
+    assert limiter.limit == 2
+
+def test_limiter_never_drops_below_minimum():
+    limiter = AIMDLimiter(initial=2, minimum=1.5, maximum=4, cooldown_seconds=0)
+    for _ in range(3):
+        assert limiter.acquire(0)
+        limiter.release(throttled=True, succeeded=False)
+    assert limiter.limit == 1.5
+
+def test_limiter_rejects_when_full_and_wakes_waiters():
+    limiter = AIMDLimiter(initial=1, minimum=1, maximum=1)
+    assert limiter.acquire(0)
+    assert not limiter.acquire(0.01)
+    
+    threading.Timer(0.02, limiter.release).start()
+    assert limiter.acquire(1)
+
+# Retries and backoff
+
+def test_throttles_are_retried_then_reported_unavailable():
+    stub = StubBedrockClient(throttle_rate=1.0)
+    guard = make_guard(max_retries=2, failure_threshold=10)
+    
+    with pytest.raises(ModelUnavailableError) as raised:
+        guard.call(invoke, stub)
+    
+    assert isinstance(raised.value.__cause__, ThrottlingException)
+    assert stub.calls == 3
+    stats = guard.stats()
+    assert (stats['retries'], stats['throttles'], stats['failures']) == (2, 3, 1)
+    assert guard.limiter.limit < 4
+
+def test_timeouts_are_retried():
+    stub = StubBedrockClient(timeout_rate=1.0)
+    guard = make_guard(max_retries=1, failure_threshold=10)
+    
+    with pytest.raises(ModelUnavailableError) as raised:
+        guard.call(invoke, stub)
+    
+    assert isinstance(raised.value.__cause__, ReadTimeoutError)
+    assert stub.calls == 2
+
+def test_retry_succeeds_once_the_model_recovers():
+    stub = StubBedrockClient(error_rate=1.0)
+    
+    def recovering():
+        try:
+            return invoke(stub)
+        finally:
+            stub.error_rate = 0.0
+    
+    guard = make_guard(max_retries=2, failure_threshold=10)
+    assert guard.call(recovering).strip() == '1'
+    assert (stub.calls, stub.errors) == (2, 1)
+    assert guard.stats()['retries'] == 1
+    assert guard.breaker.state == 'closed'
+
+def test_non_retryable_errors_are_raised_unchanged():
+    guard = make_guard(max_retries=2)
+    with pytest.raises(StubClientError, match='Malformed'):
+        guard.call(invalid)
+    assert guard.stats()['retries'] == 0
+
+def test_backoff_uses_capped_full_jitter():
+    guard = BedrockGuard(AIMDLimiter(1, 1, 1), CircuitBreaker(5, 10), retry_base_ms=10, retry_max_ms=50)
+    for attempt, ceiling in ((0, 0.01), (1, 0.02), (2, 0.04), (5, 0.05)):
+        delays = [guard._backoff_seconds(attempt) for _ in range(200)]
+        assert all(0 <= delay <= ceiling for delay in delays)
+        assert max(delays) > ceiling / 2
+
+def test_no_limiter_slot_is_reported_unavailable():
+    guard = make_guard(admission_timeout=0.01)
+    assert guard.limiter.acquire(0)
+    guard.limiter.limit = 1
+    
+    with pytest.raises(ModelUnavailableError, match='Too many concurrent'):
+        guard.call(lambda: 'ok')
+    assert guard.stats()['rejected'] == 1
+
+# Circuit breaker
+
+def test_open_circuit_short_circuits_calls():
+    guard = make_guard()
+    stub = StubBedrockClient()
+    with pytest.raises(ModelUnavailableError):
+        guard.call(unavailable)
+    
+    with pytest.raises(ModelUnavailableError, match='temporarily unavailable') as raised:
+        guard.call(invoke, stub)
+    assert raised.value.retry_after >= 1
+    assert stub.calls == 0
+    assert guard.stats()['short_circuited'] == 1
+
+def test_non_retryable_probe_failure_closes_the_circuit():
+    guard = make_guard()
+    open_circuit(guard)
+    
+    with pytest.raises(StubClientError):
+        guard.call(invalid)
+    
+    assert guard.breaker.state == 'closed'
+    assert guard.call(lambda: 'ok') == 'ok'
+
+def test_retryable_probe_failure_reopens_the_circuit():
+    guard = make_guard()
+    open_circuit(guard)
+    
+    with pytest.raises(ModelUnavailableError):
+        guard.call(unavailable)
+    
+    assert guard.breaker.state == 'open'
+    with pytest.raises(ModelUnavailableError, match='temporarily unavailable'):
+        guard.call(lambda: 'ok')
+    time.sleep(RESET_SECONDS * 2)
+    assert guard.call(lambda: 'ok') == 'ok'
+
+# Hedging
+
+def make_hedging_guard() -> BedrockGuard:
+    latency = LatencyTracker(window=10, min_samples=1)
+    latency.observe(1)
+    return make_guard(hedge=True, hedge_min_delay_ms=10, latency=latency)
+
+def sequenced(*behaviours):
+    """Function whose n-th call runs the n-th behaviour"""
+    calls = iter(behaviours)
+    lock = threading.Lock()
+    
+    def call():
+        with lock:
+            behaviour = next(calls)
+        return behaviour()
+    return call
+
+def test_hedge_wins_when_the_primary_is_slow():
+    stub = StubBedrockClient()
+    slow = StubBedrockClient(latency_ms=500)
+    guard = make_hedging_guard()
+    
+    started = time.perf_counter()
+    result = guard.call(sequenced(lambda: invoke(slow), lambda: invoke(stub)))
+    
+    assert result.strip() == '1'
+    assert time.perf_counter() - started < 0.4
+    assert (guard.stats()['hedges'], guard.stats()['hedge_wins']) == (1, 1)
+
+def test_failed_hedge_falls_back_to_the_primary():
+    slow = StubBedrockClient(latency_ms=100)
+    failing = StubBedrockClient(error_rate=1.0)
+    guard = make_hedging_guard()
+    
+    result = guard.call(sequenced(lambda: invoke(slow), lambda: invoke(failing)))
+    
+    assert result.strip() == '1'
+    assert failing.errors == 1
+    assert (guard.stats()['hedges'], guard.stats()['hedge_wins']) == (1, 0)
+
+def test_no_hedge_without_a_spare_slot():
+    slow = StubBedrockClient(latency_ms=50)
+    guard = make_hedging_guard()
+    guard.limiter.limit = 1
+    
+    assert guard.call(invoke, slow).strip() == '1'
+    assert slow.calls == 1
+    assert guard.stats()['hedges'] == 0
+
+# Handler
+
+def test_handler_maps_exhausted_retries_to_503_with_retry_after(stub_model):
+    stub = stub_model(error_rate=1.0)
+    
+    response = lambda_handler(single_message_event(), None)
+    
+    assert response['statusCode'] == 503
+    assert int(response['headers']['Retry-After']) >= 1
+    assert 'Content-Type' in response['headers']
+    assert 'Service unavailable' in json.loads(response['body'])['error']
+    assert stub.calls > 1
+
+def test_handler_maps_throttling_to_503(stub_model):
+    stub_model(throttle_rate=1.0)
+    response = lambda_handler(single_message_event(), None)
+    assert response['statusCode'] == 503
+    assert 'Retry-After' in response['headers']
+
+def test_handler_scores_through_a_healthy_stub(stub_model):
+    stub = stub_model()
+    response = lambda_handler(single_message_event('I love it, excellent service'), None)
+    assert response['statusCode'] == 200
+    assert json.loads(response['body'])['sentiment']['score'] == 1
+    assert stub.calls == 1
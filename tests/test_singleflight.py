@@ -0,0 +1,71 @@
+"""
+Single-flight coalescing, and the copies shipped with the Lambda and the web app
+
+Run with: python -m pytest tests
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from singleflight import SingleFlight
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+def test_lambda_and_web_copies_are_identical():
+    with open(os.path.join(ROOT, 'services', 'sentiment', 'singleflight.py')) as f:
+        service_copy = f.read()
+    with open(os.path.join(ROOT, 'web', 'singleflight.py')) as f:
+        web_copy = f.read()
+    assert service_copy == web_copy, 'Edit both singleflight.py copies together'
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    
+    def slow(value):
+        calls.append(value)
+        started.set()
+        release.wait(1)
+        return {'value': value}
+    
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        leader = executor.submit(flight.do, 'key', slow, 1)
+        started.wait(1)
+        waiters = [executor.submit(flight.do, 'key', slow, 2) for _ in range(2)]
+        while flight.stats()['coalesced'] < 2:
+            time.sleep(0.001)
+        release.set()
+        results = [leader.result()] + [waiter.result() for waiter in waiters]
+    
+    assert calls == [1]
+    assert results == [({'value': 1}, False), ({'value': 1}, True), ({'value': 1}, True)]
+    assert flight.stats() == {'executions': 1, 'coalesced': 2, 'errors': 0, 'in_flight': 0}
+
+def test_failures_reach_every_waiter_and_are_not_reused():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    
+    def failing():
+        started.set()
+        release.wait(1)
+        raise RuntimeError('model down')
+    
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.do, 'key', failing)
+        started.wait(1)
+        waiter = executor.submit(flight.do, 'key', failing)
+        while flight.stats()['coalesced'] < 1:
+            time.sleep(0.001)
+        release.set()
+        for future in (leader, waiter):
+            with pytest.raises(RuntimeError, match='model down'):
+                future.result()
+    
+    assert flight.do('key', lambda: 'ok') == ('ok', False)
+    assert flight.stats() == {'executions': 2, 'coalesced': 1, 'errors': 1, 'in_flight': 0}
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Bulk sentiment scoring for JSONL dumps
+
+Streams the input line by line through the same sanitize/validate/classify
+pipeline as the Lambda handler on a bounded worker pool, writes one JSONL
+result per input line in input order, and checkpoints the input byte offset
+so an interrupted run resumes without rescoring.
+
+It lives outside services/sentiment so it is not deployed with the Lambda
+asset, and imports the service modules from there.
+
+Usage:
+    python tools/bulk_score.py tickets.jsonl -o scored.jsonl --field body --id-field request_id
+    python tools/bulk_score.py tickets.jsonl -o scored.jsonl --resume
+    python tools/bulk_score.py tickets.jsonl -o scored.jsonl --stub   # local stub model, no AWS
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, BinaryIO, Deque, Dict, Optional, TextIO, Tuple
+
+SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'services', 'sentiment')
+sys.path.insert(0, SERVICE_DIR)
+
+from config import Config
+from normalize import normalize_text, validate_normalized
+from bedrock_client import client_manager
+from sentiment_analysis import classify_sentiment
+
+def score_line(line: bytes, field: str, id_field: Optional[str]) -> Dict[str, Any]:
+    """
+    Score one raw input line
+    
+    Args:
+        line: Raw JSONL line
+        field: Name of the message field
+        id_field: Optional name of an identifier field copied to the output
+        
+    Returns:
+        Output record with either a sentiment or an error
+    """
+    record: Dict[str, Any] = {}
+    try:
+        item = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return {'error': 'Invalid JSON'}
+    
+    if not isinstance(item, dict):
+        return {'error': 'Line must be a JSON object'}
+    
+    if id_field:
+        record['id'] = item.get(id_field)
+    
+    message = item.get(field)
+    if not isinstance(message, str):
+        record['error'] = f'Field "{field}" must be a string'
+        return record
+    
+    sanitized_message = normalize_text(message)
+    is_valid, error_msg = validate_normalized(sanitized_message)
+    if not is_valid:
+        record['error'] = error_msg
+        return record
+    
+    try:
+        record['sentiment'] = classify_sentiment(sanitized_message)
+    except Exception as e:
+        record['error'] = f'Analysis failed: {str(e)}'
+    return record
+
+class Checkpoint:
+    """Byte-offset checkpoint written atomically next to the output file"""
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Return the saved checkpoint, or None if there is none"""
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'r') as f:
+            return json.load(f)
+    
+    def save(self, state: Dict[str, Any]) -> None:
+        """Persist the checkpoint with write-then-rename"""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+    
+    def remove(self) -> None:
+        """Delete the checkpoint after a completed run"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+class BulkScorer:
+    """Runs a bulk scoring job with a bounded in-flight window"""
+    
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.checkpoint = Checkpoint(args.checkpoint or args.output + '.ckpt')
+        self.processed = 0
+        self.resumed_from = 0
+        self.errors = 0
+        self.started = time.monotonic()
+        self.last_report = self.started
+        self.last_checkpoint = self.started
+    
+    def run(self) -> Dict[str, Any]:
+        """
+        Score the input file
+        
+        Returns:
+            Final run statistics
+        """
+        input_offset, output_offset, state = self._resume_position()
+        self.processed = self.resumed_from = state.get('processed', 0)
+        self.errors = state.get('errors', 0)
+        
+        window: Deque[Tuple[int, int, Future]] = deque()
+        max_in_flight = self.args.workers * 4
+        
+        with open(self.args.input, 'rb') as source, \
+                open(self.args.output, 'r+b' if output_offset else 'wb') as output, \
+                ThreadPoolExecutor(max_workers=self.args.workers) as executor:
+            source.seek(input_offset)
+            output.seek(output_offset)
+            output.truncate()
+            line_number = self.processed
+            offset = input_offset
+            
+            for line in source:
+                offset += len(line)
+                line_number += 1
+                if not line.strip():
+                    continue
+                future = executor.submit(score_line, line, self.args.field, self.args.id_field)
+                window.append((line_number, offset, future))
+                if len(window) >= max_in_flight:
+                    self._write_next(window, output)
+            
+            while window:
+                self._write_next(window, output)
+            
+            self._save_checkpoint(output, offset)
+        
+        stats = self._stats()
+        self._report(final=True)
+        if not self.args.keep_checkpoint:
+            self.checkpoint.remove()
+        return stats
+    
+    def _resume_position(self) -> Tuple[int, int, Dict[str, Any]]:
+        if not self.args.resume:
+            return 0, 0, {}
+        state = self.checkpoint.load()
+        if state is None:
+            return 0, 0, {}
+        if state.get('input') != os.path.abspath(self.args.input):
+            raise SystemExit(f'Checkpoint {self.checkpoint.path} belongs to a different input file')
+        return state['input_offset'], state['output_offset'], state
+    
+    def _write_next(self, window: Deque[Tuple[int, int, Future]], output: BinaryIO) -> None:
+        line_number, offset, future = window.popleft()
+        record = {'line': line_number, **future.result()}
+        output.write(json.dumps(record).encode('utf-8') + b'\n')
+        self.processed = line_number
+        if 'error' in record:
+            self.errors += 1
+        
+        now = time.monotonic()
+        if now - self.last_checkpoint >= self.args.checkpoint_interval:
+            self._save_checkpoint(output, offset)
+            self.last_checkpoint = now
+        if now - self.last_report >= self.args.progress_interval:
+            self._report()
+            self.last_report = now
+    
+    def _save_checkpoint(self, output: BinaryIO, input_offset: int) -> None:
+        # Results must be durable before the offset that covers them
+        output.flush()
+        os.fsync(output.fileno())
+        self.checkpoint.save({
+            'input': os.path.abspath(self.args.input),
+            'input_offset': input_offset,
+            'output_offset': output.tell(),
+            'processed': self.processed,
+            'errors': self.errors
+        })
+    
+    def _stats(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self.started
+        scored = self.processed - self.resumed_from
+        return {
+            'processed': self.processed,
+            'errors': self.errors,
+            'resumed_from_line': self.resumed_from,
+            'elapsed_seconds': round(elapsed, 2),
+            'lines_per_second': round(scored / elapsed, 1) if elapsed else 0.0
+        }
+    
+    def _report(self, final: bool = False, stream: TextIO = sys.stderr) -> None:
+        stats = self._stats()
+        prefix = 'done' if final else 'progress'
+        print(
+            f"[{prefix}] lines={stats['processed']} errors={stats['errors']} "
+            f"rate={stats['lines_per_second']}/s elapsed={stats['elapsed_seconds']}s",
+            file=stream,
+            flush=True
+        )
+
+def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Bulk-score a JSONL file of messages')
+    parser.add_argument('input', help='Input JSONL file')
+    parser.add_argument('-o', '--output', required=True, help='Output JSONL file')
+    parser.add_argument('--field', default='message', help='Message field name (default: message)')
+    parser.add_argument('--id-field', help='Identifier field copied to each result')
+    parser.add_argument('--workers', type=int, default=Config.BATCH_MAX_WORKERS, help='Concurrent scoring workers')
+    parser.add_argument('--resume', action='store_true', help='Continue from the last checkpoint')
+    parser.add_argument('--checkpoint', help='Checkpoint path (default: <output>.ckpt)')
+    parser.add_argument('--checkpoint-interval', type=float, default=5.0, help='Seconds between checkpoints')
+    parser.add_argument('--keep-checkpoint', action='store_true', help='Keep the checkpoint after success')
+    parser.add_argument('--progress-interval', type=float, default=5.0, help='Seconds between progress lines')
+    parser.add_argument('--stub', action='store_true', help='Use the local stub model instead of Bedrock')
+    parser.add_argument('--stub-latency-ms', type=float, default=0.0, help='Simulated stub model latency')
+    return parser.parse_args(argv)
+
+def main(argv: Optional[list] = None) -> int:
+    args = parse_args(argv)
+    if args.stub:
+        from stub_bedrock import StubBedrockClient
+        client_manager.set_client(StubBedrockClient(latency_ms=args.stub_latency_ms))
+    
+    stats = BulkScorer(args).run()
+    print(json.dumps(stats), file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""
+Local stand-in for the Bedrock runtime client
+
+Answers sentiment prompts with the lexicon scorer so tools and tests can run
+the full pipeline without AWS access. Requests and responses use the body
+format of the requested model's family, and latency and failures can be set
+per model to exercise the router.
+
+It lives in tools/ so it is never deployed with the Lambda asset; importers
+put services/sentiment on sys.path for the lexicon and model families.
+"""
+import io
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+from lexicon import score_lexicon
+from model_router import family_for
+
+_SINGLE_MESSAGE_PATTERN = re.compile(r'Message: "(.*)"\s*\n\s*Sentiment score:', re.DOTALL)
+_PACKED_MESSAGE_PATTERN = re.compile(r'^(\d+)\. "(.*)"$', re.MULTILINE)
+
+class StubClientError(Exception):
+    """
+    Failed call, shaped like botocore's ClientError
+    
+    Code that inspects ``error.response['Error']['Code']`` treats it the same
+    as a real Bedrock error, without the stub depending on botocore.
+    
+    Args:
+        code: Bedrock error code, e.g. ServiceUnavailableException
+        message: Error message
+        status: HTTP status code
+        operation_name: API operation that failed
+    """
+    
+    def __init__(self, code: str, message: str, status: int, operation_name: str = 'InvokeModel'):
+        super().__init__(f'An error occurred ({code}) when calling the {operation_name} operation: {message}')
+        self.operation_name = operation_name
+        self.response = {
+            'Error': {'Code': code, 'Message': message},
+            'ResponseMetadata': {'HTTPStatusCode': status}
+        }
+
+class ThrottlingException(StubClientError):
+    """Throttled call, like botocore's ClientError for ThrottlingException"""
+    
+    def __init__(self, operation_name: str = 'InvokeModel', message: str = 'Too many requests, please wait before trying again.'):
+        super().__init__('ThrottlingException', message, 429, operation_name)
+
+class ReadTimeoutError(Exception):
+    """Stand-in for botocore's ReadTimeoutError (matched by class name)"""
+
+class StubBedrockClient:
+    """
+    Fake Bedrock runtime client implementing invoke_model and
+    invoke_model_with_response_stream
+    
+    Args:
+        latency_ms: Simulated time to the first generated token
+        jitter_ms: Uniform random jitter added to the latency
+        seed: Random seed for reproducible jitter and injected faults
+        throttle_rate: Fraction of calls (0-1) rejected with ThrottlingException
+        token_ms: Simulated time per generated token; every call generates
+            max_gen_len tokens, which a stream delivers one chunk at a time
+        error_rate: Fraction of calls failing with ServiceUnavailableException
+        timeout_rate: Fraction of calls raising ReadTimeoutError after the latency
+        slow_rate: Fraction of calls delayed by an extra slow_ms (tail latency)
+        slow_ms: Extra latency of slow calls
+        prompt_ms_per_kchar: Extra time to the first token per 1000 prompt
+            characters, so long prompts are slower to answer
+        model_latency_ms: Per-model latency overriding latency_ms
+        failing_models: Model IDs whose calls all fail with ServiceUnavailableException
+    """
+    
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: Optional[int] = None,
+                 throttle_rate: float = 0.0, token_ms: float = 0.0, error_rate: float = 0.0,
+                 timeout_rate: float = 0.0, slow_rate: float = 0.0, slow_ms: float = 0.0,
+                 prompt_ms_per_kchar: float = 0.0, model_latency_ms: Optional[Dict[str, float]] = None,
+                 failing_models: Optional[Iterable[str]] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle_rate = throttle_rate
+        self.token_ms = token_ms
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.prompt_ms_per_kchar = prompt_ms_per_kchar
+        self.model_latency_ms = dict(model_latency_ms or {})
+        self.failing_models = set(failing_models or ())
+        self.calls = 0
+        self.model_calls: Counter = Counter()
+        self.throttled = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.slowed = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def invoke_model(self, modelId: str, body: str, **kwargs: Any) -> Dict[str, Any]:
+        """Return a Bedrock-shaped response with a lexicon-derived generation"""
+        request, latency_ms = self._admit(modelId, body)
+        self._sleep(latency_ms + self.token_ms * self._token_count(request))
+        generation = self.generate(self._prompt(request))
+        payload = json.dumps(self._response_body(modelId, generation)).encode('utf-8')
+        return {'body': io.BytesIO(payload), 'contentType': 'application/json'}
+    
+    def invoke_model_with_response_stream(self, modelId: str, body: str, **kwargs: Any) -> Dict[str, Any]:
+        """Return a Bedrock-shaped event stream: the generation, then filler tokens"""
+        request, latency_ms = self._admit(modelId, body)
+        generation = self.generate(self._prompt(request))
+        events = self._stream(modelId, generation, self._token_count(request), latency_ms)
+        return {'body': _StubEventStream(events), 'contentType': 'application/json'}
+    
+    def _stream(self, model_id: str, generation: str, tokens: int, latency_ms: float) -> Iterator[Dict[str, Any]]:
+        self._sleep(latency_ms + self.token_ms)
+        for position in range(tokens):
+            if position:
+                self._sleep_ms(self.token_ms)
+            chunk = self._chunk(model_id, generation if position == 0 else '', position == tokens - 1)
+            yield {'chunk': {'bytes': json.dumps(chunk).encode('utf-8')}}
+    
+    def _admit(self, model_id: str, body: str) -> Tuple[Dict[str, Any], float]:
+        """Count the call and inject a fault; returns the request and the call's latency"""
+        fault = None
+        latency_ms = self.model_latency_ms.get(model_id, self.latency_ms)
+        with self._lock:
+            self.calls += 1
+            self.model_calls[model_id] += 1
+            rates = (('throttled', self.throttle_rate), ('errors', self.error_rate),
+                     ('timeouts', self.timeout_rate), ('slowed', self.slow_rate))
+            if any(rate > 0 for _, rate in rates):
+                draw = self._random.random()
+                for name, rate in rates:
+                    if draw < rate:
+                        fault = name
+                        setattr(self, name, getattr(self, name) + 1)
+                        break
+                    draw -= rate
+        # Throttles and errors are rejected up front, without model latency
+        if model_id in self.failing_models:
+            raise StubClientError('ServiceUnavailableException', f'{model_id} is unavailable.', 503)
+        if fault == 'throttled':
+            raise ThrottlingException()
+        if fault == 'errors':
+            raise StubClientError('ServiceUnavailableException', 'Bedrock is unable to process your request.', 503)
+        if fault == 'timeouts':
+            self._sleep(latency_ms)
+            raise ReadTimeoutError('Read timeout on endpoint URL: "stub"')
+        request = json.loads(body)
+        latency_ms += self.prompt_ms_per_kchar * len(self._prompt(request)) / 1000
+        return request, latency_ms + (self.slow_ms if fault == 'slowed' else 0.0)
+    
+    @staticmethod
+    def _prompt(request: Dict[str, Any]) -> str:
+        """Prompt text of any supported family's request body"""
+        if 'messages' in request:
+            return request['messages'][0]['content']
+        return request.get('prompt') or request.get('inputText') or request.get('message') or ''
+    
+    @staticmethod
+    def _token_count(request: Dict[str, Any]) -> int:
+        limit = (request.get('max_gen_len') or request.get('max_tokens')
+                 or request.get('textGenerationConfig', {}).get('maxTokenCount') or 1)
+        return max(1, int(limit))
+    
+    @staticmethod
+    def _response_body(model_id: str, generation: str) -> Dict[str, Any]:
+        family = family_for(model_id).name
+        if family == 'anthropic':
+            return {'content': [{'type': 'text', 'text': generation}], 'stop_reason': 'end_turn'}
+        if family == 'mistral':
+            return {'outputs': [{'text': generation, 'stop_reason': 'stop'}]}
+        if family == 'titan':
+            return {'results': [{'outputText': generation, 'completionReason': 'FINISH'}]}
+        if family == 'cohere':
+            return {'text': generation, 'finish_reason': 'COMPLETE'}
+        return {'generation': generation, 'stop_reason': 'stop'}
+    
+    @staticmethod
+    def _chunk(model_id: str, text: str, last: bool) -> Dict[str, Any]:
+        family = family_for(model_id).name
+        if family == 'anthropic':
+            return {'type': 'content_block_delta', 'index': 0, 'delta': {'type': 'text_delta', 'text': text}}
+        if family == 'mistral':
+            return {'outputs': [{'text': text, 'stop_reason': 'length' if last else None}]}
+        if family == 'titan':
+            return {'outputText': text, 'index': 0, 'completionReason': 'LENGTH' if last else None}
+        if family == 'cohere':
+            return {'text': text, 'is_finished': last, 'event_type': 'text-generation'}
+        return {'generation': text, 'stop_reason': 'length' if last else None}
+    
+    def generate(self, prompt: str) -> str:
+        """
+        Produce the text a model would generate for a sentiment prompt
+        
+        Args:
+            prompt: Single or packed sentiment prompt
+            
+        Returns:
+            Generated text
+        """
+        packed = _PACKED_MESSAGE_PATTERN.findall(prompt)
+        if packed:
+            return '\n'.join(f'{number}: {score_lexicon(message)[0]}' for number, message in packed)
+        
+        match = _SINGLE_MESSAGE_PATTERN.search(prompt)
+        message = match.group(1) if match else prompt
+        return f' {score_lexicon(message)[0]}'
+    
+    def _sleep(self, delay_ms: float) -> None:
+        if self.jitter_ms:
+            with self._lock:
+                delay_ms += self._random.uniform(0, self.jitter_ms)
+        self._sleep_ms(delay_ms)
+    
+    @staticmethod
+    def _sleep_ms(delay_ms: float) -> None:
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+class _StubEventStream:
+    """Iterable stand-in for botocore's EventStream"""
+    
+    def __init__(self, events: Iterator[Dict[str, Any]]):
+        self._events = events
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self._events
+    
+    def close(self) -> None:
+        """Stop generating, like closing the HTTP response"""
+        self._events.close()
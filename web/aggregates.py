@@ -0,0 +1,129 @@
+"""
+Running sentiment aggregates for the analytics sidebar
+
+The aggregates are updated as entries are appended or the history is
+cleared, so the sidebar metrics and pie chart read precomputed values
+instead of rebuilding a DataFrame on every Streamlit rerun.
+"""
+import calendar
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+LABELS = ('positive', 'neutral', 'negative')
+
+# Trend bucket widths in seconds: minute, hour, day
+BUCKET_SECONDS: Dict[str, int] = {'minute': 60, 'hour': 3600, 'day': 86400}
+
+def wall_seconds(timestamp: datetime) -> int:
+    """
+    Seconds since 1970-01-01 on the timestamp's own wall clock
+    
+    History timestamps are naive local times. Bucketing their wall-clock
+    seconds puts day and hour boundaries at local midnight and on the hour,
+    which matches the raw trend points and columnar.to_wall_micros; UTC epoch
+    seconds would shift them by the local UTC offset.
+    
+    Args:
+        timestamp: Naive (wall-clock) or timezone-aware datetime
+        
+    Returns:
+        Whole seconds
+    """
+    return calendar.timegm(timestamp.timetuple())
+
+class SentimentAggregates:
+    """
+    Counts per label, score sum and time-bucketed tallies
+    
+    Args:
+        bucket_widths: Widths in seconds of the time buckets kept for the trend
+    """
+    
+    def __init__(self, bucket_widths: Sequence[int] = tuple(BUCKET_SECONDS.values())):
+        self.bucket_widths = tuple(bucket_widths)
+        self.clear()
+    
+    def clear(self) -> None:
+        """Reset all aggregates"""
+        self.total = 0
+        self.score_sum = 0
+        self.label_counts: Dict[str, int] = {label: 0 for label in LABELS}
+        # bucket width -> bucket start (wall-clock seconds since 1970) -> [count, score sum]
+        self.buckets: Dict[int, Dict[int, List[int]]] = {width: {} for width in self.bucket_widths}
+    
+    def add(self, entry: Dict[str, Any]) -> None:
+        """
+        Fold one history entry into the aggregates
+        
+        Args:
+            entry: History entry with timestamp, sentiment_score and sentiment_label
+        """
+        score = entry.get('sentiment_score', 0)
+        label = entry.get('sentiment_label', 'neutral')
+        self.total += 1
+        self.score_sum += score
+        self.label_counts[label] = self.label_counts.get(label, 0) + 1
+        
+        timestamp = entry.get('timestamp')
+        if isinstance(timestamp, datetime):
+            seconds = wall_seconds(timestamp)
+            for width, buckets in self.buckets.items():
+                bucket = seconds - seconds % width
+                tally = buckets.get(bucket)
+                if tally is None:
+                    buckets[bucket] = [1, score]
+                else:
+                    tally[0] += 1
+                    tally[1] += score
+    
+    def extend(self, entries: Iterable[Dict[str, Any]]) -> None:
+        """Fold several history entries into the aggregates"""
+        for entry in entries:
+            self.add(entry)
+    
+    def rate(self, label: str) -> float:
+        """
+        Share of entries with a label, as a percentage
+        
+        Args:
+            label: Sentiment label
+            
+        Returns:
+            Percentage between 0 and 100
+        """
+        if not self.total:
+            return 0.0
+        return self.label_counts.get(label, 0) / self.total * 100
+    
+    @property
+    def mean_score(self) -> float:
+        """Mean sentiment score across all entries"""
+        return self.score_sum / self.total if self.total else 0.0
+    
+    def distribution(self) -> Tuple[List[str], List[int]]:
+        """
+        Non-zero label counts for the distribution chart, largest first
+        
+        Returns:
+            Tuple of (labels, counts)
+        """
+        items = sorted(
+            ((label, count) for label, count in self.label_counts.items() if count),
+            key=lambda item: item[1],
+            reverse=True
+        )
+        return [label for label, _ in items], [count for _, count in items]
+    
+    def trend(self, bucket_width: int) -> Tuple[List[int], List[float]]:
+        """
+        Mean score per time bucket
+        
+        Args:
+            bucket_width: One of bucket_widths, in seconds
+            
+        Returns:
+            Tuple of (bucket start as wall-clock seconds since 1970, mean score), oldest first
+        """
+        buckets = self.buckets[bucket_width]
+        starts = sorted(buckets)
+        return starts, [buckets[start][1] / buckets[start][0] for start in starts]
@@ -1,14 +1,22 @@
 import streamlit as st
 import requests
-import json
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime
+from datetime import datetime, time, timedelta
 import os
-import pickle
-from typing import List, Dict, Any
+import tempfile
+from typing import List, Dict, Any, Tuple
 from config import API_ENDPOINT
+from history_store import HistoryStore
+from aggregates import SentimentAggregates
+from columnar import ColumnarHistory
+from search_index import SEARCH_PAGE_SIZE, SearchIndex
+from downsample import TREND_MODES, trend_series
+from health_probe import HealthProber
+from export import EXPORT_FORMATS, export_history, parquet_available
+from bulk import BULK_MAX_MESSAGES, BULK_MAX_WORKERS, create_session, post_coalesced, read_columns, read_messages, score_messages
+from singleflight import SingleFlight
 
 # Page config
 st.set_page_config(
@@ -53,100 +61,110 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Data persistence file - use absolute path
+# Legacy data file (imported into the history store on first run) - use absolute path
 try:
     DATA_FILE = os.path.join(os.path.dirname(__file__), 'sentiment_history.pkl')
 except NameError:
     # Fallback for when __file__ is not available (e.g., in some deployment contexts)
     DATA_FILE = os.path.join(os.getcwd(), 'sentiment_history.pkl')
 
-def load_history() -> List[Dict[str, Any]]:
-    """Load analysis history from file"""
+# Append-only history log; the legacy pickle/JSON files are imported once
+HISTORY_DIR = os.path.join(os.path.dirname(DATA_FILE), 'history')
+
+@st.cache_resource
+def get_history_store() -> HistoryStore:
+    """Shared history store for all sessions in this process"""
+    return HistoryStore(HISTORY_DIR, legacy_path=DATA_FILE)
+
+def sync_history() -> None:
+    """Merge records appended to the history store since the last sync into session state"""
     try:
-        if os.path.exists(DATA_FILE):
-            with open(DATA_FILE, 'rb') as f:
-                data = pickle.load(f)
-                # Convert string timestamps back to datetime objects if needed
-                for item in data:
-                    if isinstance(item.get('timestamp'), str):
-                        item['timestamp'] = datetime.fromisoformat(item['timestamp'])
-                return data
+        entries, cursor, reset = get_history_store().tail(st.session_state.get('history_cursor'))
     except Exception as e:
         st.warning(f"Could not load history: {e}")
-    return []
+        return
+    if reset:
+        st.session_state.history.clear()
+        st.session_state.aggregates.clear()
+    st.session_state.history.extend(entries)
+    st.session_state.aggregates.extend(entries)
+    st.session_state.history_cursor = cursor
+
+def save_entry(entry: Dict[str, Any]) -> None:
+    """Append one analysis to the history store"""
+    save_entries([entry])
 
-def save_history() -> None:
-    """Save analysis history to file"""
+def save_entries(entries: List[Dict[str, Any]]) -> None:
+    """Append several analyses to the history store in a single write"""
     try:
-        # Convert datetime objects to strings for JSON serialization
-        data_to_save = []
-        for item in st.session_state.history:
-            item_copy = item.copy()
-            if isinstance(item_copy.get('timestamp'), datetime):
-                item_copy['timestamp'] = item_copy['timestamp'].isoformat()
-            data_to_save.append(item_copy)
-        
-        with open(DATA_FILE, 'wb') as f:
-            pickle.dump(st.session_state.history, f)  # Keep original datetime objects
-        
-        # Also save as JSON backup
-        json_file = DATA_FILE.replace('.pkl', '.json')
-        with open(json_file, 'w') as f:
-            json.dump(data_to_save, f, indent=2)
-            
+        get_history_store().extend(entries)
     except Exception as e:
         st.error(f"Failed to save history: {e}")
 
-def export_to_csv() -> str:
-    """Export history to CSV format"""
-    if not st.session_state.history:
-        return ""
-    df = pd.DataFrame(st.session_state.history)
-    return df.to_csv(index=False)
+def clear_history() -> None:
+    """Remove all analyses from the history store"""
+    try:
+        get_history_store().clear()
+    except Exception as e:
+        st.error(f"Failed to clear history: {e}")
+
+def export_file(file_format: str, start: datetime, end: datetime, labels: List[str]) -> Tuple[bytes, int]:
+    """Stream matching history from the store through a temporary file in chunks"""
+    with tempfile.TemporaryFile() as handle:
+        rows = export_history(get_history_store().iter_entries(), handle, file_format, start, end, labels)
+        handle.seek(0)
+        # The download button keeps its payload in memory; this is the only full copy
+        return handle.read(), rows
+
+@st.cache_resource
+def get_api_session() -> requests.Session:
+    """Connection-pooled HTTP session shared by all sessions in this process"""
+    return create_session(BULK_MAX_WORKERS)
+
+@st.cache_resource
+def get_request_flight() -> SingleFlight:
+    """Process-wide single-flight so concurrent identical messages share one API call"""
+    return SingleFlight()
+
+class APIError(Exception):
+    """Error response from the sentiment API (raised so st.cache_data does not keep it)"""
 
 @st.cache_data(ttl=300)
+def fetch_sentiment(message: str) -> Dict[str, Any]:
+    """Call the sentiment analysis API with caching and request coalescing"""
+    result = post_coalesced(get_api_session(), API_ENDPOINT, message, get_request_flight())
+    if 'error' in result:
+        raise APIError(result['error'])
+    return result
+
 def analyze_sentiment(message: str) -> Dict[str, Any]:
-    """Call the sentiment analysis API with caching"""
+    """Analyze a message, returning a dict with an 'error' key on failure"""
     try:
-        response = requests.post(
-            API_ENDPOINT,
-            headers={'Content-Type': 'application/json'},
-            json={'message': message},
-            timeout=30
-        )
-        return response.json()
-    except requests.exceptions.Timeout:
-        return {'error': 'Request timeout - please try again'}
-    except requests.exceptions.ConnectionError:
-        return {'error': 'Connection error - please check your internet'}
-    except Exception as e:
+        return fetch_sentiment(message)
+    except APIError as e:
         return {'error': str(e)}
 
-def check_api_health() -> bool:
-    """Check if API is healthy"""
-    try:
-        health_url = API_ENDPOINT.rstrip('/') + '/health'
-        response = requests.get(health_url, timeout=10)
-        return response.status_code == 200
-    except Exception:
-        return False
+@st.cache_resource
+def get_health_prober() -> HealthProber:
+    """Process-wide background prober for the API health endpoint"""
+    return HealthProber(API_ENDPOINT.rstrip('/') + '/health').start()
 
 # Initialize session state with persistent loading
 if 'history' not in st.session_state:
-    st.session_state.history = load_history()
+    st.session_state.history = ColumnarHistory()
+if 'aggregates' not in st.session_state:
+    st.session_state.aggregates = SentimentAggregates()
+if 'search_index' not in st.session_state:
+    # Built lazily on the first search, then kept in step with the history
+    st.session_state.search_index = SearchIndex(st.session_state.history)
 if 'show_api_status' not in st.session_state:
     st.session_state.show_api_status = True
-if 'last_load_time' not in st.session_state:
-    st.session_state.last_load_time = datetime.now()
 if 'last_save_time' not in st.session_state:
     st.session_state.last_save_time = None
 
-# Auto-reload history if file was modified externally (every 30 seconds)
-if (datetime.now() - st.session_state.last_load_time).seconds > 30:
-    current_history = load_history()
-    if len(current_history) != len(st.session_state.history):
-        st.session_state.history = current_history
-    st.session_state.last_load_time = datetime.now()
+# Pick up records appended by other sessions or processes; when nothing
+# changed this is only a few stat calls
+sync_history()
 
 def get_sentiment_color(score):
     """Return color based on sentiment score"""
@@ -166,34 +184,43 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-# API Health Check Toast
-api_status = check_api_health()
+# API Health Check Toast (cached by the background prober, never blocks the page)
+health = get_health_prober().status()
+api_status = bool(health.healthy)
 if st.session_state.show_api_status:
-    if api_status:
+    if health.healthy is None:
+        st.info("⏳ Checking API status...")
+    elif api_status:
         toast_container = st.container()
         with toast_container:
             col1, col2 = st.columns([10, 1])
             with col1:
-                st.success("✅ API is healthy and ready")
+                st.success(
+                    f"✅ API is healthy and ready ({health.latency_ms:.0f} ms, "
+                    f"checked {health.checked_at.strftime('%H:%M:%S')})"
+                )
             with col2:
                 if st.button("✕", key="close_toast"):
                     st.session_state.show_api_status = False
                     st.rerun()
     else:
-        st.error("❌ API is currently unavailable")
+        st.error(
+            f"❌ API is currently unavailable ({health.error}, "
+            f"checked {health.checked_at.strftime('%H:%M:%S')})"
+        )
 
 # Sidebar
 with st.sidebar:
     st.header("📊 Analytics")
     
     if st.session_state.history:
-        df = pd.DataFrame(st.session_state.history)
+        aggregates = st.session_state.aggregates
         
         # Sentiment distribution
-        sentiment_counts = df['sentiment_label'].value_counts()
+        labels, counts = aggregates.distribution()
         fig = px.pie(
-            values=sentiment_counts.values,
-            names=sentiment_counts.index,
+            values=counts,
+            names=labels,
             title="Sentiment Distribution",
             color_discrete_map={
                 'positive': '#28a745',
@@ -204,28 +231,30 @@ with st.sidebar:
         st.plotly_chart(fig, use_container_width=True)
         
         # Stats
-        total = len(df)
-        positive = len(df[df['sentiment_score'] == 1])
-        neutral = len(df[df['sentiment_score'] == 0])
-        negative = len(df[df['sentiment_score'] == -1])
-        
         col_stat1, col_stat2 = st.columns(2)
         
         with col_stat1:
-            st.metric("Total Analyzed", total)
-            st.metric("Positive Rate", f"{(positive/total*100):.1f}%" if total > 0 else "0%")
+            st.metric("Total Analyzed", aggregates.total)
+            st.metric("Positive Rate", f"{aggregates.rate('positive'):.1f}%")
         
         with col_stat2:
-            st.metric("Negative Rate", f"{(negative/total*100):.1f}%" if total > 0 else "0%")
-            st.metric("Neutral Rate", f"{(neutral/total*100):.1f}%" if total > 0 else "0%")
+            st.metric("Negative Rate", f"{aggregates.rate('negative'):.1f}%")
+            st.metric("Neutral Rate", f"{aggregates.rate('neutral'):.1f}%")
         
         # Trend chart
-        if len(df) > 1:
-            df_sorted = df.sort_values('timestamp')
+        if aggregates.total > 1:
+            trend_mode = st.selectbox(
+                "Trend resolution",
+                TREND_MODES,
+                help="Time buckets plot the mean score per bucket; LTTB keeps the shape of the raw points"
+            )
+            trend_x, trend_y, trend_description = trend_series(
+                trend_mode, aggregates, st.session_state.history
+            )
             fig_trend = go.Figure()
             fig_trend.add_trace(go.Scatter(
-                x=df_sorted['timestamp'],
-                y=df_sorted['sentiment_score'],
+                x=trend_x,
+                y=trend_y,
                 mode='lines+markers',
                 name='Sentiment Trend',
                 line=dict(color='#667eea', width=2)
@@ -238,6 +267,7 @@ with st.sidebar:
                 showlegend=False
             )
             st.plotly_chart(fig_trend, use_container_width=True)
+            st.caption(f"Showing {len(trend_x)} points: {trend_description}")
     else:
         st.info("No analysis history yet")
     
@@ -245,12 +275,12 @@ with st.sidebar:
     st.markdown("---")
     st.markdown("**💾 Data Status**")
     
-    # Check if file exists
-    if os.path.exists(DATA_FILE):
-        file_size = os.path.getsize(DATA_FILE)
-        file_time = datetime.fromtimestamp(os.path.getmtime(DATA_FILE))
-        st.markdown(f"• File: {file_size} bytes")
-        st.markdown(f"• Modified: {file_time.strftime('%H:%M:%S')}")
+    # Check if the store has data
+    store_stats = get_history_store().stats()
+    if st.session_state.history:
+        st.markdown(f"• Size: {store_stats['bytes']} bytes in {store_stats['segments'] + 1} file(s)")
+        if store_stats['modified']:
+            st.markdown(f"• Modified: {store_stats['modified'].strftime('%H:%M:%S')}")
         st.markdown(f"• Records: {len(st.session_state.history)}")
     else:
         st.markdown("• No saved data yet")
@@ -293,8 +323,8 @@ with col1:
                     'sentiment_score': score,
                     'sentiment_label': label
                 }
-                st.session_state.history.append(new_entry)
-                save_history()
+                save_entry(new_entry)
+                sync_history()
                 st.session_state.last_save_time = datetime.now()
                 st.success("💾 Data saved successfully!")
                 
@@ -327,13 +357,107 @@ with col1:
                 )
         else:
             st.warning("Please enter some text to analyze")
+    
+    # Bulk analysis from an uploaded file
+    with st.expander("📂 Bulk Analysis (CSV or text upload)"):
+        uploaded = st.file_uploader(
+            "Upload a CSV file or a text file with one message per line",
+            type=['csv', 'txt']
+        )
+        if uploaded is not None:
+            data = uploaded.getvalue()
+            column = None
+            if uploaded.name.lower().endswith('.csv'):
+                column = st.selectbox("Message column", read_columns(data))
+            bulk_messages = read_messages(data, uploaded.name, column)
+            st.caption(f"{len(bulk_messages)} message(s) found (up to {BULK_MAX_MESSAGES} per upload)")
+            
+            if bulk_messages and st.button("🔍 Analyze All", key="analyze_bulk"):
+                progress = st.progress(0.0, text="Analyzing...")
+                results_table = st.empty()
+                rows: List[Dict[str, Any]] = [None] * len(bulk_messages)
+                completed = 0
+                failures = 0
+                
+                flight = get_request_flight()
+                coalesced_before = flight.coalesced
+                for index, result in score_messages(bulk_messages, API_ENDPOINT, get_api_session(), flight=flight):
+                    completed += 1
+                    if 'error' in result:
+                        failures += 1
+                        rows[index] = {
+                            'message': bulk_messages[index],
+                            'sentiment_score': None,
+                            'sentiment_label': None,
+                            'error': result['error']
+                        }
+                    else:
+                        sentiment = result['sentiment']
+                        rows[index] = {
+                            'message': bulk_messages[index],
+                            'sentiment_score': sentiment['score'],
+                            'sentiment_label': sentiment['label']
+                        }
+                    progress.progress(completed / len(bulk_messages), text=f"Analyzed {completed}/{len(bulk_messages)}")
+                    if completed % 10 == 0 or completed == len(bulk_messages):
+                        results_table.dataframe(
+                            pd.DataFrame([row for row in rows if row is not None]),
+                            use_container_width=True
+                        )
+                
+                # One write for the whole upload, in file order
+                saved_at = datetime.now()
+                new_entries = [{'timestamp': saved_at, **row} for row in rows if 'error' not in row]
+                if new_entries:
+                    save_entries(new_entries)
+                    sync_history()
+                    st.session_state.last_save_time = datetime.now()
+                st.success(f"Bulk analysis complete: {len(new_entries)} saved, {failures} failed")
+                coalesced = flight.coalesced - coalesced_before
+                if coalesced:
+                    st.caption(f"{coalesced} duplicate message(s) shared an in-flight request")
+    
+    # Full-text search over the whole history
+    with st.expander("🔎 Search History"):
+        query = st.text_input("Search messages", placeholder="e.g. great service, deliv*",
+                              help="All words must match; end a word with * to match it as a prefix")
+        col_filter1, col_filter2 = st.columns(2)
+        with col_filter1:
+            search_labels = st.multiselect("Labels", ['positive', 'neutral', 'negative'],
+                                           default=['positive', 'neutral', 'negative'], key="search_labels")
+        with col_filter2:
+            search_dates = st.date_input("Date range", value=(), key="search_dates")
+        search_days = list(search_dates) if isinstance(search_dates, (tuple, list)) else [search_dates]
+        
+        if query.strip() or search_days or len(search_labels) < 3:
+            search_start = datetime.combine(search_days[0], time.min) if search_days else None
+            search_end = datetime.combine(search_days[-1], time.min) + timedelta(days=1) if search_days else None
+            search_page = st.number_input("Page", min_value=1, value=1, step=1, key="search_page")
+            try:
+                search_started = datetime.now()
+                found = st.session_state.search_index.search(
+                    query, search_labels, search_start, search_end, int(search_page), SEARCH_PAGE_SIZE
+                )
+                search_ms = (datetime.now() - search_started).total_seconds() * 1000
+            except ValueError as e:
+                st.warning(str(e))
+            else:
+                st.caption(f"{found.total} match(es) • page {found.page} of {found.pages} • {search_ms:.1f} ms")
+                if found.entries:
+                    st.dataframe(
+                        pd.DataFrame(found.entries, columns=['timestamp', 'sentiment_label', 'sentiment_score', 'message']),
+                        use_container_width=True,
+                        hide_index=True
+                    )
+        else:
+            st.caption("Enter words or choose filters to search all analyses")
 
 with col2:
     st.header("📈 Recent History")
     
     if st.session_state.history:
         # Show recent 5 analyses
-        recent = st.session_state.history[-5:]
+        recent = st.session_state.history.recent(5)
         
         for item in reversed(recent):
             with st.container():
@@ -352,34 +476,51 @@ with col2:
         col_btn1, col_btn2, col_btn3 = st.columns(3)
         
         with col_btn1:
-            if st.button("🔄 Refresh", help="Reload history from file"):
-                st.session_state.history = load_history()
+            if st.button("🔄 Refresh", help="Load new records from the history store"):
+                sync_history()
                 st.rerun()
         
         with col_btn2:
-            if st.button("📥 Export", help="Export to CSV"):
-                csv_data = export_to_csv()
-                if csv_data:
-                    st.download_button(
-                        label="Download CSV",
-                        data=csv_data,
-                        file_name=f"sentiment_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                        mime="text/csv"
-                    )
+            if st.button("📥 Export", help="Export history to CSV or Parquet"):
+                st.session_state.show_export = not st.session_state.get('show_export', False)
         
         with col_btn3:
             if st.button("🗑️ Clear", help="Clear all history"):
                 st.session_state.confirm_clear = True
                 st.rerun()
         
+        # Export options: rows are streamed from the store in chunks
+        if st.session_state.get('show_export', False):
+            formats = [name for name in EXPORT_FORMATS if name != 'Parquet' or parquet_available()]
+            export_format = st.radio("Format", formats, horizontal=True)
+            first_day = st.session_state.history[0]['timestamp'].date()
+            last_day = st.session_state.history[-1]['timestamp'].date()
+            date_range = st.date_input("Date range", value=(first_day, last_day))
+            export_labels = st.multiselect("Labels", ['positive', 'neutral', 'negative'],
+                                           default=['positive', 'neutral', 'negative'])
+            if st.button("Prepare download"):
+                days = list(date_range) if isinstance(date_range, (tuple, list)) else [date_range]
+                start_day, end_day = (days[0], days[-1]) if days else (first_day, last_day)
+                start = datetime.combine(start_day, time.min)
+                end = datetime.combine(end_day, time.min) + timedelta(days=1)
+                with st.spinner("Exporting..."):
+                    export_data, export_rows = export_file(export_format, start, end, export_labels)
+                extension, mime = EXPORT_FORMATS[export_format]
+                st.download_button(
+                    label=f"Download {export_format} ({export_rows} rows)",
+                    data=export_data,
+                    file_name=f"sentiment_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+                    mime=mime
+                )
+        
         # Confirmation dialog for clear
         if st.session_state.get('confirm_clear', False):
             st.warning("⚠️ Are you sure you want to clear all history?")
             col_confirm1, col_confirm2 = st.columns(2)
             with col_confirm1:
                 if st.button("✅ Yes, Clear All", type="primary"):
-                    st.session_state.history = []
-                    save_history()
+                    clear_history()
+                    sync_history()
                     st.session_state.confirm_clear = False
                     st.success("History cleared!")
                     st.rerun()
@@ -410,7 +551,10 @@ with col_footer3:
     st.markdown("**📊 Statistics**")
     total_analyzed = len(st.session_state.history)
     st.markdown(f"• Total Analyzed: {total_analyzed}")
-    st.markdown(f"• API Status: {'🟢 Online' if api_status else '🔴 Offline'}")
+    if health.healthy is None:
+        st.markdown("• API Status: ⚪ Checking")
+    else:
+        st.markdown(f"• API Status: {'🟢 Online' if api_status else '🔴 Offline'}")
 
 st.markdown(
     "<div style='text-align: center; color: #666; margin-top: 2rem;'>"
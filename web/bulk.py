@@ -0,0 +1,163 @@
+"""
+Bulk analysis helpers for the web app
+
+Messages are posted to the sentiment API through one connection-pooled
+requests.Session with bounded concurrency, and results are yielded as they
+complete so the UI can show progress. Nothing here depends on Streamlit.
+"""
+import csv
+import html
+import io
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from singleflight import SingleFlight
+
+BULK_MAX_WORKERS = 8
+BULK_MAX_MESSAGES = 1000
+REQUEST_TIMEOUT = 30
+
+def create_session(pool_size: int = BULK_MAX_WORKERS) -> requests.Session:
+    """
+    Create an HTTP session whose keep-alive pool fits the worker count
+    
+    Args:
+        pool_size: Maximum concurrent connections to the API host
+        
+    Returns:
+        Configured session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Content-Type': 'application/json'})
+    return session
+
+def post_message(session: requests.Session, endpoint: str, message: str) -> Dict[str, Any]:
+    """
+    Call the sentiment analysis API for one message
+    
+    Args:
+        session: Shared HTTP session
+        endpoint: API endpoint URL
+        message: Message text
+        
+    Returns:
+        API response body, or a dict with an 'error' key
+    """
+    try:
+        response = session.post(endpoint, json={'message': message}, timeout=REQUEST_TIMEOUT)
+        return response.json()
+    except requests.exceptions.Timeout:
+        return {'error': 'Request timeout - please try again'}
+    except requests.exceptions.ConnectionError:
+        return {'error': 'Connection error - please check your internet'}
+    except Exception as e:
+        return {'error': str(e)}
+
+def message_key(message: str) -> str:
+    """
+    Single-flight key: the message with HTML entities decoded and whitespace
+    collapsed, as the API normalizes it
+    
+    Args:
+        message: Message text
+        
+    Returns:
+        Normalized message
+    """
+    return ' '.join(html.unescape(message).split())
+
+def post_coalesced(session: requests.Session, endpoint: str, message: str,
+                   flight: SingleFlight) -> Dict[str, Any]:
+    """
+    Call the sentiment API, sharing the call with identical in-flight messages
+    
+    Args:
+        session: Shared HTTP session
+        endpoint: API endpoint URL
+        message: Message text
+        flight: Process-wide single-flight
+        
+    Returns:
+        API response body, or a dict with an 'error' key (the same dict for every coalesced caller)
+    """
+    result, _ = flight.do(message_key(message), post_message, session, endpoint, message)
+    return result
+
+def score_messages(messages: List[str], endpoint: str, session: Optional[requests.Session] = None,
+                   max_workers: int = BULK_MAX_WORKERS,
+                   flight: Optional[SingleFlight] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Score messages concurrently, yielding results as they complete
+    
+    Args:
+        messages: Message texts
+        endpoint: API endpoint URL
+        session: Shared HTTP session (one is created if omitted)
+        max_workers: Maximum requests in flight
+        flight: Single-flight shared with other callers; duplicate messages
+            in flight at the same time then cost one request
+        
+    Yields:
+        (index into messages, API result) in completion order
+    """
+    if session is None:
+        session = create_session(max_workers)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(messages) or 1))) as executor:
+        if flight is None:
+            futures = {
+                executor.submit(post_message, session, endpoint, message): index
+                for index, message in enumerate(messages)
+            }
+        else:
+            futures = {
+                executor.submit(post_coalesced, session, endpoint, message, flight): index
+                for index, message in enumerate(messages)
+            }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+def read_columns(data: bytes) -> List[str]:
+    """
+    Column names of an uploaded CSV file
+    
+    Args:
+        data: Raw file content
+        
+    Returns:
+        Header row
+    """
+    reader = csv.reader(io.StringIO(data.decode('utf-8-sig')))
+    return next(reader, [])
+
+def read_messages(data: bytes, filename: str, column: Optional[str] = None,
+                  limit: int = BULK_MAX_MESSAGES) -> List[str]:
+    """
+    Extract non-empty messages from an uploaded CSV column or text file
+    
+    Args:
+        data: Raw file content
+        filename: Uploaded file name; ".csv" files are parsed as CSV
+        column: CSV column holding the messages
+        limit: Maximum number of messages to return
+        
+    Returns:
+        Messages in file order
+    """
+    text = data.decode('utf-8-sig')
+    if filename.lower().endswith('.csv'):
+        values = (row.get(column) or '' for row in csv.DictReader(io.StringIO(text)))
+    else:
+        values = text.splitlines()
+    
+    messages = []
+    for value in values:
+        value = value.strip()
+        if value:
+            messages.append(value)
+            if len(messages) >= limit:
+                break
+    return messages
@@ -0,0 +1,183 @@
+"""
+Compact columnar container for the in-memory analysis history
+
+Each browser session keeps its own copy of the history, so the per-entry
+dicts (a datetime, a message string, a repeated label string) dominate the
+app's memory. ColumnarHistory stores the same data as parallel arrays:
+
+    timestamps    int64 microseconds since 1970-01-01 (naive wall clock)
+    scores        int8
+    labels        int8 codes into LABELS
+    messages      one UTF-8 byte arena plus int64 end offsets
+
+Arrays grow by doubling. Growing allocates new arrays instead of resizing
+in place, so views handed out by the column accessors and to_frame stay
+valid while the history keeps growing.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Union
+import numpy as np
+import pandas as pd
+
+LABELS = ('positive', 'neutral', 'negative')
+_LABEL_CODES = {label: code for code, label in enumerate(LABELS)}
+_EPOCH = datetime(1970, 1, 1)
+_INITIAL_CAPACITY = 256
+
+def to_wall_micros(timestamp: datetime) -> int:
+    """Naive datetime to microseconds since 1970-01-01 on the same wall clock"""
+    return (timestamp - _EPOCH) // timedelta(microseconds=1)
+
+def from_wall_micros(micros: int) -> datetime:
+    """Inverse of to_wall_micros"""
+    return _EPOCH + timedelta(microseconds=int(micros))
+
+class ColumnarHistory:
+    """
+    Append-only history stored column-wise
+    
+    Supports len(), iteration, integer indexing and slicing with the same
+    entry dicts as the list it replaces; entries are only materialized for
+    the rows that are read.
+    
+    Args:
+        entries: Optional initial entries
+    """
+    
+    def __init__(self, entries: Iterable[Dict[str, Any]] = ()):
+        self.generation = 0
+        self.clear()
+        self.extend(entries)
+    
+    def clear(self) -> None:
+        """Remove all entries"""
+        # Bumped on every clear so derived structures (e.g. the search index) can detect resets
+        self.generation += 1
+        self._size = 0
+        self._timestamps = np.zeros(_INITIAL_CAPACITY, dtype=np.int64)
+        self._scores = np.zeros(_INITIAL_CAPACITY, dtype=np.int8)
+        self._labels = np.zeros(_INITIAL_CAPACITY, dtype=np.int8)
+        self._ends = np.zeros(_INITIAL_CAPACITY, dtype=np.int64)
+        self._arena = bytearray()
+    
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._timestamps)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ('_timestamps', '_scores', '_labels', '_ends'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+    
+    def append(self, entry: Dict[str, Any]) -> None:
+        """
+        Append one history entry
+        
+        Args:
+            entry: Dict with timestamp, message, sentiment_score and sentiment_label
+        """
+        self.extend((entry,))
+    
+    def extend(self, entries: Iterable[Dict[str, Any]]) -> None:
+        """Append several history entries"""
+        entries = entries if isinstance(entries, list) else list(entries)
+        if not entries:
+            return
+        start = self._size
+        self._grow(start + len(entries))
+        arena = self._arena
+        for row, entry in enumerate(entries, start):
+            self._timestamps[row] = to_wall_micros(entry['timestamp'])
+            self._scores[row] = entry.get('sentiment_score', 0)
+            self._labels[row] = _LABEL_CODES.get(entry.get('sentiment_label'), _LABEL_CODES['neutral'])
+            arena += entry.get('message', '').encode('utf-8')
+            self._ends[row] = len(arena)
+        self._size = start + len(entries)
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def _entry(self, row: int) -> Dict[str, Any]:
+        return {
+            'timestamp': from_wall_micros(self._timestamps[row]),
+            'message': self.message(row),
+            'sentiment_score': int(self._scores[row]),
+            'sentiment_label': LABELS[self._labels[row]]
+        }
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        if isinstance(index, slice):
+            return [self._entry(row) for row in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('history index out of range')
+        return self._entry(index)
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in range(self._size):
+            yield self._entry(row)
+    
+    def recent(self, count: int) -> List[Dict[str, Any]]:
+        """The last count entries, oldest first"""
+        return self[max(self._size - count, 0):]
+    
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Read-only datetime64[us] view of the timestamp column"""
+        return self._view(self._timestamps).view('datetime64[us]')
+    
+    @property
+    def scores(self) -> np.ndarray:
+        """Read-only int8 view of the score column"""
+        return self._view(self._scores)
+    
+    @property
+    def label_codes(self) -> np.ndarray:
+        """Read-only int8 view of the label codes (indices into LABELS)"""
+        return self._view(self._labels)
+    
+    def message(self, row: int) -> str:
+        """Decode one message"""
+        begin = self._ends[row - 1] if row else 0
+        return self._arena[begin:self._ends[row]].decode('utf-8')
+    
+    def _view(self, column: np.ndarray) -> np.ndarray:
+        view = column[:self._size]
+        view.flags.writeable = False
+        return view
+    
+    def messages(self) -> List[str]:
+        """Decode all messages (the only column that is copied)"""
+        ends = self._ends[:self._size].tolist()
+        arena = self._arena
+        begins = [0] + ends[:-1]
+        return [arena[begin:end].decode('utf-8') for begin, end in zip(begins, ends)]
+    
+    def to_frame(self, include_messages: bool = False) -> pd.DataFrame:
+        """
+        DataFrame over the numeric columns without copying them
+        
+        Args:
+            include_messages: Also decode the message column
+            
+        Returns:
+            DataFrame with timestamp, sentiment_score, sentiment_label
+            (categorical) and optionally message
+        """
+        columns = {
+            'timestamp': pd.Series(self.timestamps, copy=False),
+            'sentiment_score': pd.Series(self.scores, copy=False),
+            'sentiment_label': pd.Categorical.from_codes(self.label_codes, categories=LABELS, validate=False)
+        }
+        if include_messages:
+            columns['message'] = self.messages()
+        return pd.DataFrame(columns, copy=False)
+    
+    def nbytes(self) -> int:
+        """Bytes used by the column buffers, including spare capacity"""
+        return (self._timestamps.nbytes + self._scores.nbytes + self._labels.nbytes
+                + self._ends.nbytes + len(self._arena))
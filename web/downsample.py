@@ -0,0 +1,136 @@
+"""
+Server-side downsampling for the sentiment trend chart
+
+Two modes keep the number of points sent to Plotly bounded:
+
+- time buckets: mean score per minute, hour or day, read from the running
+  aggregates without touching the raw history
+- LTTB (Largest-Triangle-Three-Buckets): shape-preserving decimation of the
+  raw points
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+import numpy as np
+from aggregates import BUCKET_SECONDS, SentimentAggregates
+from columnar import ColumnarHistory
+
+_EPOCH = datetime(1970, 1, 1)
+
+def _from_wall_seconds(seconds: float) -> datetime:
+    """Naive datetime for wall-clock seconds from raw_series or the aggregate buckets"""
+    return _EPOCH + timedelta(seconds=seconds)
+
+# Roughly the sidebar chart width in pixels; more points than this cannot be drawn apart
+TREND_MAX_POINTS = 300
+
+TREND_MODES = ('Auto', 'Minute', 'Hour', 'Day', 'Raw (LTTB)')
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> Tuple[List[float], List[float]]:
+    """
+    Downsample a series with Largest-Triangle-Three-Buckets
+    
+    Args:
+        xs: X values, ascending
+        ys: Y values
+        threshold: Maximum number of points to keep (at least 3)
+        
+    Returns:
+        Tuple of (xs, ys) with at most ``threshold`` points, including both ends
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(xs), list(ys)
+    
+    sampled_x = [xs[0]]
+    sampled_y = [ys[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        count = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / count
+        avg_y = sum(ys[next_start:next_end]) / count
+        
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        ax, ay = xs[a], ys[a]
+        best_area = -1.0
+        best = start
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+        sampled_x.append(xs[best])
+        sampled_y.append(ys[best])
+        a = best
+    
+    sampled_x.append(xs[-1])
+    sampled_y.append(ys[-1])
+    return sampled_x, sampled_y
+
+def raw_series(history: Iterable[Dict[str, Any]]) -> Tuple[List[float], List[float]]:
+    """
+    Raw (timestamp, score) points in time order
+    
+    Args:
+        history: ColumnarHistory (read column-wise) or history entries
+        
+    Returns:
+        Tuple of (wall-clock seconds since 1970-01-01, scores)
+    """
+    if isinstance(history, ColumnarHistory):
+        seconds = history.timestamps.astype('int64') / 1e6
+        scores = history.scores
+        if (np.diff(seconds) < 0).any():
+            order = np.argsort(seconds, kind='stable')
+            seconds, scores = seconds[order], scores[order]
+        return seconds.tolist(), scores.tolist()
+    
+    points = [
+        ((item['timestamp'] - _EPOCH).total_seconds(), item['sentiment_score'])
+        for item in history if isinstance(item.get('timestamp'), datetime)
+    ]
+    # History is appended in time order; only imported data may need sorting
+    if any(points[i][0] > points[i + 1][0] for i in range(len(points) - 1)):
+        points.sort()
+    return [x for x, _ in points], [y for _, y in points]
+
+def trend_series(mode: str, aggregates: SentimentAggregates, history: Iterable[Dict[str, Any]],
+                 max_points: int = TREND_MAX_POINTS) -> Tuple[List[datetime], List[float], str]:
+    """
+    Build the trend chart series for a display mode
+    
+    Args:
+        mode: One of TREND_MODES
+        aggregates: Running aggregates with minute/hour/day tallies
+        history: Raw history, only read in LTTB mode
+        max_points: Point budget, normally the chart width
+        
+    Returns:
+        Tuple of (timestamps, scores, description of what is plotted)
+    """
+    if mode == 'Raw (LTTB)' or (mode == 'Auto' and aggregates.total <= max_points):
+        xs, ys = raw_series(history)
+        description = 'score per analysis'
+    else:
+        if mode == 'Auto':
+            # Too many analyses to plot individually: finest bucket that fits the budget
+            name = next(
+                (name for name, width in BUCKET_SECONDS.items() if len(aggregates.buckets[width]) <= max_points),
+                'day'
+            )
+        else:
+            name = mode.lower()
+        xs, ys = aggregates.trend(BUCKET_SECONDS[name])
+        description = f'mean score per {name}'
+    
+    if len(xs) > max_points:
+        xs, ys = lttb(xs, ys, max_points)
+        description += f', downsampled to {max_points} points'
+    
+    # Raw points and buckets share the same wall clock, so day buckets start at local midnight
+    return [_from_wall_seconds(x) for x in xs], ys, description
@@ -0,0 +1,151 @@
+"""
+Chunked history export
+
+Entries are streamed from the history store, filtered by date range and
+label, and written to a file in fixed-size batches, so exporting a large
+history never holds more than one batch of rows in memory. CSV is always
+available; Parquet additionally requires pyarrow and writes one row group
+per batch.
+"""
+import csv
+import importlib.util
+import io
+from datetime import datetime
+from itertools import islice
+from typing import Any, BinaryIO, Collection, Dict, Iterable, Iterator, List, Optional
+
+EXPORT_CHUNK_ROWS = 5000
+EXPORT_COLUMNS = ('timestamp', 'message', 'sentiment_score', 'sentiment_label')
+EXPORT_FORMATS = {'CSV': ('csv', 'text/csv'), 'Parquet': ('parquet', 'application/vnd.apache.parquet')}
+
+def parquet_available() -> bool:
+    """Whether pyarrow is installed for Parquet export"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+def filter_entries(entries: Iterable[Dict[str, Any]], start: Optional[datetime] = None,
+                   end: Optional[datetime] = None,
+                   labels: Optional[Collection[str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily select entries within a time range and label set
+    
+    Args:
+        entries: History entries
+        start: Inclusive lower bound on the timestamp
+        end: Exclusive upper bound on the timestamp
+        labels: Sentiment labels to keep (all if None)
+        
+    Yields:
+        Matching entries in input order
+    """
+    for entry in entries:
+        timestamp = entry.get('timestamp')
+        if start is not None and (timestamp is None or timestamp < start):
+            continue
+        if end is not None and (timestamp is None or timestamp >= end):
+            continue
+        if labels is not None and entry.get('sentiment_label') not in labels:
+            continue
+        yield entry
+
+def iter_chunks(entries: Iterable[Dict[str, Any]], chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[List[Dict[str, Any]]]:
+    """Group entries into lists of at most chunk_rows"""
+    iterator = iter(entries)
+    while True:
+        chunk = list(islice(iterator, chunk_rows))
+        if not chunk:
+            return
+        yield chunk
+
+def _csv_row(entry: Dict[str, Any]) -> tuple:
+    """CSV field values of one entry in EXPORT_COLUMNS order"""
+    timestamp = entry.get('timestamp')
+    if isinstance(timestamp, datetime):
+        timestamp = timestamp.isoformat(sep=' ')
+    return (timestamp, entry.get('message'), entry.get('sentiment_score'), entry.get('sentiment_label'))
+
+def iter_csv(entries: Iterable[Dict[str, Any]], chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Encode entries as CSV, one encoded block per chunk
+    
+    Args:
+        entries: History entries
+        chunk_rows: Rows per block
+        
+    Yields:
+        UTF-8 CSV bytes: the header row, then one block per chunk
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue().encode('utf-8')
+    for chunk in iter_chunks(entries, chunk_rows):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(_csv_row(entry) for entry in chunk)
+        yield buffer.getvalue().encode('utf-8')
+
+def write_csv(entries: Iterable[Dict[str, Any]], sink: BinaryIO, chunk_rows: int = EXPORT_CHUNK_ROWS) -> int:
+    """
+    Stream entries to a binary file as CSV
+    
+    Returns:
+        Number of rows written
+    """
+    rows = 0
+    def counted() -> Iterator[Dict[str, Any]]:
+        nonlocal rows
+        for entry in entries:
+            rows += 1
+            yield entry
+    for block in iter_csv(counted(), chunk_rows):
+        sink.write(block)
+    return rows
+
+def write_parquet(entries: Iterable[Dict[str, Any]], sink: BinaryIO, chunk_rows: int = EXPORT_CHUNK_ROWS) -> int:
+    """
+    Stream entries to a binary file as Parquet, one row group per chunk
+    
+    Returns:
+        Number of rows written
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    schema = pa.schema([
+        ('timestamp', pa.timestamp('us')),
+        ('message', pa.string()),
+        ('sentiment_score', pa.int64()),
+        ('sentiment_label', pa.string())
+    ])
+    rows = 0
+    with pq.ParquetWriter(sink, schema) as writer:
+        for chunk in iter_chunks(entries, chunk_rows):
+            columns = {name: [entry.get(name) for entry in chunk] for name in EXPORT_COLUMNS}
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            rows += len(chunk)
+    return rows
+
+def export_history(entries: Iterable[Dict[str, Any]], sink: BinaryIO, file_format: str = 'CSV',
+                   start: Optional[datetime] = None, end: Optional[datetime] = None,
+                   labels: Optional[Collection[str]] = None, chunk_rows: int = EXPORT_CHUNK_ROWS) -> int:
+    """
+    Filter and write history entries in the requested format
+    
+    Args:
+        entries: History entries, typically HistoryStore.iter_entries()
+        sink: Binary file to write to
+        file_format: 'CSV' or 'Parquet'
+        start: Inclusive lower bound on the timestamp
+        end: Exclusive upper bound on the timestamp
+        labels: Sentiment labels to keep (all if None)
+        chunk_rows: Rows held in memory at a time
+        
+    Returns:
+        Number of rows written
+    """
+    selected = filter_entries(entries, start, end, labels)
+    if file_format == 'Parquet':
+        return write_parquet(selected, sink, chunk_rows)
+    if file_format == 'CSV':
+        return write_csv(selected, sink, chunk_rows)
+    raise ValueError(f'Unsupported export format: {file_format}')
@@ -0,0 +1,96 @@
+"""
+Background API health prober
+
+A single daemon thread per process polls the API's /health endpoint and
+caches the last result, so page renders read the status instantly instead
+of blocking on a network call. While the API is down the polling interval
+backs off exponentially.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import NamedTuple, Optional
+import requests
+
+class HealthStatus(NamedTuple):
+    """Result of the most recent health probe"""
+    
+    healthy: Optional[bool]  # None until the first probe completes
+    checked_at: Optional[datetime]
+    latency_ms: Optional[float]
+    error: Optional[str]
+    consecutive_failures: int
+
+UNKNOWN_STATUS = HealthStatus(None, None, None, None, 0)
+
+class HealthProber:
+    """
+    Polls a health URL on a background thread
+    
+    Args:
+        url: Health check URL
+        interval: Seconds between probes while healthy
+        timeout: Per-probe request timeout in seconds
+        max_backoff: Upper bound in seconds for the delay while unhealthy
+    """
+    
+    def __init__(self, url: str, interval: float = 15.0, timeout: float = 5.0, max_backoff: float = 300.0):
+        self.url = url
+        self.interval = interval
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+        self._status = UNKNOWN_STATUS
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._session = requests.Session()
+    
+    def start(self) -> 'HealthProber':
+        """Start polling if not already running"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='api-health-prober', daemon=True)
+            self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """Stop polling"""
+        self._stop.set()
+    
+    def status(self) -> HealthStatus:
+        """Return the cached status without any network call"""
+        return self._status
+    
+    def probe(self) -> HealthStatus:
+        """
+        Run one probe now and cache its result
+        
+        Returns:
+            The new status
+        """
+        started = time.perf_counter()
+        error = None
+        try:
+            response = self._session.get(self.url, timeout=self.timeout)
+            healthy = response.status_code == 200
+            if not healthy:
+                error = f'HTTP {response.status_code}'
+        except requests.exceptions.RequestException as e:
+            healthy = False
+            error = type(e).__name__
+        latency_ms = (time.perf_counter() - started) * 1000
+        
+        failures = 0 if healthy else self._status.consecutive_failures + 1
+        self._status = HealthStatus(healthy, datetime.now(), round(latency_ms, 1), error, failures)
+        return self._status
+    
+    def next_delay(self) -> float:
+        """Seconds until the next probe: the interval, doubled per consecutive failure"""
+        failures = self._status.consecutive_failures
+        if not failures:
+            return self.interval
+        return min(self.interval * (2 ** failures), self.max_backoff)
+    
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.probe()
+            self._stop.wait(self.next_delay())
@@ -0,0 +1,465 @@
+"""
+Append-only, segmented history store for the Streamlit app
+
+Layout of the store directory:
+
+    snapshot.jsonl          compacted history; first line is a header
+    segment-000001.log      JSON lines appended since the snapshot
+    segment-000002.log      ...
+
+Each analysis is appended as one JSON line to the active segment, so saving
+is O(1) regardless of history size. Segments rotate after a fixed number of
+records and sealed segments are folded into the snapshot by a background
+compaction thread. The snapshot header records the last segment it covers
+and is replaced atomically, so a crash at any point leaves either the old or
+the new snapshot and never double-counts or loses a sealed segment.
+"""
+import json
+import os
+import pickle
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+SNAPSHOT_NAME = 'snapshot.jsonl'
+SEGMENT_PATTERN = re.compile(r'^segment-(\d{6})\.log$')
+
+def encode_entry(entry: Dict[str, Any]) -> str:
+    """Serialize a history entry to one compact JSON line (without newline)"""
+    item = dict(entry)
+    if isinstance(item.get('timestamp'), datetime):
+        item['timestamp'] = item['timestamp'].isoformat()
+    return json.dumps(item, separators=(',', ':'), ensure_ascii=False)
+
+def restore_entry(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a deserialized entry's ISO timestamp back to datetime"""
+    if isinstance(item.get('timestamp'), str):
+        item['timestamp'] = datetime.fromisoformat(item['timestamp'])
+    return item
+
+def decode_entry(line: str) -> Dict[str, Any]:
+    """Parse one JSON line back into a history entry"""
+    return restore_entry(json.loads(line))
+
+def segment_name(segment_id: int) -> str:
+    return f'segment-{segment_id:06d}.log'
+
+class HistoryCursor(NamedTuple):
+    """Position after the last record a reader has seen"""
+    
+    epoch: int  # Bumped by clear(); a different epoch means start over
+    count: int  # Records read so far in this epoch
+    segment_id: int
+    offset: int  # Byte offset within the segment
+    snapshot_id: Tuple[int, int]  # (inode, mtime_ns) of the snapshot file
+
+class HistoryStore:
+    """
+    Segmented append-only log with background compaction
+    
+    One store instance should be shared by all sessions of a Streamlit
+    process (see st.cache_resource); methods are thread-safe within it.
+    
+    Args:
+        directory: Directory holding the snapshot and segments
+        legacy_path: Optional sentiment_history.pkl to import once
+        segment_max_records: Records per segment before rotating
+        compact_after_segments: Sealed segments that trigger compaction
+        fsync: fsync after every append (survives power loss, slower)
+    """
+    
+    def __init__(self, directory: str, legacy_path: Optional[str] = None,
+                 segment_max_records: int = 5000, compact_after_segments: int = 4,
+                 fsync: bool = False):
+        self.directory = directory
+        self.segment_max_records = segment_max_records
+        self.compact_after_segments = compact_after_segments
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        self._compaction_lock = threading.Lock()
+        self._compaction_wanted = threading.Event()
+        self._closed = False
+        self._fd: Optional[int] = None
+        self.generation = 0
+        self.epoch = 0
+        self._covered_segment = 0
+        
+        os.makedirs(directory, exist_ok=True)
+        self._remove_stale_temp_files()
+        
+        header = self._read_snapshot_header()
+        if header is None:
+            header = self._initialize_snapshot(legacy_path)
+        self.generation = header['generation']
+        self.epoch = header.get('epoch', 0)
+        self._covered_segment = header['covers_segment']
+        
+        self._drop_covered_segments()
+        segment_ids = self._segment_ids()
+        self._active_segment = max(segment_ids) if segment_ids else self._covered_segment + 1
+        self._active_records = self._recover_segment(self._active_segment)
+        
+        self._compactor = threading.Thread(target=self._compaction_loop, name='history-compactor', daemon=True)
+        self._compactor.start()
+        if len(self._sealed_segments()) >= self.compact_after_segments:
+            self._compaction_wanted.set()
+    
+    # Reading
+    
+    def load(self) -> List[Dict[str, Any]]:
+        """
+        Load the full history
+        
+        Returns:
+            History entries, oldest first
+        """
+        return list(self.iter_entries())
+    
+    def iter_entries(self) -> Iterator[Dict[str, Any]]:
+        """
+        Stream history entries without materializing the whole history
+        
+        Yields:
+            History entries, oldest first
+        """
+        with self._lock:
+            snapshot_path = self._path(SNAPSHOT_NAME)
+            segment_ids = [segment_id for segment_id in self._segment_ids() if segment_id > self._covered_segment]
+            # Open everything under the lock so compaction cannot delete files mid-read
+            handles = [open(snapshot_path, 'r', encoding='utf-8')]
+            handles.extend(open(self._path(segment_name(segment_id)), 'r', encoding='utf-8') for segment_id in segment_ids)
+        
+        for index, handle in enumerate(handles):
+            with handle:
+                if index == 0:
+                    handle.readline()  # Header
+                for line in handle:
+                    if not line.endswith('\n'):
+                        break  # Torn final write
+                    yield decode_entry(line)
+    
+    def tail(self, cursor: Optional[HistoryCursor] = None) -> Tuple[List[Dict[str, Any]], HistoryCursor, bool]:
+        """
+        Read only the entries appended since ``cursor``
+        
+        Unchanged history is detected from file metadata alone: the snapshot
+        identity and the size of the cursor's segment compared to its offset.
+        
+        Args:
+            cursor: Cursor returned by the previous call, or None
+            
+        Returns:
+            Tuple of (entries, next cursor, reset). When reset is True the
+            history was cleared (or no cursor was given) and the entries are
+            the complete history rather than a delta.
+        """
+        with self._lock:
+            snapshot_path = self._path(SNAPSHOT_NAME)
+            snapshot_stat = os.stat(snapshot_path)
+            snapshot_id = (snapshot_stat.st_ino, snapshot_stat.st_mtime_ns)
+            if cursor is not None and cursor.snapshot_id == snapshot_id and not self._has_new_data(cursor):
+                return [], cursor, False
+            
+            header = self._read_snapshot_header()
+            epoch = header.get('epoch', 0)
+            covered = header['covers_segment']
+            segment_ids = [segment_id for segment_id in self._segment_ids() if segment_id > covered]
+            
+            reset = cursor is None or cursor.epoch != epoch
+            skip = 0
+            if reset:
+                count = 0
+                plan = [(snapshot_path, None, 0)] + [(self._path(segment_name(i)), i, 0) for i in segment_ids]
+            elif cursor.segment_id > covered:
+                count = cursor.count
+                plan = [
+                    (self._path(segment_name(i)), i, cursor.offset if i == cursor.segment_id else 0)
+                    for i in segment_ids if i >= cursor.segment_id
+                ]
+            else:
+                # The cursor's segment was compacted into the snapshot: skip what was already read
+                count = skip = cursor.count
+                plan = [(snapshot_path, None, 0)] + [(self._path(segment_name(i)), i, 0) for i in segment_ids]
+            
+            handles = []
+            for path, segment_id, offset in plan:
+                try:
+                    handles.append((open(path, 'rb'), segment_id, offset))
+                except FileNotFoundError:
+                    continue
+        
+        entries: List[Dict[str, Any]] = []
+        end_segment = cursor.segment_id if cursor is not None and not reset and cursor.segment_id > covered else covered + 1
+        end_offset = cursor.offset if cursor is not None and not reset and cursor.segment_id > covered else 0
+        for handle, segment_id, offset in handles:
+            with handle:
+                if segment_id is None:
+                    handle.readline()  # Snapshot header
+                else:
+                    handle.seek(offset)
+                    end_segment, end_offset = segment_id, offset
+                for line in handle:
+                    if not line.endswith(b'\n'):
+                        break  # Partially written record; picked up next time
+                    if segment_id is not None:
+                        end_offset += len(line)
+                    if skip:
+                        skip -= 1
+                        continue
+                    entries.append(decode_entry(line.decode('utf-8')))
+        
+        next_cursor = HistoryCursor(epoch, count + len(entries), end_segment, end_offset, snapshot_id)
+        return entries, next_cursor, reset
+    
+    # Writing
+    
+    def append(self, entry: Dict[str, Any]) -> None:
+        """
+        Append one entry in O(1)
+        
+        Args:
+            entry: History entry
+        """
+        self.extend([entry])
+    
+    def extend(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Append several entries with a single write
+        
+        Args:
+            entries: History entries
+        """
+        if not entries:
+            return
+        data = ''.join(encode_entry(entry) + '\n' for entry in entries).encode('utf-8')
+        with self._lock:
+            if self._active_records >= self.segment_max_records:
+                self._rotate()
+            fd = self._active_fd()
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            if self.fsync:
+                os.fsync(fd)
+            self._active_records += len(entries)
+    
+    def clear(self) -> None:
+        """Remove all history, keeping the store usable"""
+        with self._compaction_lock, self._lock:
+            self._close_fd()
+            last_segment = self._active_segment
+            self._install_snapshot(self._build_snapshot(iter(()), covers_segment=last_segment, new_epoch=True))
+            self._active_segment = last_segment + 1
+            self._active_records = 0
+    
+    def compact(self) -> None:
+        """Fold all sealed segments into the snapshot"""
+        with self._compaction_lock:
+            with self._lock:
+                sealed = self._sealed_segments()
+                if not sealed:
+                    return
+                covers_segment = max(sealed)
+                sources = [self._path(SNAPSHOT_NAME)] + [self._path(segment_name(segment_id)) for segment_id in sealed]
+                handles = [open(path, 'r', encoding='utf-8') for path in sources]
+            
+            def lines() -> Iterator[str]:
+                for index, handle in enumerate(handles):
+                    with handle:
+                        if index == 0:
+                            handle.readline()
+                        for line in handle:
+                            if line.endswith('\n'):
+                                yield line
+            
+            # Appends keep going to the active segment while the snapshot is rebuilt
+            snapshot = self._build_snapshot(lines(), covers_segment=covers_segment)
+            with self._lock:
+                self._install_snapshot(snapshot)
+    
+    def close(self) -> None:
+        """Stop the compaction thread and close the active segment"""
+        self._closed = True
+        self._compaction_wanted.set()
+        with self._lock:
+            self._close_fd()
+    
+    # Status
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Summarize on-disk state for the data status panel
+        
+        Returns:
+            Size in bytes, segment count, last modification time and generation
+        """
+        with self._lock:
+            paths = [self._path(SNAPSHOT_NAME)] + [
+                self._path(segment_name(segment_id)) for segment_id in self._segment_ids()
+            ]
+            sizes_and_times = [(os.path.getsize(path), os.path.getmtime(path)) for path in paths if os.path.exists(path)]
+        return {
+            'bytes': sum(size for size, _ in sizes_and_times),
+            'segments': len(paths) - 1,
+            'modified': datetime.fromtimestamp(max(mtime for _, mtime in sizes_and_times)) if sizes_and_times else None,
+            'generation': self.generation
+        }
+    
+    # Internals
+    
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+    
+    def _segment_ids(self) -> List[int]:
+        ids = []
+        for name in os.listdir(self.directory):
+            match = SEGMENT_PATTERN.match(name)
+            if match:
+                ids.append(int(match.group(1)))
+        return sorted(ids)
+    
+    def _sealed_segments(self) -> List[int]:
+        return [
+            segment_id for segment_id in self._segment_ids()
+            if self._covered_segment < segment_id < self._active_segment
+        ]
+    
+    def _has_new_data(self, cursor: HistoryCursor) -> bool:
+        try:
+            if os.path.getsize(self._path(segment_name(cursor.segment_id))) > cursor.offset:
+                return True
+        except FileNotFoundError:
+            pass
+        return any(segment_id > cursor.segment_id for segment_id in self._segment_ids())
+    
+    def _active_fd(self) -> int:
+        if self._fd is None:
+            path = self._path(segment_name(self._active_segment))
+            self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        return self._fd
+    
+    def _close_fd(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+    
+    def _rotate(self) -> None:
+        self._close_fd()
+        self._active_segment += 1
+        self._active_records = 0
+        if len(self._sealed_segments()) >= self.compact_after_segments:
+            self._compaction_wanted.set()
+    
+    def _compaction_loop(self) -> None:
+        while True:
+            self._compaction_wanted.wait()
+            self._compaction_wanted.clear()
+            if self._closed:
+                return
+            try:
+                self.compact()
+            except OSError:
+                # Leave the segments in place; the next rotation retries
+                pass
+    
+    def _read_snapshot_header(self) -> Optional[Dict[str, Any]]:
+        path = self._path(SNAPSHOT_NAME)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.loads(f.readline())
+    
+    def _build_snapshot(self, lines: Iterator[str], covers_segment: int, new_epoch: bool = False,
+                        extra_header: Optional[Dict[str, Any]] = None) -> Tuple[str, Dict[str, Any]]:
+        """Write the next snapshot to a temporary file and return (path, header)"""
+        header = {
+            'generation': self.generation + 1,
+            'epoch': self.epoch + 1 if new_epoch else self.epoch,
+            'covers_segment': covers_segment,
+            **(extra_header or {})
+        }
+        tmp_path = self._path(SNAPSHOT_NAME) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(header) + '\n')
+            for line in lines:
+                f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        return tmp_path, header
+    
+    def _install_snapshot(self, snapshot: Tuple[str, Dict[str, Any]]) -> None:
+        """Atomically replace the snapshot, then delete the segments it covers"""
+        tmp_path, header = snapshot
+        os.replace(tmp_path, self._path(SNAPSHOT_NAME))
+        self._fsync_directory()
+        self.generation = header['generation']
+        self.epoch = header['epoch']
+        self._covered_segment = header['covers_segment']
+        self._drop_covered_segments()
+    
+    def _initialize_snapshot(self, legacy_path: Optional[str]) -> Dict[str, Any]:
+        entries, source = self._read_legacy(legacy_path)
+        # Segments written before the first snapshot existed are kept
+        existing = self._segment_ids()
+        covers_segment = min(existing) - 1 if existing else 0
+        snapshot = self._build_snapshot(
+            (encode_entry(entry) + '\n' for entry in entries),
+            covers_segment=covers_segment,
+            extra_header={'imported_from': source} if source else None
+        )
+        self._install_snapshot(snapshot)
+        return snapshot[1]
+    
+    def _read_legacy(self, legacy_path: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        if not legacy_path:
+            return [], None
+        json_path = os.path.splitext(legacy_path)[0] + '.json'
+        for path, reader in ((legacy_path, self._read_pickle), (json_path, self._read_json)):
+            if os.path.exists(path):
+                try:
+                    return reader(path), os.path.basename(path)
+                except Exception:
+                    continue
+        return [], None
+    
+    @staticmethod
+    def _read_pickle(path: str) -> List[Dict[str, Any]]:
+        with open(path, 'rb') as f:
+            return list(pickle.load(f))
+    
+    @staticmethod
+    def _read_json(path: str) -> List[Dict[str, Any]]:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [restore_entry(item) for item in json.load(f)]
+    
+    def _drop_covered_segments(self) -> None:
+        for segment_id in self._segment_ids():
+            if segment_id <= self._covered_segment:
+                os.remove(self._path(segment_name(segment_id)))
+    
+    def _recover_segment(self, segment_id: int) -> int:
+        """Cut a torn final line off the active segment and count its records"""
+        path = self._path(segment_name(segment_id))
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb+') as f:
+            data = f.read()
+            valid_length = data.rfind(b'\n') + 1
+            if valid_length < len(data):
+                f.truncate(valid_length)
+        return data.count(b'\n', 0, valid_length)
+    
+    def _remove_stale_temp_files(self) -> None:
+        for name in os.listdir(self.directory):
+            if name.endswith('.tmp'):
+                os.remove(self._path(name))
+    
+    def _fsync_directory(self) -> None:
+        if not hasattr(os, 'O_DIRECTORY'):
+            return
+        fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
@@ -0,0 +1,218 @@
+"""
+Inverted index for full-text search over the session history
+
+Each distinct token maps to the sorted row numbers of the messages that
+contain it, stored as compact int32 arrays. The index follows a
+ColumnarHistory: rows appended since the last query are tokenized on the
+next query, and a cleared history (detected by its generation counter)
+triggers a rebuild. Nothing is indexed until the first search, so sessions
+that never search pay nothing.
+
+Queries are whitespace-separated terms that must all match. A term ending
+in ``*`` matches every token with that prefix, found by bisecting a sorted
+vocabulary. Label and time-range filters are applied to the candidate rows
+through the history's label and timestamp columns; messages are never
+scanned.
+"""
+import re
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from typing import Any, Collection, Dict, List, NamedTuple, Optional
+import numpy as np
+from columnar import LABELS, ColumnarHistory, to_wall_micros
+
+TOKEN_PATTERN = re.compile(r"\w+(?:'\w+)*")
+MIN_PREFIX_LENGTH = 2
+SEARCH_PAGE_SIZE = 20
+# Intersections switch from binary search to a row bitmap above indexed rows / BITMAP_RATIO candidates
+BITMAP_RATIO = 64
+
+def tokenize(text: str) -> List[str]:
+    """Case-folded word tokens of a message or query"""
+    return TOKEN_PATTERN.findall(text.casefold())
+
+class SearchResults(NamedTuple):
+    """One page of search results"""
+    
+    total: int
+    page: int
+    pages: int
+    rows: List[int]  # Newest first
+    entries: List[Dict[str, Any]]
+
+class SearchIndex:
+    """
+    Token and prefix index over a ColumnarHistory
+    
+    Args:
+        history: History to index; the index catches up with it lazily
+    """
+    
+    def __init__(self, history: ColumnarHistory):
+        self.history = history
+        self._reset()
+    
+    def _reset(self) -> None:
+        self._generation = self.history.generation
+        self._indexed = 0
+        self._postings: Dict[str, array] = {}
+        self._vocabulary: List[str] = []
+        self._time_sorted = True
+        self._last_timestamp = None
+    
+    def refresh(self) -> int:
+        """
+        Index rows appended to the history since the last refresh
+        
+        Returns:
+            Number of rows indexed
+        """
+        history = self.history
+        if history.generation != self._generation or len(history) < self._indexed:
+            self._reset()
+        start, end = self._indexed, len(history)
+        if start == end:
+            return 0
+        
+        postings = self._postings
+        new_terms = []
+        for row in range(start, end):
+            for token in set(tokenize(history.message(row))):
+                rows = postings.get(token)
+                if rows is None:
+                    postings[token] = array('i', (row,))
+                    new_terms.append(token)
+                else:
+                    rows.append(row)
+        if new_terms:
+            # Appending a sorted run lets the sort merge in linear time
+            new_terms.sort()
+            self._vocabulary.extend(new_terms)
+            self._vocabulary.sort()
+        
+        timestamps = history.timestamps[start:end].view(np.int64)
+        if self._time_sorted:
+            previous = self._last_timestamp
+            self._time_sorted = bool((np.diff(timestamps) >= 0).all()) and (previous is None or timestamps[0] >= previous)
+        self._last_timestamp = int(timestamps[-1])
+        self._indexed = end
+        return end - start
+    
+    def _term_rows(self, term: str) -> np.ndarray:
+        if term.endswith('*'):
+            prefix = term.rstrip('*')
+            if len(prefix) < MIN_PREFIX_LENGTH:
+                raise ValueError(f'Prefix "{term}" is too short (at least {MIN_PREFIX_LENGTH} characters)')
+            vocabulary = self._vocabulary
+            position = bisect_left(vocabulary, prefix)
+            merged = array('i')
+            expanded = 0
+            while position < len(vocabulary) and vocabulary[position].startswith(prefix):
+                merged.extend(self._postings[vocabulary[position]])
+                position += 1
+                expanded += 1
+            rows = np.frombuffer(merged, dtype=np.int32)
+            if expanded <= 1:
+                return rows
+            # Union through a row bitmap: linear, no sort of the merged postings
+            seen = np.zeros(self._indexed, dtype=bool)
+            seen[rows] = True
+            return np.flatnonzero(seen).astype(np.int32)
+        rows = self._postings.get(term)
+        if rows is None:
+            return np.empty(0, dtype=np.int32)
+        return np.frombuffer(rows, dtype=np.int32).copy()
+    
+    def _time_filter(self, rows: Optional[np.ndarray], start: Optional[datetime],
+                     end: Optional[datetime]) -> np.ndarray:
+        """
+        Restrict rows (all indexed rows if None) to timestamps in [start, end)
+        
+        While timestamps are in append order the bounds are found by binary
+        search, so only the candidate rows are touched.
+        """
+        timestamps = self.history.timestamps[:self._indexed].view(np.int64)
+        low_micros = None if start is None else to_wall_micros(start)
+        high_micros = None if end is None else to_wall_micros(end)
+        if self._time_sorted:
+            low = 0 if low_micros is None else int(np.searchsorted(timestamps, low_micros, 'left'))
+            high = self._indexed if high_micros is None else int(np.searchsorted(timestamps, high_micros, 'left'))
+            if rows is None:
+                return np.arange(low, max(low, high), dtype=np.int32)
+            return rows[(rows >= low) & (rows < high)]
+        
+        if rows is None:
+            rows = np.arange(self._indexed, dtype=np.int32)
+        selected = timestamps[rows]
+        mask = np.ones(len(rows), dtype=bool)
+        if low_micros is not None:
+            mask &= selected >= low_micros
+        if high_micros is not None:
+            mask &= selected < high_micros
+        return rows[mask]
+    
+    def search(self, query: str = '', labels: Optional[Collection[str]] = None,
+               start: Optional[datetime] = None, end: Optional[datetime] = None,
+               page: int = 1, page_size: int = SEARCH_PAGE_SIZE) -> SearchResults:
+        """
+        Find entries matching every query term and the filters
+        
+        Args:
+            query: Whitespace-separated terms; a trailing * makes a prefix term
+            labels: Sentiment labels to keep (all if None)
+            start: Inclusive lower bound on the timestamp
+            end: Exclusive upper bound on the timestamp
+            page: 1-based page number
+            page_size: Results per page
+            
+        Returns:
+            The requested page, newest entries first
+            
+        Raises:
+            ValueError: If a prefix term is shorter than MIN_PREFIX_LENGTH
+        """
+        self.refresh()
+        terms = []
+        for word in query.split():
+            tokens = tokenize(word)
+            if word.endswith('*') and tokens:
+                tokens[-1] += '*'
+            terms.extend(tokens)
+        
+        rows = None
+        if terms:
+            # Intersect from the rarest term so each step shrinks the candidates
+            candidates = sorted((self._term_rows(term) for term in terms), key=len)
+            rows = candidates[0]
+            for other in candidates[1:]:
+                if not len(rows) or not len(other):
+                    rows = rows[:0]
+                    break
+                if len(rows) * BITMAP_RATIO < self._indexed:
+                    positions = np.searchsorted(other, rows).clip(max=len(other) - 1)
+                    rows = rows[other[positions] == rows]
+                else:
+                    # Many candidates: probing a row bitmap beats binary search
+                    member = np.zeros(self._indexed, dtype=bool)
+                    member[other] = True
+                    rows = rows[member[rows]]
+        if start is not None or end is not None:
+            rows = self._time_filter(rows, start, end)
+        elif rows is None:
+            rows = np.arange(self._indexed, dtype=np.int32)
+        
+        if labels is not None and set(labels) != set(LABELS):
+            keep = np.array([label in labels for label in LABELS])
+            rows = rows[keep[self.history.label_codes[rows]]]
+        
+        total = len(rows)
+        pages = max(1, -(-total // page_size))
+        page = min(max(page, 1), pages)
+        newest_first = rows[::-1][(page - 1) * page_size:page * page_size].tolist()
+        return SearchResults(total, page, pages, newest_first, [self.history[row] for row in newest_first])
+    
+    @property
+    def vocabulary_size(self) -> int:
+        """Number of distinct indexed tokens"""
+        return len(self._vocabulary)
@@ -0,0 +1,92 @@
+"""
+Single-flight coalescing of concurrent identical calls
+
+While a call for a key is in flight, later callers with the same key wait
+for its result instead of starting their own. The first caller (the leader)
+runs the function; every waiter receives the same result or the same
+exception. Nothing is remembered once the call completes, so a failed call
+is retried by the next caller and successful results are only reused
+through a cache.
+
+The Lambda coalesces Bedrock calls with this module and the web app
+coalesces API calls with it. The Lambda asset is built from
+services/sentiment and the web image from web/, so neither can import the
+other's files: services/sentiment/singleflight.py and web/singleflight.py
+are identical copies, kept in step by tests/test_singleflight.py. The
+module has no dependencies beyond the standard library.
+"""
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Tuple
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key"""
+    
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+        self.errors = 0
+    
+    def do(self, key: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[Any, bool]:
+        """
+        Run func once per key among concurrent callers
+        
+        Args:
+            key: Identity of the call, e.g. the normalized message or its cache key
+            func: Function to run if no identical call is in flight
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+            
+        Returns:
+            Tuple of (result, shared); shared is True for callers that waited on another caller's call
+            
+        Raises:
+            Exception: Whatever the leader's call raised, re-raised in every caller
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is None:
+                future = Future()
+                self._calls[key] = future
+                self.executions += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+        
+        if not leader:
+            return future.result(), True
+        
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            # Forget the call before waking waiters so the failure is never reused
+            self._finish(key)
+            with self._lock:
+                self.errors += 1
+            future.set_exception(e)
+            raise
+        self._finish(key)
+        future.set_result(result)
+        return result, False
+    
+    def _finish(self, key: str) -> None:
+        with self._lock:
+            del self._calls[key]
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Coalescing counters
+        
+        Returns:
+            Calls executed, callers coalesced onto an in-flight call, failed calls and calls in flight
+        """
+        with self._lock:
+            return {
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'errors': self.errors,
+                'in_flight': len(self._calls)
+            }